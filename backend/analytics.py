@@ -0,0 +1,268 @@
+"""
+Dashboard analytics for /api/analytics/*.
+
+Dashboards read small precomputed rollups from the `sow_rollups` collection
+instead of aggregating every SOW on each request. A rollup document holds
+the SOW count, estimated value and approval turnaround sums of one
+(clientId, clientOrganization, status, month created) bucket. Rollups are
+produced by an aggregation pipeline over one batch of clients' SOWs, which
+the clientId index serves.
+
+Rollups are refreshed incrementally: every SOW write marks its client
+dirty, and shortly after (ANALYTICS_REFRESH_DELAY_SECONDS, so a burst of
+writes costs one refresh) the process re-aggregates just the dirty
+clients. Clients marked while a refresh runs, and batches that failed
+(retried with backoff), are picked up by the same background task until
+nothing is pending. Analytics reads flush pending refreshes first, so users
+see their own writes. The whole collection is rebuilt at startup when it is empty,
+and by the `analytics-rebuild` job.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+import asyncio
+import os
+
+from pymongo import DESCENDING, ReplaceOne
+from pymongo.asynchronous.database import AsyncDatabase
+
+from database import mongodb
+
+# Delay before dirty clients are re-aggregated, so bursts of writes share one refresh
+ANALYTICS_REFRESH_DELAY_SECONDS = float(os.getenv("ANALYTICS_REFRESH_DELAY_SECONDS", "0.5"))
+
+# Longest wait before retrying rollups that failed to refresh (doubles from the delay above)
+ROLLUP_RETRY_MAX_SECONDS = 60
+
+# Clients re-aggregated per pipeline run
+ROLLUP_REFRESH_BATCH = 500
+
+MS_PER_DAY = 24 * 60 * 60 * 1000
+
+# Approved SOWs with both timestamps count towards approval turnaround
+_HAS_TURNAROUND = {"$and": [
+    {"$eq": ["$status", "approved"]},
+    {"$gt": ["$submittedAt", None]},
+    {"$gt": ["$approvedAt", None]},
+]}
+
+def rollup_pipeline(client_ids: List[str]) -> List[Dict[str, Any]]:
+    """Aggregation producing the rollup buckets of these clients' SOWs."""
+    return [
+        {"$match": {"clientId": {"$in": client_ids}}},
+        {"$group": {
+            "_id": {
+                "clientId": "$clientId",
+                "clientOrganization": "$clientOrganization",
+                "status": "$status",
+                "month": {"$dateToString": {"format": "%Y-%m", "date": {"$toDate": "$createdAt"}}},
+            },
+            "sows": {"$sum": 1},
+            "estimatedValue": {"$sum": {"$ifNull": ["$estimatedValue", 0]}},
+            "approvals": {"$sum": {"$cond": [_HAS_TURNAROUND, 1, 0]}},
+            "approvalTimeMs": {"$sum": {"$cond": [_HAS_TURNAROUND, {"$subtract": ["$approvedAt", "$submittedAt"]}, 0]}},
+        }},
+    ]
+
+async def refresh_rollups(db: AsyncDatabase, client_ids: List[str]) -> int:
+    """
+    Recompute the rollups of these clients and drop their buckets that no
+    longer have SOWs. Returns the number of rollup documents written.
+    """
+    refreshed_at = int(datetime.now(timezone.utc).timestamp() * 1000)
+    operations = []
+    async for bucket in await db.sows.aggregate(rollup_pipeline(client_ids)):
+        key = bucket.pop("_id")
+        operations.append(ReplaceOne(
+            {"_id": key},
+            {**key, **bucket, "refreshedAt": refreshed_at},
+            upsert=True
+        ))
+    if operations:
+        await db.sow_rollups.bulk_write(operations, ordered=False)
+    await db.sow_rollups.delete_many({"clientId": {"$in": client_ids}, "refreshedAt": {"$lt": refreshed_at}})
+    return len(operations)
+
+class RollupRefresher:
+    """Re-aggregates the rollups of clients whose SOWs changed in this process."""
+
+    def __init__(self):
+        self.pending: Set[str] = set()
+        self.task: Optional[asyncio.Task] = None
+        self.lock = asyncio.Lock()
+        self.refreshes = 0
+        self.rebuilds = 0
+        self.last_error: Optional[str] = None
+
+    def mark_dirty(self, client_id: str):
+        """Schedule a refresh of this client's rollups."""
+        self.pending.add(client_id)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        """Flush after the delay, and again until nothing is pending (backing off while refreshes fail)."""
+        delay = ANALYTICS_REFRESH_DELAY_SECONDS
+        while True:
+            await asyncio.sleep(delay)
+            if await self.flush():
+                delay = ANALYTICS_REFRESH_DELAY_SECONDS
+            else:
+                delay = min(max(delay, 0.5) * 2, ROLLUP_RETRY_MAX_SECONDS)
+            if not self.pending:
+                return
+
+    async def flush(self) -> bool:
+        """
+        Refresh all pending clients now; failed clients stay pending for the
+        next flush. Returns False if any batch failed.
+        """
+        async with self.lock:
+            if not self.pending:
+                return True
+            ok = True
+            client_ids, self.pending = sorted(self.pending), set()
+            db = mongodb.get_db()
+            for start in range(0, len(client_ids), ROLLUP_REFRESH_BATCH):
+                batch = client_ids[start:start + ROLLUP_REFRESH_BATCH]
+                try:
+                    await refresh_rollups(db, batch)
+                    self.refreshes += 1
+                except Exception as e:
+                    ok = False
+                    self.pending.update(batch)
+                    self.last_error = str(e)
+                    print(f"⚠️  Warning: Could not refresh analytics rollups: {e}")
+            return ok
+
+    async def rebuild(self) -> Dict[str, int]:
+        """Recompute every client's rollups and drop rollups of clients without SOWs."""
+        async with self.lock:
+            db = mongodb.get_db()
+            client_ids = sorted(await db.sows.distinct("clientId"))
+            self.pending.difference_update(client_ids)
+            buckets = 0
+            for start in range(0, len(client_ids), ROLLUP_REFRESH_BATCH):
+                buckets += await refresh_rollups(db, client_ids[start:start + ROLLUP_REFRESH_BATCH])
+            await db.sow_rollups.delete_many({"clientId": {"$nin": client_ids}})
+            self.rebuilds += 1
+            return {"clients": len(client_ids), "buckets": buckets}
+
+    async def ensure_built(self):
+        """Build the rollups if they were never built (new deployment or dropped collection)."""
+        db = mongodb.get_db()
+        try:
+            if await db.sow_rollups.find_one({}, {"_id": 1}) is None and await db.sows.find_one({}, {"_id": 1}):
+                print("🔄 Building analytics rollups...")
+                result = await self.rebuild()
+                print(f"✅ Analytics rollups built for {result['clients']} client(s)")
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"⚠️  Warning: Could not build analytics rollups: {e}")
+
+    async def stop(self):
+        """Cancel the scheduled refresh and apply pending ones (server shutdown)."""
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pending and completed refresh counters."""
+        return {
+            "pendingClients": len(self.pending),
+            "refreshes": self.refreshes,
+            "rebuilds": self.rebuilds,
+            "lastError": self.last_error,
+        }
+
+rollup_refresher = RollupRefresher()
+
+def _match(client_id: Optional[str], **conditions: Any) -> Dict[str, Any]:
+    """$match stage for rollups visible to the user (clients only see their own)."""
+    query = dict(conditions)
+    if client_id is not None:
+        query["clientId"] = client_id
+    return {"$match": query}
+
+def _average_days(total_ms: float, count: int) -> Optional[float]:
+    return round(total_ms / count / MS_PER_DAY, 1) if count else None
+
+async def get_summary(db: AsyncDatabase, client_id: Optional[str] = None) -> Dict[str, Any]:
+    """SOW counts and estimated value by status, approval rate and average approval turnaround."""
+    pipeline = [
+        _match(client_id),
+        {"$group": {
+            "_id": "$status",
+            "sows": {"$sum": "$sows"},
+            "estimatedValue": {"$sum": "$estimatedValue"},
+            "approvals": {"$sum": "$approvals"},
+            "approvalTimeMs": {"$sum": "$approvalTimeMs"},
+        }},
+    ]
+    by_status = {}
+    approvals = 0
+    approval_time_ms = 0
+    async for row in await db.sow_rollups.aggregate(pipeline):
+        by_status[row["_id"]] = {"sows": row["sows"], "estimatedValue": round(row["estimatedValue"], 2)}
+        approvals += row["approvals"]
+        approval_time_ms += row["approvalTimeMs"]
+
+    total = sum(status_totals["sows"] for status_totals in by_status.values())
+    approved = by_status.get("approved", {}).get("sows", 0)
+    return {
+        "totalSOWs": total,
+        "estimatedValue": round(sum(status_totals["estimatedValue"] for status_totals in by_status.values()), 2),
+        "byStatus": by_status,
+        "approvalRate": round(approved / total * 100, 1) if total else 0.0,
+        "avgApprovalTimeDays": _average_days(approval_time_ms, approvals),
+    }
+
+async def get_organizations(db: AsyncDatabase, client_id: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    """SOW count, approved count and estimated value per client organization, largest value first."""
+    pipeline = [
+        _match(client_id),
+        {"$group": {
+            "_id": "$clientOrganization",
+            "sows": {"$sum": "$sows"},
+            "approved": {"$sum": {"$cond": [{"$eq": ["$status", "approved"]}, "$sows", 0]}},
+            "estimatedValue": {"$sum": "$estimatedValue"},
+        }},
+        {"$sort": {"estimatedValue": DESCENDING, "sows": DESCENDING, "_id": 1}},
+        {"$limit": limit},
+    ]
+    return [
+        {
+            "clientOrganization": row["_id"],
+            "sows": row["sows"],
+            "approved": row["approved"],
+            "estimatedValue": round(row["estimatedValue"], 2),
+        }
+        async for row in await db.sow_rollups.aggregate(pipeline)
+    ]
+
+async def get_monthly(db: AsyncDatabase, client_id: Optional[str] = None, months: int = 12) -> List[Dict[str, Any]]:
+    """SOWs created per month (UTC) over the last `months` months, with approvals and turnaround."""
+    now = datetime.now(timezone.utc)
+    first_month = now.year * 12 + now.month - months
+    since = f"{first_month // 12:04d}-{first_month % 12 + 1:02d}"
+    pipeline = [
+        _match(client_id, month={"$gte": since}),
+        {"$group": {
+            "_id": "$month",
+            "sows": {"$sum": "$sows"},
+            "approved": {"$sum": {"$cond": [{"$eq": ["$status", "approved"]}, "$sows", 0]}},
+            "estimatedValue": {"$sum": "$estimatedValue"},
+            "approvals": {"$sum": "$approvals"},
+            "approvalTimeMs": {"$sum": "$approvalTimeMs"},
+        }},
+        {"$sort": {"_id": 1}},
+    ]
+    return [
+        {
+            "month": row["_id"],
+            "sows": row["sows"],
+            "approved": row["approved"],
+            "estimatedValue": round(row["estimatedValue"], 2),
+            "avgApprovalTimeDays": _average_days(row["approvalTimeMs"], row["approvals"]),
+        }
+        async for row in await db.sow_rollups.aggregate(pipeline)
+    ]
@@ -1,12 +1,19 @@
 """
 Authentication utilities for JWT token management and password hashing.
 """
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Callable, List, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+import asyncio
+import functools
+import math
 import os
 import secrets
+import time
+
+from metrics import bcrypt_duration, timed_call
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -32,6 +39,137 @@ def get_password_hash(password: str) -> str:
     """Hash a password."""
     return pwd_context.hash(password)
 
+def _map_chunk(fn: Callable, chunk: List) -> List:
+    """Apply fn to each item of a chunk (module level so process pools can pickle it)."""
+    return [fn(item) for item in chunk]
+
+class AuthPoolSaturated(Exception):
+    """Raised when too many password hash/verify jobs are already queued."""
+    
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(f"Authentication workers are saturated, retry after {retry_after}s")
+
+class AuthWorkerPool:
+    """
+    Bounded worker pool for CPU-heavy password hashing.
+    
+    bcrypt releases the GIL, so threads scale across cores; a process pool
+    can be selected instead. At most `max_pending` jobs may be running or
+    queued at once, beyond which callers get AuthPoolSaturated instead of
+    piling up behind a long queue.
+    """
+    
+    def __init__(self, max_workers: int, max_pending: int, kind: str = "thread"):
+        """
+        Initialize pool (executor is created lazily on first use).
+        
+        Args:
+            max_workers: Number of worker threads/processes
+            max_pending: Maximum jobs running or waiting before rejecting
+            kind: "thread" or "process"
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.kind = kind
+        self.executor: Optional[Executor] = None
+        self.pending = 0
+        self.rejected = 0
+        self.avg_seconds = 0.25  # Moving average of job duration, seeded with a typical bcrypt cost
+    
+    def _get_executor(self) -> Executor:
+        if self.executor is None:
+            if self.kind == "process":
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="auth")
+        return self.executor
+    
+    def retry_after(self) -> int:
+        """Seconds until a full queue is expected to drain."""
+        return max(1, math.ceil(self.max_pending / self.max_workers * self.avg_seconds))
+    
+    async def run(self, fn: Callable, *args, weight: int = 1):
+        """
+        Run fn(*args) on the pool, or raise AuthPoolSaturated if the queue is full.
+        
+        `weight` is the number of hashes the job performs, used to keep the
+        per-hash duration estimate accurate for batched jobs.
+        """
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise AuthPoolSaturated(self.retry_after())
+        
+        self.pending += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+            self.avg_seconds = 0.9 * self.avg_seconds + 0.1 * (time.perf_counter() - started) / weight
+    
+    async def map(self, fn: Callable, items: List, chunk_size: int = 8) -> List:
+        """
+        Run fn(item) for every item on the pool and return results in order.
+        
+        Items are sent in chunks to amortize dispatch overhead, and at most
+        max_workers - 1 chunks run at once so interactive logins keep a
+        worker. Raises AuthPoolSaturated if the pool is backed up.
+        """
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        slots = asyncio.Semaphore(max(1, self.max_workers - 1))
+        
+        async def run_chunk(chunk):
+            async with slots:
+                return await self.run(_map_chunk, fn, chunk, weight=len(chunk))
+        
+        results = await asyncio.gather(*(run_chunk(chunk) for chunk in chunks))
+        return [result for chunk_results in results for result in chunk_results]
+    
+    def stats(self) -> dict:
+        """Return pool configuration and load counters."""
+        return {
+            "kind": self.kind,
+            "workers": self.max_workers,
+            "maxPending": self.max_pending,
+            "pending": self.pending,
+            "rejected": self.rejected,
+            "avgSeconds": round(self.avg_seconds, 4),
+        }
+    
+    def shutdown(self):
+        """Stop the executor, waiting for running jobs."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+AUTH_WORKERS = int(os.getenv("AUTH_WORKERS", str(os.cpu_count() or 1)))
+auth_pool = AuthWorkerPool(
+    max_workers=AUTH_WORKERS,
+    max_pending=int(os.getenv("AUTH_MAX_PENDING", str(AUTH_WORKERS * 8))),
+    kind=os.getenv("AUTH_POOL_KIND", "thread"),
+)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the auth worker pool without blocking the event loop."""
+    result, seconds = await auth_pool.run(timed_call, verify_password, plain_password, hashed_password)
+    bcrypt_duration.observe(seconds, "verify")
+    return result
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the auth worker pool without blocking the event loop."""
+    hashed, seconds = await auth_pool.run(timed_call, get_password_hash, password)
+    bcrypt_duration.observe(seconds, "hash")
+    return hashed
+
+async def get_password_hashes_async(passwords: List[str]) -> List[str]:
+    """Hash many passwords in parallel on the auth worker pool."""
+    results = await auth_pool.map(functools.partial(timed_call, get_password_hash), passwords)
+    for _, seconds in results:
+        bcrypt_duration.observe(seconds, "hash")
+    return [hashed for hashed, _ in results]
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -0,0 +1,45 @@
+"""
+Shared helpers for the backend benchmark scripts.
+"""
+import math
+import os
+import sys
+from typing import Dict, List, Sequence
+
+# Allow `from models import ...` etc. when run from the benchmarks directory
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Return the pct-th percentile (0-100) of samples using nearest-rank."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = math.ceil(pct / 100.0 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def summarize_latencies(latencies_s: Sequence[float]) -> Dict[str, float]:
+    """Summarize latency samples (seconds) into millisecond percentiles."""
+    return {
+        "p50_ms": percentile(latencies_s, 50) * 1000,
+        "p95_ms": percentile(latencies_s, 95) * 1000,
+        "p99_ms": percentile(latencies_s, 99) * 1000,
+        "max_ms": (max(latencies_s) if latencies_s else 0.0) * 1000,
+    }
+
+
+def print_table(headers: List[str], rows: List[List[object]]):
+    """Print rows as a fixed-width table."""
+    formatted = [
+        [f"{cell:,.2f}" if isinstance(cell, float) else str(cell) for cell in row]
+        for row in rows
+    ]
+    widths = [
+        max(len(headers[i]), *(len(row[i]) for row in formatted)) if formatted else len(headers[i])
+        for i in range(len(headers))
+    ]
+    print("  ".join(h.rjust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in formatted:
+        print("  ".join(cell.rjust(w) for cell, w in zip(row, widths)))
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for a running SOWgen.ai API.
+
+Logs in once, then drives an endpoint (default: GET /api/sows) with an
+increasing number of concurrent clients and reports requests/sec and latency
+percentiles for each level. With the async data layer, throughput should keep
+rising with concurrency until MongoDB or the CPU saturates, rather than
+flattening at one in-flight query per worker.
+
+Requires httpx (pip install httpx) and a running backend:
+
+    python main.py &
+    python benchmarks/bench_concurrency.py --concurrency 1,8,32,128 --duration 10
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+import httpx
+
+from _common import print_table, summarize_latencies
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    """Authenticate and return a bearer token."""
+    response = await client.post("/api/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run_level(client: httpx.AsyncClient, path: str, concurrency: int, duration: float) -> dict:
+    """Run `concurrency` closed-loop workers against `path` for `duration` seconds."""
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        **summarize_latencies(latencies),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the API")
+    parser.add_argument("--path", default="/api/sows", help="Authenticated GET endpoint to benchmark")
+    parser.add_argument("--email", default="admin@xebia.com")
+    parser.add_argument("--password", default="Admin123!")
+    parser.add_argument("--concurrency", default="1,4,16,64,128", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency level")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60.0) as client:
+        token = await login(client, args.email, args.password)
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        # Warm up connections and server-side caches
+        await run_level(client, args.path, min(levels), 1.0)
+
+        rows = []
+        for level in levels:
+            result = await run_level(client, args.path, level, args.duration)
+            rows.append([
+                result["concurrency"], result["requests"], result["errors"], result["rps"],
+                result["p50_ms"], result["p95_ms"], result["p99_ms"],
+            ])
+
+    print(f"\nGET {args.path} against {args.url} ({args.duration:.0f}s per level)\n")
+    print_table(["concurrency", "requests", "errors", "req/s", "p50 ms", "p95 ms", "p99 ms"], rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Portfolio estimate cost at 1k / 10k SOWs.
+
+Estimates and sums the same in-memory SOW documents (as
+GET /api/estimates/portfolio reads them) three ways:
+
+  * uncached  - every SOW, stage and training estimate computed from scratch
+  * cold      - estimate caches cleared before each run
+  * warm      - SOW estimates cached at their current version by an earlier
+                run (the common case: most SOWs unchanged since the last report)
+
+All variants are checked to produce the same totals. No MongoDB needed, so
+the time to read stamps and changed SOWs from MongoDB is not included.
+
+    python benchmarks/bench_estimation.py --sizes 1000,10000
+"""
+import argparse
+import random
+import time
+from typing import List
+
+from _common import print_table, summarize_latencies
+from bench_revision_deltas import initial_state
+from cache import sow_estimate_cache
+import estimation
+from estimation import SOW_ESTIMATE_PROJECTION, SOW_PORTFOLIO_STAMP_PROJECTION, cached_estimate, estimate_sow, summarize_portfolio
+
+def make_documents(count: int, seed: int) -> List[dict]:
+    """SOW documents with the stamp and estimate input fields."""
+    rng = random.Random(seed)
+    fields = {field.split(".")[0] for field in {**SOW_PORTFOLIO_STAMP_PROJECTION, **SOW_ESTIMATE_PROJECTION}}
+    documents = []
+    for index in range(count):
+        state = initial_state(rng)
+        state.update(id=f"sow-{index:06d}", updatedAt=1700000000000 + index, currentVersion=rng.randint(1, 40))
+        documents.append({field: state[field] for field in fields if field in state})
+    return documents
+
+def clear_caches():
+    sow_estimate_cache.clear()
+    estimation.estimate_stage.cache_clear()
+    estimation.estimate_training.cache_clear()
+
+def uncached_portfolio(documents: List[dict]) -> dict:
+    return summarize_portfolio((document, estimate_sow(document)) for document in documents)
+
+def cached_portfolio(documents: List[dict]) -> dict:
+    return summarize_portfolio((document, cached_estimate(document)) for document in documents)
+
+def time_runs(portfolio, documents: List[dict], repeats: int, before_each=None) -> List[float]:
+    latencies = []
+    for _ in range(repeats):
+        if before_each:
+            before_each()
+        started = time.perf_counter()
+        portfolio(documents)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+def run_size(count: int, repeats: int, seed: int) -> List[list]:
+    documents = make_documents(count, seed)
+    rows = []
+
+    cached_stage, cached_training = estimation.estimate_stage, estimation.estimate_training
+    estimation.estimate_stage = cached_stage.__wrapped__
+    estimation.estimate_training = cached_training.__wrapped__
+    try:
+        expected = uncached_portfolio(documents)["totals"]
+        uncached = time_runs(uncached_portfolio, documents, repeats)
+    finally:
+        estimation.estimate_stage, estimation.estimate_training = cached_stage, cached_training
+
+    cold = time_runs(cached_portfolio, documents, repeats, before_each=clear_caches)
+    assert cached_portfolio(documents)["totals"] == expected, "cached estimate differs"
+    warm = time_runs(cached_portfolio, documents, repeats)
+
+    baseline_p50 = summarize_latencies(uncached)["p50_ms"]
+    for name, latencies in (("uncached", uncached), ("cold", cold), ("warm", warm)):
+        stats = summarize_latencies(latencies)
+        rows.append([count, name, stats["p50_ms"], stats["p95_ms"], baseline_p50 / stats["p50_ms"]])
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000", help="Comma-separated SOW counts")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rows = []
+    for count in (int(size) for size in args.sizes.split(",")):
+        rows.extend(run_size(count, args.repeats, args.seed))
+
+    print()
+    print_table(["SOWs", "variant", "p50 ms", "p95 ms", "speedup vs uncached"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Password verification throughput vs. worker count.
+
+Runs the bcrypt verification that /api/auth/login performs through
+auth.AuthWorkerPool with 1..N workers and reports verifications/sec and the
+worst event-loop stall seen by a 10 ms ticker while the burst runs. The
+"inline" row is the old behaviour: bcrypt called directly on the event loop.
+
+The login endpoint itself is rate limited per IP, so this measures the CPU
+path in-process rather than over HTTP. No MongoDB needed.
+
+    python benchmarks/bench_login_throughput.py --logins 64 --kind thread
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from _common import print_table
+from auth import AuthWorkerPool, get_password_hash, verify_password
+
+PASSWORD = "Bench1234!"
+
+async def measure(run_one, logins: int) -> dict:
+    """Run `logins` verifications concurrently while tracking event-loop lag."""
+    max_lag = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal max_lag
+        interval = 0.01
+        while not done.is_set():
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            max_lag = max(max_lag, time.perf_counter() - expected)
+
+    tick_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(run_one() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await tick_task
+
+    assert all(results), "verification failed"
+    return {"rate": logins / elapsed, "elapsed": elapsed, "max_lag_ms": max_lag * 1000}
+
+async def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64, help="Concurrent logins per run")
+    parser.add_argument("--kind", choices=["thread", "process"], default="thread")
+    parser.add_argument(
+        "--workers", default=",".join(str(n) for n in sorted({1, 2, 4, 8, cores}) if n <= cores),
+        help="Comma-separated worker counts"
+    )
+    args = parser.parse_args()
+
+    hashed = get_password_hash(PASSWORD)
+    rows = []
+
+    async def inline():
+        return verify_password(PASSWORD, hashed)
+
+    result = await measure(inline, args.logins)
+    rows.append(["inline (no pool)", "-", result["rate"], result["elapsed"], result["max_lag_ms"]])
+
+    for workers in (int(n) for n in args.workers.split(",")):
+        pool = AuthWorkerPool(max_workers=workers, max_pending=args.logins, kind=args.kind)
+        await pool.run(verify_password, PASSWORD, hashed)  # start workers before timing
+
+        async def pooled():
+            return await pool.run(verify_password, PASSWORD, hashed)
+
+        result = await measure(pooled, args.logins)
+        pool.shutdown()
+        rows.append([f"{args.kind} pool", workers, result["rate"], result["elapsed"], result["max_lag_ms"]])
+
+    print(f"\n{args.logins} concurrent logins, {cores} CPU cores\n")
+    print_table(["mode", "workers", "logins/s", "seconds", "max loop stall ms"], rows)
+
+if __name__ == "__main__":
+    asyncio.run(main())
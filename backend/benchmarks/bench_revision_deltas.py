@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Storage and rebuild-cost harness for delta-encoded SOW revisions.
+
+Replays a random but realistic edit sequence on one SOW and measures, for
+the old full-snapshot scheme and the delta scheme with keyframes:
+
+  * BSON bytes written per revision (write amplification)
+  * total history size
+  * time to rebuild a random historical version
+
+Runs in-process with the same functions SOWService uses; no MongoDB needed.
+
+    python benchmarks/bench_revision_deltas.py --edits 500 --keyframe-interval 20
+"""
+import argparse
+import copy
+import random
+import time
+
+import bson
+
+from _common import print_table, summarize_latencies
+import revisions
+from revisions import diff_states, revert_changes
+
+def make_stage(rng: random.Random, index: int) -> dict:
+    """Build a migration stage with realistic text sizes."""
+    return {
+        "stage": rng.choice(["repository-migration", "cicd-migration", "training-sessions"]),
+        "description": f"Stage {index}: migrate workloads and validate cutover. " * 6,
+        "technicalDetails": "Use GEI for repositories, convert pipelines with Actions Importer. " * 12,
+        "timelineWeeks": rng.randint(1, 12),
+        "automated": rng.random() < 0.5,
+        "githubMigrationType": None,
+        "repositoryInventory": {
+            "totalRepositories": rng.randint(10, 5000), "publicRepos": 0, "privateRepos": 0,
+            "archivedRepos": 0, "totalSizeGB": 120.5, "languages": ["Java", "TypeScript", "Go"],
+            "hasLFS": True, "hasSubmodules": False, "averageRepoSizeMB": 24.1, "usersToMigrate": 300,
+        },
+        "estimatedManHours": float(rng.randint(40, 800)),
+        "includeCICDMigration": None,
+        "cicdPlatform": None,
+        "cicdDetails": None,
+    }
+
+def initial_state(rng: random.Random) -> dict:
+    """Versioned state of a freshly created SOW."""
+    return {
+        "projectName": "Enterprise SCM consolidation",
+        "projectDescription": "Consolidate Bitbucket, GitLab and TFS estates into GitHub Enterprise. " * 10,
+        "clientOrganization": "Acme Corp",
+        "includeMigration": True,
+        "includeTraining": True,
+        "migrationStages": [make_stage(rng, i) for i in range(4)],
+        "selectedTrainings": [{"moduleId": f"gh-{i}", "participantCount": 20} for i in range(5)],
+        "id": "bench-sow",
+        "clientId": "bench-client",
+        "clientName": "Bench Client",
+        "status": "draft",
+        "createdAt": 1700000000000,
+        "submittedAt": None,
+        "approvedAt": None,
+        "currentApproverId": None,
+        "estimatedValue": 250000.0,
+        "estimatedDuration": 24.0,
+    }
+
+def random_edit(rng: random.Random, state: dict, step: int) -> dict:
+    """Return a new state with one typical form edit applied."""
+    new_state = copy.deepcopy(state)
+    kind = rng.random()
+    if kind < 0.3:
+        new_state["migrationStages"][rng.randrange(len(new_state["migrationStages"]))]["timelineWeeks"] = rng.randint(1, 20)
+    elif kind < 0.45:
+        new_state["status"] = rng.choice(["draft", "pending", "changes-requested", "approved"])
+    elif kind < 0.6:
+        new_state["estimatedValue"] = float(rng.randint(50, 900) * 1000)
+    elif kind < 0.7:
+        new_state["projectName"] = f"Enterprise SCM consolidation (rev {step})"
+    elif kind < 0.8:
+        new_state["selectedTrainings"][rng.randrange(5)]["participantCount"] = rng.randint(5, 200)
+    elif kind < 0.9 and len(new_state["migrationStages"]) < 8:
+        new_state["migrationStages"].append(make_stage(rng, len(new_state["migrationStages"])))
+    elif len(new_state["migrationStages"]) > 1:
+        new_state["migrationStages"].pop()
+    else:
+        new_state["projectDescription"] += f" Amended in revision {step}."
+    return new_state
+
+def revision_bytes(doc: dict) -> int:
+    return len(bson.encode(doc))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--edits", type=int, default=500)
+    parser.add_argument("--keyframe-interval", type=int, default=revisions.REVISION_KEYFRAME_INTERVAL)
+    parser.add_argument("--rebuilds", type=int, default=500, help="Random versions to rebuild")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    revisions.REVISION_KEYFRAME_INTERVAL = args.keyframe_interval
+
+    states = {1: initial_state(rng)}
+    snapshot_revisions = []
+    delta_revisions = {}
+    base_fields = {"id": "x" * 36, "sowId": "x" * 36, "timestamp": 0, "changedBy": "x" * 36,
+                   "changedByName": "Bench User", "changeDescription": "Updated 1 field(s)"}
+
+    state = states[1]
+    for step in range(args.edits):
+        new_state = random_edit(rng, state, step)
+        version = len(states) + 1
+        changes = diff_states(state, new_state)
+
+        # Old scheme: top-level old/new values plus a full pre-update snapshot
+        top_level = [
+            {"field": field, "oldValue": state[field], "newValue": new_state[field]}
+            for field in new_state if state[field] != new_state[field]
+        ]
+        snapshot_revisions.append({**base_fields, "version": version, "changes": top_level, "snapshot": state})
+
+        delta = {**base_fields, "version": version, "changes": changes}
+        if revisions.is_keyframe(version):
+            delta["snapshot"] = state
+        delta_revisions[version] = delta
+
+        states[version] = new_state
+        state = new_state
+
+    snapshot_sizes = [revision_bytes(r) for r in snapshot_revisions]
+    delta_sizes = [revision_bytes(r) for r in delta_revisions.values()]
+    current_version = len(states)
+
+    def rebuild(version: int) -> dict:
+        # Mirrors SOWService.get_sow_at_version without the database round trip
+        pending = []
+        base = None
+        for newer in range(version + 1, current_version + 1):
+            revision = delta_revisions[newer]
+            if revision.get("snapshot") is not None:
+                base = copy.deepcopy(revision["snapshot"])
+                break
+            pending.append(revision["changes"])
+        if base is None:
+            base = copy.deepcopy(states[current_version])
+        for changes in reversed(pending):
+            revert_changes(base, changes)
+        return base
+
+    latencies = []
+    for _ in range(args.rebuilds):
+        version = rng.randint(1, current_version)
+        started = time.perf_counter()
+        rebuilt = rebuild(version)
+        latencies.append(time.perf_counter() - started)
+        assert rebuilt == states[version], f"version {version} rebuilt incorrectly"
+    rebuild_stats = summarize_latencies(latencies)
+
+    snapshot_total = sum(snapshot_sizes)
+    delta_total = sum(delta_sizes)
+    print(f"\n{args.edits} edits, keyframe every {args.keyframe_interval} versions, "
+          f"SOW state {revision_bytes(state) / 1024:,.1f} KiB\n")
+    print_table(
+        ["scheme", "avg bytes/revision", "max bytes/revision", "history KiB"],
+        [
+            ["full snapshots", sum(snapshot_sizes) / len(snapshot_sizes), max(snapshot_sizes), snapshot_total / 1024],
+            ["deltas + keyframes", sum(delta_sizes) / len(delta_sizes), max(delta_sizes), delta_total / 1024],
+        ],
+    )
+    print(f"\nStorage reduction: {snapshot_total / delta_total:,.1f}x")
+    print(f"Rebuild random version ({args.rebuilds} samples, all verified): "
+          f"p50 {rebuild_stats['p50_ms']:.3f} ms, p99 {rebuild_stats['p99_ms']:.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Read-latency benchmark: embedded revisionHistory vs. the sow_revisions collection.
+
+Builds the same SOW twice in a scratch database: once with N revisions
+embedded in the document (the old layout) and once with the revisions in
+sow_revisions (the current layout). It then times reading the SOW by id,
+which is what every GET/PUT pays, and reading one page of history.
+
+Requires a MongoDB instance (MONGODB_URL, default mongodb://localhost:27017).
+The scratch database is dropped afterwards.
+
+    python benchmarks/bench_revision_storage.py --revisions 500 1000 --reads 500
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+
+import bson
+from pymongo import AsyncMongoClient
+
+from _common import print_table, summarize_latencies
+from crud import SOWService
+
+def make_sow(sow_id: str, revisions: int) -> dict:
+    """Build a SOW document with a few realistic migration stages."""
+    now = int(time.time() * 1000)
+    stages = [
+        {
+            "stage": "repository-migration",
+            "description": "Migrate repositories from Bitbucket Server to GitHub Enterprise Cloud. " * 4,
+            "technicalDetails": "Use GEI with LFS and submodule handling, mirror branch protections. " * 8,
+            "timelineWeeks": 8,
+            "automated": True,
+            "estimatedManHours": 320.0,
+        }
+        for _ in range(3)
+    ]
+    return {
+        "id": sow_id,
+        "projectName": "Benchmark migration",
+        "projectDescription": "Benchmark SOW used to compare revision storage layouts. " * 5,
+        "clientId": "bench-client",
+        "clientName": "Bench Client",
+        "clientOrganization": "Bench Corp",
+        "includeMigration": True,
+        "includeTraining": False,
+        "migrationStages": stages,
+        "selectedTrainings": [],
+        "status": "draft",
+        "createdAt": now,
+        "updatedAt": now,
+        "approvalHistory": [],
+        "currentVersion": revisions + 1,
+    }
+
+def make_revision(sow: dict, version: int) -> dict:
+    """Build a revision entry in the shape written by SOWService.update_sow."""
+    snapshot = {k: v for k, v in sow.items() if k not in ("currentVersion", "revisionHistory")}
+    return {
+        "id": str(uuid.uuid4()),
+        "version": version,
+        "timestamp": sow["createdAt"] + version,
+        "changedBy": "bench-user",
+        "changedByName": "Bench User",
+        "changeDescription": "Updated 1 field(s)",
+        "changes": [{"field": "projectName", "oldValue": f"v{version - 1}", "newValue": f"v{version}"}],
+        "snapshot": snapshot,
+    }
+
+async def time_reads(operation, reads: int) -> dict:
+    """Await operation() `reads` times and summarize the latencies."""
+    latencies = []
+    for _ in range(reads):
+        started = time.perf_counter()
+        await operation()
+        latencies.append(time.perf_counter() - started)
+    return summarize_latencies(latencies)
+
+async def bench(db, revisions: int, reads: int) -> list:
+    """Return result rows for one history length."""
+    service = SOWService(db)
+
+    embedded_id = f"embedded-{revisions}"
+    embedded = make_sow(embedded_id, revisions)
+    embedded["revisionHistory"] = [make_revision(embedded, v) for v in range(2, revisions + 2)]
+    await db.sows_embedded.insert_one(embedded)
+
+    separate_id = f"separate-{revisions}"
+    separate = make_sow(separate_id, revisions)
+    await db.sows.insert_one(separate)
+    revision_docs = [dict(make_revision(separate, v), sowId=separate_id) for v in range(2, revisions + 2)]
+    await db.sow_revisions.insert_many(revision_docs)
+
+    embedded_size = len(bson.encode({k: v for k, v in embedded.items() if k != "_id"}))
+    separate_size = len(bson.encode({k: v for k, v in separate.items() if k != "_id"}))
+
+    async def read_embedded():
+        await db.sows_embedded.find_one({"id": embedded_id})
+
+    async def read_embedded_page():
+        await db.sows_embedded.find_one(
+            {"id": embedded_id}, {"revisionHistory": {"$slice": -20}}
+        )
+
+    async def read_separate():
+        await service.get_sow_by_id(separate_id)
+
+    async def read_separate_page():
+        await service.get_revisions_page(separate_id, limit=20)
+
+    rows = []
+    for layout, read, size in (
+        ("embedded: read SOW", read_embedded, embedded_size),
+        ("collection: read SOW", read_separate, separate_size),
+        ("embedded: last 20 revisions", read_embedded_page, embedded_size),
+        ("collection: last 20 revisions", read_separate_page, separate_size),
+    ):
+        await read()  # warm up
+        stats = await time_reads(read, reads)
+        rows.append([revisions, layout, f"{size / 1024:,.0f} KiB", stats["p50_ms"], stats["p99_ms"]])
+    return rows
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--revisions", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--reads", type=int, default=300, help="Timed reads per layout")
+    args = parser.parse_args()
+
+    client = AsyncMongoClient(os.getenv("MONGODB_URL", "mongodb://localhost:27017"))
+    db_name = f"sowgen_bench_{uuid.uuid4().hex[:8]}"
+    db = client[db_name]
+    try:
+        await db.sow_revisions.create_index([("sowId", 1), ("version", -1)], unique=True)
+        rows = []
+        for revisions in args.revisions:
+            rows.extend(await bench(db, revisions, args.reads))
+    finally:
+        await client.drop_database(db_name)
+        await client.close()
+
+    print(f"\nSOW read latency by revision storage layout ({args.reads} reads each)\n")
+    print_table(["revisions", "layout", "SOW doc size", "p50 ms", "p99 ms"], rows)
+
+if __name__ == "__main__":
+    asyncio.run(main())
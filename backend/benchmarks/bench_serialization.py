@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+List-endpoint serialization cost at 100 / 1k / 10k SOWs.
+
+Serves the same in-memory SOW documents through four variants of a list
+endpoint, called in-process over ASGI so only routing and serialization are
+measured (no MongoDB needed):
+
+  * response_model   - build SOW models, let FastAPI re-validate against
+                       response_model=List[SOW] and JSON-encode (the old path)
+  * model_dump_json  - build SOW models once and serialize with Pydantic
+                       (default path of GET /api/sows)
+  * FAST_JSON        - serialize the trusted documents with orjson, no models
+  * cached payloads  - join already-serialized payloads (SOW payload cache hits)
+
+Every variant's response is checked to decode to the same JSON.
+
+    python benchmarks/bench_serialization.py --sizes 100,1000,10000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import List
+
+import httpx
+from fastapi import FastAPI, Response
+
+from _common import print_table, summarize_latencies
+from bench_revision_deltas import initial_state
+from models import SOW
+from serialization import model_json, sow_document_json
+
+def make_documents(count: int, seed: int) -> List[dict]:
+    """SOW documents as SOWService reads them (SOW_DOCUMENT_PROJECTION)."""
+    rng = random.Random(seed)
+    documents = []
+    for index in range(count):
+        state = initial_state(rng)
+        state.update(id=f"sow-{index:06d}", updatedAt=1700000000000 + index, currentVersion=rng.randint(1, 40))
+        state["approvalHistory"] = [{
+            "id": f"comment-{index}", "approverId": "approver", "approverName": "Xebia Approver",
+            "comment": "Looks good, please confirm the training headcount.", "timestamp": 1700000000000,
+            "action": "comment",
+        }]
+        documents.append(SOW(**state).model_dump(mode="json", exclude={"revisionHistory"}))
+    return documents
+
+def build_app(documents: List[dict]) -> FastAPI:
+    bench = FastAPI()
+    cached = [sow_document_json(document) for document in documents]
+
+    @bench.get("/response-model", response_model=List[SOW])
+    async def response_model():
+        return [SOW(**document) for document in documents]
+
+    @bench.get("/model-dump-json")
+    async def model_dump_json():
+        return Response(b"[" + b",".join(model_json(SOW(**document)) for document in documents) + b"]",
+                        media_type="application/json")
+
+    @bench.get("/fast-json")
+    async def fast_json():
+        return Response(b"[" + b",".join(sow_document_json(document) for document in documents) + b"]",
+                        media_type="application/json")
+
+    @bench.get("/cached")
+    async def cached_payloads():
+        return Response(b"[" + b",".join(cached) + b"]", media_type="application/json")
+
+    return bench
+
+VARIANTS = [
+    ("response_model", "/response-model"),
+    ("model_dump_json", "/model-dump-json"),
+    ("FAST_JSON", "/fast-json"),
+    ("cached payloads", "/cached"),
+]
+
+async def run_size(count: int, repeats: int, seed: int) -> List[list]:
+    documents = make_documents(count, seed)
+    transport = httpx.ASGITransport(app=build_app(documents))
+    rows = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        expected = None
+        baseline_p50 = None
+        for name, path in VARIANTS:
+            response = await client.get(path)
+            body = json.loads(response.content)
+            if expected is None:
+                expected = body
+            assert body == expected, f"{name} returned a different document"
+
+            latencies = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - started)
+            stats = summarize_latencies(latencies)
+            baseline_p50 = baseline_p50 or stats["p50_ms"]
+            rows.append([count, name, stats["p50_ms"], stats["p95_ms"],
+                         len(response.content) / 1024 / 1024, baseline_p50 / stats["p50_ms"]])
+    return rows
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,10000", help="Comma-separated SOW counts")
+    parser.add_argument("--requests", type=int, default=200000,
+                        help="Roughly this many SOWs serialized per variant (repeats = requests / size, min 3)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rows = []
+    for count in (int(size) for size in args.sizes.split(",")):
+        rows.extend(await run_size(count, max(3, args.requests // count), args.seed))
+
+    print()
+    print_table(["SOWs", "path", "p50 ms", "p95 ms", "response MiB", "speedup vs response_model"], rows)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+API cold start time.
+
+Measures, in fresh processes:
+
+  * import    - `import main` (module imports, app and route setup)
+  * seeding   - hashing the demo users' passwords one after another vs. in
+                parallel on the auth worker pool (one per AUTH_WORKERS
+                worker, so only faster with more than one CPU; no MongoDB
+                needed)
+  * listening - launching uvicorn until `GET /` answers (needs MongoDB only
+                for the readiness columns)
+  * ready     - launching uvicorn until `GET /ready` answers 200: MongoDB
+                reachable, indexes present and demo users seeded
+
+Server starts run against a throwaway database: the first start ("cold")
+creates indexes and seeds demo users, later starts ("warm") find both in
+place. The database is dropped afterwards.
+
+    python benchmarks/bench_startup.py --repeats 5
+    python benchmarks/bench_startup.py --no-serve    # without MongoDB
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+import uuid
+from typing import List, Optional
+
+from _common import print_table, summarize_latencies
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+IMPORT_SNIPPET = "import time; started = time.perf_counter(); import main; print(time.perf_counter() - started)"
+
+def child_env(**overrides) -> dict:
+    env = dict(os.environ, JOB_WORKER_IN_PROCESS="false", **overrides)
+    env.setdefault("SECRET_KEY", uuid.uuid4().hex * 2)
+    return env
+
+def time_import(repeats: int) -> List[float]:
+    """Seconds to import main in a fresh interpreter."""
+    samples = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND_DIR, env=child_env(),
+            capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return samples
+
+async def hash_parallel(passwords: List[str]):
+    from auth import get_password_hash_async
+    return await asyncio.gather(*(get_password_hash_async(password) for password in passwords))
+
+def time_seeding(repeats: int) -> List[list]:
+    """Demo password hashing: serial (old startup) vs. parallel on the auth pool."""
+    os.environ.update(child_env())
+    from auth import auth_pool, get_password_hash
+    from main import DEMO_USERS
+
+    passwords = [user.password for user in DEMO_USERS]
+    serial, parallel = [], []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for password in passwords:
+            get_password_hash(password)
+        serial.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        asyncio.run(hash_parallel(passwords))
+        parallel.append(time.perf_counter() - started)
+    auth_pool.shutdown()
+
+    baseline = summarize_latencies(serial)["p50_ms"]
+    return [
+        [name, stats["p50_ms"], stats["p95_ms"], baseline / stats["p50_ms"]]
+        for name, stats in (("serial", summarize_latencies(serial)), ("parallel", summarize_latencies(parallel)))
+    ]
+
+def wait_for(url: str, deadline: float) -> Optional[float]:
+    """Poll url until it answers 200; returns the perf_counter time it did."""
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter()
+        except OSError:
+            pass
+        time.sleep(0.01)
+    return None
+
+def time_server_start(port: int, db_name: str, timeout: float) -> tuple:
+    """(seconds until GET / answers, seconds until GET /ready answers) for one uvicorn start."""
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=child_env(MONGODB_DB_NAME=db_name),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = started + timeout
+        listening = wait_for(f"http://127.0.0.1:{port}/", deadline)
+        ready = wait_for(f"http://127.0.0.1:{port}/ready", deadline)
+    finally:
+        server.terminate()
+        server.wait()
+    if listening is None or ready is None:
+        raise RuntimeError(f"Server did not become ready within {timeout}s (is MongoDB running?)")
+    return listening - started, ready - started
+
+def drop_database(db_name: str):
+    from pymongo import MongoClient
+    client = MongoClient(os.getenv("MONGODB_URL", "mongodb://localhost:27017"))
+    client.drop_database(db_name)
+    client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for one server start")
+    parser.add_argument("--no-serve", action="store_true", help="Skip the uvicorn starts (no MongoDB needed)")
+    args = parser.parse_args()
+
+    imports = summarize_latencies(time_import(args.repeats))
+    print()
+    print_table(["phase", "p50 ms", "p95 ms"], [["import main", imports["p50_ms"], imports["p95_ms"]]])
+
+    print()
+    print_table(["demo seeding hashes", "p50 ms", "p95 ms", "speedup vs serial"], time_seeding(args.repeats))
+
+    if args.no_serve:
+        return
+
+    db_name = f"sowgen_bench_startup_{uuid.uuid4().hex[:8]}"
+    try:
+        runs = [time_server_start(args.port, db_name, args.timeout) for _ in range(args.repeats + 1)]
+    finally:
+        drop_database(db_name)
+
+    rows = []
+    for name, samples in (("cold", runs[:1]), ("warm", runs[1:])):
+        listening = summarize_latencies([run[0] for run in samples])
+        ready = summarize_latencies([run[1] for run in samples])
+        rows.append([name, len(samples), listening["p50_ms"], ready["p50_ms"], ready["p95_ms"]])
+    print()
+    print_table(["start", "runs", "listening p50 ms", "ready p50 ms", "ready p95 ms"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Concurrent-writer stress test for SOWService.update_sow.
+
+Many writers hammer the same SOW at once. Half of them send expectedVersion
+and re-read/retry when they get a version conflict (like a well-behaved
+client handling a 409); the other half write blindly and rely on the
+service's internal retry. Every write sets a unique value, so every
+successful write must produce exactly one revision.
+
+Afterwards the script checks that:
+
+  * currentVersion == 1 + number of successful writes
+  * revision versions are exactly 2..currentVersion with no gaps or duplicates
+  * every successful write's value appears in exactly one revision
+  * replaying each revision's delta onto the rebuilt previous version yields
+    the rebuilt next version, ending at the stored document
+
+Requires a MongoDB instance (MONGODB_URL, default mongodb://localhost:27017).
+The scratch database is dropped afterwards. Exits non-zero on any violation.
+
+    python benchmarks/stress_update_sow.py --writers 32 --writes 25
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+from pymongo import AsyncMongoClient
+
+from _common import print_table
+from crud import SOWService, SOWVersionConflict
+from models import SOWCreate, SOWUpdate
+from revisions import UNVERSIONED_FIELDS, apply_changes
+
+async def careful_writer(service: SOWService, sow_id: str, writer: int, writes: int, stats: dict):
+    """Write with expectedVersion, re-reading and retrying on conflict."""
+    for n in range(writes):
+        value = f"careful-{writer}-{n}"
+        while True:
+            sow = await service.get_sow_by_id(sow_id)
+            try:
+                await service.update_sow(
+                    sow_id, SOWUpdate(projectName=value, expectedVersion=sow.currentVersion),
+                    f"writer-{writer}", f"Writer {writer}"
+                )
+                stats["values"].append(value)
+                break
+            except SOWVersionConflict:
+                stats["conflicts"] += 1
+
+async def blind_writer(service: SOWService, sow_id: str, writer: int, writes: int, stats: dict):
+    """Write without expectedVersion; the service retries lost races internally."""
+    for n in range(writes):
+        value = f"blind-{writer}-{n}"
+        try:
+            await service.update_sow(sow_id, SOWUpdate(projectName=value), f"writer-{writer}", f"Writer {writer}")
+            stats["values"].append(value)
+        except SOWVersionConflict:
+            stats["exhausted"] += 1
+
+async def verify(service: SOWService, sow_id: str, values: list) -> list:
+    """Return a list of invariant violations (empty if all hold)."""
+    problems = []
+    final = await service.get_sow_by_id(sow_id)
+    revisions, _ = await service.get_revisions_page(sow_id)
+    revisions.sort(key=lambda revision: revision.version)
+
+    if final.currentVersion != 1 + len(values):
+        problems.append(f"currentVersion {final.currentVersion} != 1 + {len(values)} successful writes")
+
+    versions = [revision.version for revision in revisions]
+    if versions != list(range(2, final.currentVersion + 1)):
+        problems.append(f"revision versions are not contiguous 2..{final.currentVersion}")
+
+    recorded = [
+        change.newValue for revision in revisions for change in revision.changes
+        if change.field == "projectName"
+    ]
+    if sorted(recorded) != sorted(values):
+        problems.append("successful writes and recorded projectName changes differ")
+
+    previous = await service.get_sow_at_version(sow_id, 1)
+    for revision in revisions:
+        expected = apply_changes(
+            previous.model_dump(mode="json", exclude=UNVERSIONED_FIELDS),
+            [change.model_dump() for change in revision.changes]
+        )
+        rebuilt = await service.get_sow_at_version(sow_id, revision.version)
+        if rebuilt is None or rebuilt.model_dump(mode="json", exclude=UNVERSIONED_FIELDS) != expected:
+            problems.append(f"replaying revision {revision.version} does not match the rebuilt version")
+            break
+        previous = rebuilt
+
+    if previous.model_dump(mode="json", exclude=UNVERSIONED_FIELDS) != final.model_dump(mode="json", exclude=UNVERSIONED_FIELDS):
+        problems.append("replayed history does not end at the stored document")
+    return problems
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=32, help="Concurrent writers (half careful, half blind)")
+    parser.add_argument("--writes", type=int, default=25, help="Successful writes attempted per writer")
+    args = parser.parse_args()
+
+    client = AsyncMongoClient(os.getenv("MONGODB_URL", "mongodb://localhost:27017"), maxPoolSize=args.writers * 2)
+    db_name = f"sowgen_stress_{uuid.uuid4().hex[:8]}"
+    db = client[db_name]
+    try:
+        await db.sow_revisions.create_index([("sowId", 1), ("version", -1)], unique=True)
+        service = SOWService(db)
+        sow = await service.create_sow(SOWCreate(
+            clientId="stress-client", clientName="Stress Client", projectName="initial",
+            projectDescription="Concurrent update stress test", clientOrganization="Stress Corp"
+        ))
+
+        stats = {"values": [], "conflicts": 0, "exhausted": 0}
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            (careful_writer if writer % 2 == 0 else blind_writer)(service, sow.id, writer, args.writes, stats)
+            for writer in range(args.writers)
+        ))
+        elapsed = time.perf_counter() - started
+
+        problems = await verify(service, sow.id, stats["values"])
+    finally:
+        await client.drop_database(db_name)
+        await client.close()
+
+    print(f"\n{args.writers} writers x {args.writes} writes on one SOW\n")
+    print_table(
+        ["successful writes", "409 conflicts", "blind writes given up", "seconds", "writes/s"],
+        [[len(stats["values"]), stats["conflicts"], stats["exhausted"], elapsed, len(stats["values"]) / elapsed]],
+    )
+    if problems:
+        print("\n❌ Invariant violations:")
+        for problem in problems:
+            print(f"   - {problem}")
+        sys.exit(1)
+    print("\n✅ All invariants hold")
+
+if __name__ == "__main__":
+    asyncio.run(main())
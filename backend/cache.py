@@ -0,0 +1,188 @@
+"""
+Simple in-memory caches for hot lookups.
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import os
+import threading
+import time
+
+class TTLCache:
+    """
+    Thread-safe bounded LRU cache with per-entry time-to-live.
+    Tracks hit/miss/eviction counters for observability.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60.0):
+        """
+        Initialize cache.
+
+        Args:
+            max_entries: Maximum number of entries kept before evicting the least recently used
+            ttl_seconds: Seconds an entry stays valid after it is stored
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        """Store value under key, evicting the least recently used entry if full."""
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """Drop a single key."""
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Any], bool]):
+        """Drop every entry whose value matches predicate."""
+        with self.lock:
+            stale = [key for key, (_, value) in self.entries.items() if predicate(value)]
+            for key in stale:
+                del self.entries[key]
+
+    def clear(self):
+        """Drop all entries (counters are kept)."""
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss counters."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "maxEntries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRatio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+class PayloadCache:
+    """
+    Thread-safe LRU cache of serialized payloads bounded by total size in bytes.
+
+    Each entry carries a version tag; a lookup only hits when the caller's
+    current version matches, so an entry can never be served stale even if
+    an invalidation was missed (e.g. a write handled by another worker).
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize cache.
+
+        Args:
+            max_bytes: Maximum total payload size kept before evicting the least recently used
+        """
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.entries: "OrderedDict[Hashable, Tuple[Hashable, bytes]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, version: Hashable) -> Optional[bytes]:
+        """Return the payload cached for key at this version, or None."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, version: Hashable, payload: bytes):
+        """Store payload for key at version, evicting least recently used entries to stay in budget."""
+        if len(payload) > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size_bytes -= len(previous[1])
+            self.entries[key] = (version, payload)
+            self.size_bytes += len(payload)
+            while self.size_bytes > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.size_bytes -= len(evicted)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """Drop a single key."""
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.size_bytes -= len(entry[1])
+
+    def clear(self):
+        """Drop all entries (counters are kept)."""
+        with self.lock:
+            self.entries.clear()
+            self.size_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss counters."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "bytes": self.size_bytes,
+                "maxBytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRatio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+# Resolved principals for get_current_user, keyed by JWT subject (email).
+# Per-process: other workers see user changes once their entry's TTL expires.
+user_cache = TTLCache(
+    max_entries=int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000")),
+    ttl_seconds=float(os.getenv("USER_CACHE_TTL_SECONDS", "60")),
+)
+
+# Serialized SOW responses keyed by SOW id, versioned by (currentVersion, updatedAt)
+sow_payload_cache = PayloadCache(
+    max_bytes=int(os.getenv("SOW_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
+
+# Rendered SOW documents keyed by (SOW id, format), versioned by (currentVersion, updatedAt)
+render_cache = PayloadCache(
+    max_bytes=int(os.getenv("RENDER_CACHE_MAX_BYTES", str(128 * 1024 * 1024))),
+)
+
+# Per-SOW estimate breakdowns keyed by (SOW id, currentVersion, updatedAt); superseded
+# versions are never looked up again and age out of the LRU
+sow_estimate_cache = TTLCache(
+    max_entries=int(os.getenv("ESTIMATE_CACHE_MAX_ENTRIES", "100000")),
+    ttl_seconds=float(os.getenv("ESTIMATE_CACHE_TTL_SECONDS", "3600")),
+)
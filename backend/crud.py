@@ -1,94 +1,281 @@
 """
 CRUD operations for Users, SOWs, and related data.
 """
-from typing import List, Optional, Dict, Any
-from pymongo.database import Database
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple, Union
+from pymongo import ASCENDING, DESCENDING, DeleteOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from pymongo.asynchronous.database import AsyncDatabase
+from pydantic import ValidationError
 from datetime import datetime, timezone
+import base64
+import json
+import os
 import uuid
 
 from models import (
-    User, UserCreate, UserUpdate,
-    SOW, SOWCreate, SOWUpdate, SOWStatus,
+    User, UserCreate, UserUpdate, UserBulkResult, UserBulkImportResponse,
+    SOW, SOWCreate, SOWUpdate, SOWStatus, SOWSummary, SOWSearchResult,
     ApprovalComment, SOWRevision
 )
-from auth import get_password_hash
+from auth import get_password_hash_async, get_password_hashes_async
+from revisions import UNVERSIONED_FIELDS, diff_states, is_keyframe, revert_changes
+from cache import user_cache, sow_payload_cache
+from estimation import SOW_ESTIMATE_PROJECTION, estimate_fields
+from analytics import rollup_refresher
+from metrics import instrument_methods, service_call_duration
 
+# Newest first; id breaks ties between SOWs created in the same millisecond
+SOW_LIST_SORT = [("createdAt", DESCENDING), ("id", DESCENDING)]
+
+# Revision history lives in the sow_revisions collection; documents written
+# before that change may still embed it, so never load it with the SOW
+SOW_DOCUMENT_PROJECTION = {"_id": 0, "revisionHistory": 0}
+
+# Fields returned for SOWSummary list views
+SOW_SUMMARY_PROJECTION = {"_id": 0, **{field: 1 for field in SOWSummary.model_fields}}
+
+# Fields that identify a SOW's current state (for ETags and payload cache checks)
+SOW_STAMP_PROJECTION = {"_id": 0, "id": 1, "clientId": 1, "createdAt": 1, "currentVersion": 1, "updatedAt": 1}
+
+# Summary fields plus the text relevance score for /api/sows/search
+SOW_SEARCH_PROJECTION = {**SOW_SUMMARY_PROJECTION, "score": {"$meta": "textScore"}}
+
+# Best match first; ties fall back to the list order
+SOW_SEARCH_SORT = [("score", {"$meta": "textScore"}), *SOW_LIST_SORT]
+
+# Deepest search result reachable by paging; each page skips all results before it
+SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "1000"))
+
+# Documents fetched per round trip when streaming SOWs (CSV export)
+EXPORT_BATCH_SIZE = 500
+
+# Upper bound for rows in one bulk import (request or job)
+BULK_IMPORT_MAX_ROWS = int(os.getenv("BULK_IMPORT_MAX_ROWS", "10000"))
+
+# Updating any of these recomputes estimatedValue/estimatedDuration
+ESTIMATE_INPUT_FIELDS = {"includeMigration", "includeTraining", "migrationStages", "selectedTrainings"}
+
+# Attempts for updates without expectedVersion that keep losing a version race
+SOW_UPDATE_ATTEMPTS = 5
+
+def status_timestamps(old_status: str, new_status: Optional[str], timestamp: int) -> Dict[str, int]:
+    """submittedAt/approvedAt to record when a SOW moves into pending or approved."""
+    if new_status == old_status:
+        return {}
+    if new_status == SOWStatus.PENDING.value:
+        return {"submittedAt": timestamp}
+    if new_status == SOWStatus.APPROVED.value:
+        return {"approvedAt": timestamp}
+    return {}
+
+class SOWVersionConflict(Exception):
+    """Raised when a SOW update loses the optimistic concurrency check on currentVersion."""
+    
+    def __init__(self, sow_id: str, expected_version: Optional[int], current_version: Optional[int]):
+        self.sow_id = sow_id
+        self.expected_version = expected_version
+        self.current_version = current_version
+        super().__init__(
+            f"SOW {sow_id} is at version {current_version}, expected {expected_version}"
+        )
+
+def encode_sow_cursor(created_at: int, sow_id: str) -> str:
+    """Encode the (createdAt, id) sort key of the last returned SOW as an opaque cursor."""
+    raw = json.dumps([created_at, sow_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_sow_cursor(cursor: str) -> Tuple[int, str]:
+    """Decode a cursor produced by encode_sow_cursor. Raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, sow_id = json.loads(raw)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(created_at, int) or not isinstance(sow_id, str):
+        raise ValueError("Invalid cursor")
+    return created_at, sow_id
+
+@instrument_methods(service_call_duration)
 class UserService:
     """Service for user CRUD operations."""
     
-    def __init__(self, db: Database):
+    def __init__(self, db: AsyncDatabase):
         self.collection = db.users
     
-    def create_user(self, user_data: UserCreate) -> User:
+    async def create_user(self, user_data: UserCreate) -> User:
         """Create a new user."""
         user_dict = user_data.model_dump()
         
         # Hash the password
         password = user_dict.pop("password")
-        user_dict["hashed_password"] = get_password_hash(password)
+        user_dict["hashed_password"] = await get_password_hash_async(password)
         
         # Generate ID
         user_dict["id"] = str(uuid.uuid4())
         
         # Insert into database
-        self.collection.insert_one(user_dict)
+        await self.collection.insert_one(user_dict)
         
         # Return user without password
         user_dict.pop("hashed_password")
         return User(**user_dict)
     
-    def get_user_by_id(self, user_id: str) -> Optional[User]:
+    async def create_users_bulk(self, users: List[UserCreate], batch_size: int = 1000) -> List[Union[User, str]]:
+        """
+        Create many users at once.
+        
+        Emails that already exist are skipped before hashing; the remaining
+        passwords are hashed in parallel on the auth worker pool and written
+        with unordered insert_many, so one duplicate does not stop the batch.
+        The unique email index remains the final arbiter for races and
+        duplicates within the submitted list.
+        
+        Returns:
+            One entry per input user, in order: the created User, or an error message
+        """
+        results: List[Union[User, str]] = [""] * len(users)
+        
+        emails = [user.email for user in users]
+        existing = {
+            user_dict["email"]
+            async for user_dict in self.collection.find({"email": {"$in": emails}}, {"_id": 0, "email": 1})
+        }
+        
+        pending = []
+        for index, user in enumerate(users):
+            if user.email in existing:
+                results[index] = "User with this email already exists"
+            else:
+                pending.append(index)
+        
+        hashes = await get_password_hashes_async([users[index].password for index in pending])
+        
+        documents = []
+        for index, hashed_password in zip(pending, hashes):
+            user_dict = users[index].model_dump(exclude={"password"})
+            user_dict["hashed_password"] = hashed_password
+            user_dict["id"] = str(uuid.uuid4())
+            documents.append((index, user_dict))
+        
+        for start in range(0, len(documents), batch_size):
+            batch = documents[start:start + batch_size]
+            failed = {}
+            try:
+                await self.collection.insert_many([user_dict for _, user_dict in batch], ordered=False)
+            except BulkWriteError as e:
+                for error in e.details.get("writeErrors", []):
+                    if error.get("code") == 11000:
+                        failed[error["index"]] = "User with this email already exists"
+                    else:
+                        failed[error["index"]] = error.get("errmsg", "Insert failed")
+            
+            for position, (index, user_dict) in enumerate(batch):
+                if position in failed:
+                    results[index] = failed[position]
+                else:
+                    user_dict.pop("hashed_password")
+                    user_dict.pop("_id", None)
+                    results[index] = User(**user_dict)
+        
+        return results
+    
+    async def import_users(self, rows: List[Dict[str, Any]]) -> UserBulkImportResponse:
+        """
+        Validate raw user rows (JSON objects or CSV records) and create the
+        valid ones with create_users_bulk, reporting the outcome per row.
+        """
+        results: List[Optional[UserBulkResult]] = [None] * len(rows)
+        valid_users = []
+        valid_rows = []
+        for index, row in enumerate(rows):
+            if not isinstance(row, dict):
+                results[index] = UserBulkResult(row=index + 1, status="error", error="Row must be an object")
+                continue
+            email = row.get("email")
+            try:
+                valid_users.append(UserCreate(**row))
+                valid_rows.append(index)
+            except ValidationError as e:
+                message = "; ".join(
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+                )
+                results[index] = UserBulkResult(
+                    row=index + 1, email=email if isinstance(email, str) else None, status="error", error=message
+                )
+        
+        created = await self.create_users_bulk(valid_users) if valid_users else []
+        
+        for index, user_data, outcome in zip(valid_rows, valid_users, created):
+            if isinstance(outcome, User):
+                results[index] = UserBulkResult(row=index + 1, email=outcome.email, status="created", id=outcome.id)
+            else:
+                results[index] = UserBulkResult(row=index + 1, email=user_data.email, status="error", error=outcome)
+        
+        created_count = sum(1 for result in results if result.status == "created")
+        return UserBulkImportResponse(
+            created=created_count,
+            failed=len(results) - created_count,
+            results=results
+        )
+    
+    async def get_user_by_id(self, user_id: str) -> Optional[User]:
         """Get user by ID."""
-        user_dict = self.collection.find_one({"id": user_id}, {"hashed_password": 0})
+        user_dict = await self.collection.find_one({"id": user_id}, {"hashed_password": 0})
         if user_dict:
             user_dict.pop("_id", None)
             return User(**user_dict)
         return None
     
-    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+    async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get user by email (includes hashed_password for authentication)."""
-        user_dict = self.collection.find_one({"email": email})
+        user_dict = await self.collection.find_one({"email": email})
         if user_dict:
             user_dict.pop("_id", None)
             return user_dict
         return None
     
-    def get_all_users(self) -> List[User]:
+    async def get_all_users(self) -> List[User]:
         """Get all users."""
         users = []
-        for user_dict in self.collection.find({}, {"hashed_password": 0}):
+        async for user_dict in self.collection.find({}, {"hashed_password": 0}):
             user_dict.pop("_id", None)
             users.append(User(**user_dict))
         return users
     
-    def update_user(self, user_id: str, user_data: UserUpdate) -> Optional[User]:
+    async def update_user(self, user_id: str, user_data: UserUpdate) -> Optional[User]:
         """Update user information."""
         update_dict = {k: v for k, v in user_data.model_dump().items() if v is not None}
         
         if not update_dict:
-            return self.get_user_by_id(user_id)
+            return await self.get_user_by_id(user_id)
         
-        result = self.collection.update_one(
+        result = await self.collection.update_one(
             {"id": user_id},
             {"$set": update_dict}
         )
         
+        # Cached principals are keyed by email, which may itself have changed
+        user_cache.invalidate_where(lambda user: user.id == user_id)
+        
         if result.modified_count > 0:
-            return self.get_user_by_id(user_id)
+            return await self.get_user_by_id(user_id)
         return None
     
-    def delete_user(self, user_id: str) -> bool:
+    async def delete_user(self, user_id: str) -> bool:
         """Delete a user."""
-        result = self.collection.delete_one({"id": user_id})
+        result = await self.collection.delete_one({"id": user_id})
+        user_cache.invalidate_where(lambda user: user.id == user_id)
         return result.deleted_count > 0
 
+@instrument_methods(service_call_duration)
 class SOWService:
     """Service for SOW CRUD operations."""
     
-    def __init__(self, db: Database):
+    def __init__(self, db: AsyncDatabase):
         self.collection = db.sows
+        self.revisions = db.sow_revisions
     
-    def create_sow(self, sow_data: SOWCreate) -> SOW:
+    async def create_sow(self, sow_data: SOWCreate) -> SOW:
         """Create a new SOW."""
         sow_dict = sow_data.model_dump()
         
@@ -101,97 +288,332 @@ class SOWService:
         
         # Initialize version tracking
         sow_dict["currentVersion"] = 1
-        sow_dict["revisionHistory"] = []
         sow_dict["approvalHistory"] = []
+        sow_dict.update(estimate_fields(sow_data))
         
         # Insert into database
-        self.collection.insert_one(sow_dict)
+        await self.collection.insert_one(sow_dict)
+        rollup_refresher.mark_dirty(sow_dict["clientId"])
         
         # Return SOW
         sow_dict.pop("_id", None)
         return SOW(**sow_dict)
     
-    def get_sow_by_id(self, sow_id: str) -> Optional[SOW]:
+    async def get_sow_by_id(self, sow_id: str) -> Optional[SOW]:
         """Get SOW by ID."""
-        sow_dict = self.collection.find_one({"id": sow_id})
+        sow_dict = await self.collection.find_one({"id": sow_id}, SOW_DOCUMENT_PROJECTION)
         if sow_dict:
-            sow_dict.pop("_id", None)
             return SOW(**sow_dict)
         return None
     
-    def get_all_sows(self, client_id: Optional[str] = None) -> List[SOW]:
+    async def get_all_sows(self, client_id: Optional[str] = None) -> List[SOW]:
         """Get all SOWs, optionally filtered by client."""
-        query = {"clientId": client_id} if client_id else {}
-        sows = []
-        for sow_dict in self.collection.find(query).sort("createdAt", -1):
-            sow_dict.pop("_id", None)
-            sows.append(SOW(**sow_dict))
+        sows, _ = await self.get_sows_page(client_id=client_id)
         return sows
     
-    def update_sow(self, sow_id: str, sow_data: SOWUpdate, user_id: str, user_name: str) -> Optional[SOW]:
-        """Update SOW information."""
-        update_dict = {k: v for k, v in sow_data.model_dump().items() if v is not None}
+    async def get_sows_page(
+        self,
+        client_id: Optional[str] = None,
+        status: Optional[SOWStatus] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        summary: bool = False,
+        validate: bool = True
+    ) -> Tuple[List[Union[SOW, SOWSummary, Dict[str, Any]]], Optional[str]]:
+        """
+        Get SOWs newest first using keyset pagination on (createdAt, id).
         
-        if not update_dict:
-            return self.get_sow_by_id(sow_id)
+        Args:
+            client_id: Only return SOWs owned by this client
+            status: Only return SOWs in this status
+            limit: Page size; None returns every matching SOW
+            cursor: Cursor returned with the previous page
+            summary: Return SOWSummary projections instead of full SOWs
+            validate: False returns the raw documents without building models
+                (for trusted serialization paths)
+            
+        Returns:
+            Tuple of (sows, next_cursor); next_cursor is None on the last page
+        """
+        projection = SOW_SUMMARY_PROJECTION if summary else SOW_DOCUMENT_PROJECTION
+        sow_dicts, next_cursor = await self._find_sows_page(projection, client_id, status, limit, cursor)
+        if not validate:
+            return sow_dicts, next_cursor
+        model = SOWSummary if summary else SOW
+        return [model(**sow_dict) for sow_dict in sow_dicts], next_cursor
+    
+    async def get_sow_stamps_page(
+        self,
+        client_id: Optional[str] = None,
+        status: Optional[SOWStatus] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Same page as get_sows_page, but only each SOW's id, clientId,
+        createdAt, currentVersion and updatedAt (enough to build ETags and
+        check cached payloads without loading full documents).
+        """
+        return await self._find_sows_page(SOW_STAMP_PROJECTION, client_id, status, limit, cursor)
+    
+    async def _find_sows_page(
+        self,
+        projection: Dict[str, Any],
+        client_id: Optional[str],
+        status: Optional[SOWStatus],
+        limit: Optional[int],
+        cursor: Optional[str]
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Run a keyset-paginated SOW query and return raw documents."""
+        query: Dict[str, Any] = {}
+        if client_id:
+            query["clientId"] = client_id
+        if status:
+            query["status"] = status.value
+        if cursor:
+            created_at, sow_id = decode_sow_cursor(cursor)
+            query["$or"] = [
+                {"createdAt": {"$lt": created_at}},
+                {"createdAt": created_at, "id": {"$lt": sow_id}},
+            ]
         
-        # Add updated timestamp
-        update_dict["updatedAt"] = int(datetime.now(timezone.utc).timestamp() * 1000)
+        find_cursor = self.collection.find(query, projection).sort(SOW_LIST_SORT)
+        if limit is not None:
+            # Fetch one extra document to learn whether another page exists
+            find_cursor = find_cursor.limit(limit + 1)
         
-        # Get current SOW for revision tracking
-        current_sow = self.get_sow_by_id(sow_id)
-        if not current_sow:
-            return None
+        sow_dicts = [sow_dict async for sow_dict in find_cursor]
+        
+        next_cursor = None
+        if limit is not None and len(sow_dicts) > limit:
+            sow_dicts = sow_dicts[:limit]
+            next_cursor = encode_sow_cursor(sow_dicts[-1]["createdAt"], sow_dicts[-1]["id"])
+        return sow_dicts, next_cursor
+    
+    async def search_sows(
+        self,
+        text: str,
+        client_id: Optional[str] = None,
+        status: Optional[SOWStatus] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[SOWSearchResult], Optional[str]]:
+        """
+        Full-text search over SOW names, descriptions, organizations, stage
+        details and approval comments using the `sow_text` index.
         
-        # Create revision entry
-        if current_sow:
-            revision_changes = []
-            for field, new_value in update_dict.items():
-                old_value = getattr(current_sow, field, None)
-                if old_value != new_value and field != "updatedAt":
-                    revision_changes.append({
-                        "field": field,
-                        "oldValue": old_value,
-                        "newValue": new_value
-                    })
+        Args:
+            text: MongoDB $text search string ("quoted phrases", -excluded words)
+            client_id: Only return SOWs owned by this client
+            status: Only return SOWs in this status
+            limit: Page size
+            cursor: Cursor returned with the previous page (results already seen)
             
-            if revision_changes:
-                revision = {
-                    "id": str(uuid.uuid4()),
-                    "version": current_sow.currentVersion + 1,
-                    "timestamp": update_dict["updatedAt"],
-                    "changedBy": user_id,
-                    "changedByName": user_name,
-                    "changeDescription": f"Updated {len(revision_changes)} field(s)",
-                    "changes": revision_changes,
-                    "snapshot": current_sow.model_dump(exclude={"revisionHistory", "currentVersion"})
-                }
-                
-                # Increment version
-                update_dict["currentVersion"] = current_sow.currentVersion + 1
-                
-                # Add revision to history
-                self.collection.update_one(
-                    {"id": sow_id},
-                    {"$push": {"revisionHistory": revision}}
-                )
+        Returns:
+            Tuple of (results, next_cursor), most relevant first; next_cursor
+            is None on the last page, or once SEARCH_MAX_RESULTS are reached
         
-        # Update SOW
-        result = self.collection.update_one(
-            {"id": sow_id},
-            {"$set": update_dict}
+        Raises:
+            ValueError: Malformed cursor, or one past SEARCH_MAX_RESULTS
+        """
+        query: Dict[str, Any] = {"$text": {"$search": text}}
+        if client_id:
+            query["clientId"] = client_id
+        if status:
+            query["status"] = status.value
+        
+        # Relevance scores are not unique, so pages are addressed by offset
+        offset = 0
+        if cursor:
+            if not cursor.isdigit():
+                raise ValueError("Invalid cursor")
+            offset = int(cursor)
+            if offset >= SEARCH_MAX_RESULTS:
+                raise ValueError(f"Search results are limited to the first {SEARCH_MAX_RESULTS}; refine the query")
+        limit = min(limit, SEARCH_MAX_RESULTS - offset)
+        
+        find_cursor = (
+            self.collection.find(query, SOW_SEARCH_PROJECTION)
+            .sort(SOW_SEARCH_SORT)
+            .skip(offset)
+            .limit(limit + 1)
         )
+        results = [SOWSearchResult(**sow_dict) async for sow_dict in find_cursor]
         
-        if result.modified_count > 0 or result.matched_count > 0:
-            return self.get_sow_by_id(sow_id)
-        return None
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            if offset + limit < SEARCH_MAX_RESULTS:
+                next_cursor = str(offset + limit)
+        return results, next_cursor
     
-    def delete_sow(self, sow_id: str) -> bool:
-        """Delete a SOW."""
-        result = self.collection.delete_one({"id": sow_id})
-        return result.deleted_count > 0
+    async def get_sow_stamp(self, sow_id: str) -> Optional[Dict[str, Any]]:
+        """Get only a SOW's id, clientId, createdAt, currentVersion and updatedAt."""
+        return await self.collection.find_one({"id": sow_id}, SOW_STAMP_PROJECTION)
+    
+    async def get_sow_estimate_inputs(self, sow_id: str) -> Optional[Dict[str, Any]]:
+        """Get only the fields a SOW's estimate is computed from (raw document)."""
+        return await self.collection.find_one({"id": sow_id}, SOW_ESTIMATE_PROJECTION)
+    
+    async def get_sows_by_ids(self, sow_ids: List[str], validate: bool = True) -> Dict[str, Union[SOW, Dict[str, Any]]]:
+        """
+        Get full SOWs for the given ids in one query, keyed by id (missing ids
+        are omitted). With validate=False the raw documents are returned.
+        """
+        return {
+            sow_dict["id"]: SOW(**sow_dict) if validate else sow_dict
+            async for sow_dict in self.collection.find({"id": {"$in": sow_ids}}, SOW_DOCUMENT_PROJECTION)
+        }
     
-    def delete_sow_with_permission(self, sow_id: str, user_id: str, is_admin: bool) -> bool:
+    def iter_sows(
+        self,
+        projection: Dict[str, Any],
+        client_id: Optional[str] = None,
+        status: Optional[SOWStatus] = None,
+        approved_from: Optional[int] = None,
+        approved_to: Optional[int] = None,
+        sow_ids: Optional[List[str]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream raw SOW documents newest first, in the same order and with the
+        same filters as get_sows_page, without holding them all in memory
+        (used by the CSV export and batch rendering). approved_from/approved_to
+        restrict approvedAt to [from, to); sow_ids restricts to those ids.
+        """
+        query: Dict[str, Any] = {}
+        if sow_ids is not None:
+            query["id"] = {"$in": sow_ids}
+        if client_id:
+            query["clientId"] = client_id
+        if status:
+            query["status"] = status.value
+        if approved_from is not None or approved_to is not None:
+            query["approvedAt"] = {}
+            if approved_from is not None:
+                query["approvedAt"]["$gte"] = approved_from
+            if approved_to is not None:
+                query["approvedAt"]["$lt"] = approved_to
+        return self.collection.find(query, projection, batch_size=EXPORT_BATCH_SIZE).sort(SOW_LIST_SORT)
+    
+    @staticmethod
+    def _build_revision(
+        sow_id: str,
+        version: int,
+        timestamp: int,
+        user_id: str,
+        user_name: str,
+        changes: List[Dict[str, Any]],
+        old_state: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build a sow_revisions document, with a keyframe snapshot when due."""
+        revision = {
+            "id": str(uuid.uuid4()),
+            "sowId": sow_id,
+            "version": version,
+            "timestamp": timestamp,
+            "changedBy": user_id,
+            "changedByName": user_name,
+            "changeDescription": f"Updated {len(changes)} field(s)",
+            "changes": changes
+        }
+        if is_keyframe(version):
+            revision["snapshot"] = old_state
+        return revision
+    
+    async def update_sow(
+        self,
+        sow_id: str,
+        sow_data: SOWUpdate,
+        user_id: str,
+        user_name: str,
+        owner_id: Optional[str] = None
+    ) -> Optional[SOW]:
+        """
+        Update SOW information with optimistic concurrency on currentVersion.
+        
+        Reads the SOW once to compute the revision delta, then applies the
+        update with a single find_one_and_update that only matches the version
+        that was read and returns the new document. If sow_data.expectedVersion
+        is set, a mismatch raises SOWVersionConflict immediately; otherwise a
+        lost race is retried against the fresh document.
+        
+        Args:
+            owner_id: If set, only the SOW's client may update it
+            
+        Raises:
+            PermissionError: The SOW is not owned by owner_id
+            SOWVersionConflict: The SOW is not at the expected version
+        """
+        update_fields = {
+            k: v for k, v in sow_data.model_dump(mode="json", exclude={"expectedVersion"}).items()
+            if v is not None
+        }
+        expected_version = sow_data.expectedVersion
+        current_sow = None
+        
+        for _ in range(SOW_UPDATE_ATTEMPTS):
+            current_sow = await self.get_sow_by_id(sow_id)
+            if not current_sow:
+                return None
+            if owner_id is not None and current_sow.clientId != owner_id:
+                raise PermissionError("Not authorized to update this SOW")
+            if expected_version is not None and expected_version != current_sow.currentVersion:
+                raise SOWVersionConflict(sow_id, expected_version, current_sow.currentVersion)
+            if not update_fields:
+                return current_sow
+            
+            timestamp = int(datetime.now(timezone.utc).timestamp() * 1000)
+            old_state = current_sow.model_dump(mode="json", exclude=UNVERSIONED_FIELDS)
+            set_fields = dict(update_fields)
+            if ESTIMATE_INPUT_FIELDS & update_fields.keys():
+                set_fields.update(estimate_fields({**old_state, **update_fields}))
+            set_fields.update(status_timestamps(old_state["status"], update_fields.get("status"), timestamp))
+            
+            # Revision entry holding only the changed leaves
+            revision_changes = diff_states(old_state, {**old_state, **set_fields})
+            
+            set_fields["updatedAt"] = timestamp
+            new_version = current_sow.currentVersion + 1
+            if revision_changes:
+                set_fields["currentVersion"] = new_version
+            
+            updated = await self.collection.find_one_and_update(
+                {"id": sow_id, "currentVersion": current_sow.currentVersion},
+                {"$set": set_fields},
+                projection=SOW_DOCUMENT_PROJECTION,
+                return_document=ReturnDocument.AFTER
+            )
+            if updated is None:
+                # Another writer bumped the version (or deleted the SOW) since our read
+                if expected_version is not None:
+                    break
+                continue
+            
+            sow_payload_cache.invalidate(sow_id)
+            rollup_refresher.mark_dirty(current_sow.clientId)
+            if revision_changes:
+                # The version check above guarantees this version is ours alone
+                await self.revisions.insert_one(self._build_revision(
+                    sow_id, new_version, set_fields["updatedAt"], user_id, user_name, revision_changes, old_state
+                ))
+            
+            return SOW(**updated)
+        
+        latest = await self.collection.find_one({"id": sow_id}, {"_id": 0, "currentVersion": 1})
+        if latest is None:
+            return None
+        raise SOWVersionConflict(sow_id, expected_version, latest.get("currentVersion"))
+    
+    async def delete_sow(self, sow_id: str) -> bool:
+        """Delete a SOW and its revision history."""
+        deleted = await self.collection.find_one_and_delete({"id": sow_id}, {"_id": 0, "clientId": 1})
+        if deleted is not None:
+            sow_payload_cache.invalidate(sow_id)
+            rollup_refresher.mark_dirty(deleted["clientId"])
+            await self.revisions.delete_many({"sowId": sow_id})
+        return deleted is not None
+    
+    async def delete_sow_with_permission(self, sow_id: str, user_id: str, is_admin: bool) -> bool:
         """
         Delete a SOW with permission check in a single atomic operation.
         Returns True if deleted, False if not found or not authorized.
@@ -202,14 +624,139 @@ class SOWService:
             # Non-admins can only delete their own SOWs
             query["clientId"] = user_id
         
-        result = self.collection.delete_one(query)
-        return result.deleted_count > 0
+        deleted = await self.collection.find_one_and_delete(query, {"_id": 0, "clientId": 1})
+        if deleted is not None:
+            sow_payload_cache.invalidate(sow_id)
+            rollup_refresher.mark_dirty(deleted["clientId"])
+            await self.revisions.delete_many({"sowId": sow_id})
+        return deleted is not None
+    
+    async def bulk_update_sows(
+        self,
+        sow_ids: List[str],
+        fields: Dict[str, Any],
+        user_id: str,
+        user_name: str,
+        owner_id: Optional[str] = None
+    ) -> Dict[str, Tuple[str, Optional[int]]]:
+        """
+        Apply the same field changes to many SOWs, recording a revision for each.
+        
+        Reads all SOWs in one query, then writes every change with a single
+        unordered bulk_write. Each update is guarded by the version that was
+        read, like update_sow, so a SOW edited concurrently is reported as a
+        conflict instead of being overwritten.
+        
+        Args:
+            fields: JSON-mode field values to $set (e.g. {"status": "approved"})
+            owner_id: If set, only SOWs owned by this client are updated
+            
+        Returns:
+            Mapping of SOW id to (outcome, currentVersion), where outcome is
+            "updated", "unchanged", "conflict" or "not-found" (missing or not permitted)
+        """
+        outcomes: Dict[str, Tuple[str, Optional[int]]] = {sow_id: ("not-found", None) for sow_id in sow_ids}
+        
+        query: Dict[str, Any] = {"id": {"$in": sow_ids}}
+        if owner_id is not None:
+            query["clientId"] = owner_id
+        
+        timestamp = int(datetime.now(timezone.utc).timestamp() * 1000)
+        operations = []
+        revisions = {}
+        client_ids = {}
+        async for sow_dict in self.collection.find(query, SOW_DOCUMENT_PROJECTION):
+            current_sow = SOW(**sow_dict)
+            old_state = current_sow.model_dump(mode="json", exclude=UNVERSIONED_FIELDS)
+            sow_fields = {**fields, **status_timestamps(old_state["status"], fields.get("status"), timestamp)}
+            changes = diff_states(old_state, {**old_state, **sow_fields})
+            if not changes:
+                outcomes[current_sow.id] = ("unchanged", current_sow.currentVersion)
+                continue
+            
+            new_version = current_sow.currentVersion + 1
+            operations.append(UpdateOne(
+                {"id": current_sow.id, "currentVersion": current_sow.currentVersion},
+                {"$set": {**sow_fields, "updatedAt": timestamp, "currentVersion": new_version}}
+            ))
+            client_ids[current_sow.id] = current_sow.clientId
+            revisions[current_sow.id] = self._build_revision(
+                current_sow.id, new_version, timestamp, user_id, user_name, changes, old_state
+            )
+        
+        if not operations:
+            return outcomes
+        
+        result = await self.collection.bulk_write(operations, ordered=False)
+        applied = set(revisions)
+        if result.matched_count < len(operations):
+            # Some SOWs changed since the read; keep only those carrying our write
+            applied = {
+                sow_dict["id"]
+                async for sow_dict in self.collection.find(
+                    {"id": {"$in": list(revisions)}, "updatedAt": timestamp},
+                    {"_id": 0, "id": 1, "currentVersion": 1}
+                )
+                if sow_dict["currentVersion"] == revisions[sow_dict["id"]]["version"]
+            }
+        
+        for sow_id in applied:
+            sow_payload_cache.invalidate(sow_id)
+            rollup_refresher.mark_dirty(client_ids[sow_id])
+        if applied:
+            await self.revisions.insert_many([revisions[sow_id] for sow_id in applied], ordered=False)
+        for sow_id, revision in revisions.items():
+            outcomes[sow_id] = ("updated", revision["version"]) if sow_id in applied else ("conflict", None)
+        return outcomes
+    
+    async def bulk_delete_sows(self, sow_ids: List[str], user_id: str, is_admin: bool) -> Dict[str, bool]:
+        """
+        Delete many SOWs with the same per-item permission check as
+        delete_sow_with_permission, in one bulk_write.
+        
+        Returns:
+            Mapping of SOW id to whether it was deleted (False if not found or not authorized)
+        """
+        def permitted(sow_id: str) -> Dict[str, Any]:
+            query = {"id": sow_id}
+            if not is_admin:
+                # Non-admins can only delete their own SOWs
+                query["clientId"] = user_id
+            return query
+        
+        # Find which SOWs the delete filters will match, to report per item
+        match_query: Dict[str, Any] = {"id": {"$in": sow_ids}}
+        if not is_admin:
+            match_query["clientId"] = user_id
+        matched = {
+            sow_dict["id"]: sow_dict["clientId"]
+            async for sow_dict in self.collection.find(match_query, {"_id": 0, "id": 1, "clientId": 1})
+        }
+        outcomes = {sow_id: False for sow_id in sow_ids}
+        if not matched:
+            return outcomes
+        
+        await self.collection.bulk_write([DeleteOne(permitted(sow_id)) for sow_id in matched], ordered=False)
+        
+        # A concurrent delete may have won for some ids; only report what is really gone
+        remaining = {
+            sow_dict["id"]
+            async for sow_dict in self.collection.find({"id": {"$in": list(matched)}}, {"_id": 0, "id": 1})
+        }
+        deleted = matched.keys() - remaining
+        if deleted:
+            await self.revisions.delete_many({"sowId": {"$in": list(deleted)}})
+        for sow_id in deleted:
+            sow_payload_cache.invalidate(sow_id)
+            rollup_refresher.mark_dirty(matched[sow_id])
+            outcomes[sow_id] = True
+        return outcomes
     
-    def add_approval_comment(self, sow_id: str, comment: ApprovalComment) -> Optional[SOW]:
+    async def add_approval_comment(self, sow_id: str, comment: ApprovalComment) -> Optional[SOW]:
         """Add an approval comment to a SOW."""
         comment_dict = comment.model_dump()
         
-        result = self.collection.update_one(
+        result = await self.collection.update_one(
             {"id": sow_id},
             {
                 "$push": {"approvalHistory": comment_dict},
@@ -218,17 +765,140 @@ class SOWService:
         )
         
         if result.modified_count > 0:
-            return self.get_sow_by_id(sow_id)
+            sow_payload_cache.invalidate(sow_id)
+            return await self.get_sow_by_id(sow_id)
         return None
     
-    def get_sows_by_status(self, status: SOWStatus, client_id: Optional[str] = None) -> List[SOW]:
+    async def get_sows_by_status(self, status: SOWStatus, client_id: Optional[str] = None) -> List[SOW]:
         """Get SOWs by status."""
-        query = {"status": status.value}
-        if client_id:
-            query["clientId"] = client_id
-        
-        sows = []
-        for sow_dict in self.collection.find(query).sort("createdAt", -1):
-            sow_dict.pop("_id", None)
-            sows.append(SOW(**sow_dict))
+        sows, _ = await self.get_sows_page(client_id=client_id, status=status)
         return sows
+    
+    async def get_revisions_page(
+        self,
+        sow_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[SOWRevision], Optional[str]]:
+        """
+        Get a SOW's revisions, newest version first.
+        
+        Args:
+            sow_id: SOW whose history to read
+            limit: Page size; None returns the whole history
+            cursor: Cursor returned with the previous page (the last version seen)
+            
+        Returns:
+            Tuple of (revisions, next_cursor); next_cursor is None on the last page
+        """
+        query: Dict[str, Any] = {"sowId": sow_id}
+        if cursor:
+            if not cursor.isdigit():
+                raise ValueError("Invalid cursor")
+            query["version"] = {"$lt": int(cursor)}
+        
+        # Keyframe snapshots are only needed to rebuild versions, see get_sow_at_version
+        find_cursor = self.revisions.find(query, {"_id": 0, "snapshot": 0}).sort("version", DESCENDING)
+        if limit is not None:
+            find_cursor = find_cursor.limit(limit + 1)
+        
+        revisions = [SOWRevision(**revision) async for revision in find_cursor]
+        
+        next_cursor = None
+        if limit is not None and len(revisions) > limit:
+            revisions = revisions[:limit]
+            next_cursor = str(revisions[-1].version)
+        return revisions, next_cursor
+    
+    async def get_sow_at_version(self, sow_id: str, version: int) -> Optional[SOW]:
+        """
+        Rebuild a SOW as it was at the given version.
+        
+        Starts from the nearest newer keyframe snapshot (or the current
+        document) and reverts the deltas of the revisions in between, so at
+        most REVISION_KEYFRAME_INTERVAL revisions are read.
+        
+        Returns:
+            The SOW at that version, or None if the SOW or version does not exist
+        """
+        current = await self.collection.find_one({"id": sow_id}, SOW_DOCUMENT_PROJECTION)
+        if not current:
+            return None
+        
+        current_sow = SOW(**current)
+        if version < 1 or version > current_sow.currentVersion:
+            return None
+        if version == current_sow.currentVersion:
+            return current_sow
+        
+        version_timestamp = current_sow.createdAt
+        superseded_at = None
+        pending_changes = []
+        state = None
+        
+        query = {"sowId": sow_id, "version": {"$gte": version}}
+        projection = {"_id": 0, "version": 1, "timestamp": 1, "changes": 1, "snapshot": 1}
+        find_cursor = self.revisions.find(query, projection).sort("version", ASCENDING)
+        async for revision in find_cursor:
+            if revision["version"] == version:
+                version_timestamp = revision["timestamp"]
+                continue
+            if superseded_at is None:
+                superseded_at = revision["timestamp"]
+            if revision.get("snapshot") is not None:
+                # Keyframe: state just before this revision was applied
+                state = revision["snapshot"]
+                break
+            pending_changes.append(revision["changes"])
+        
+        if state is None:
+            state = current_sow.model_dump(mode="json", exclude=UNVERSIONED_FIELDS)
+        for changes in reversed(pending_changes):
+            revert_changes(state, changes)
+        
+        state = {k: v for k, v in state.items() if k not in UNVERSIONED_FIELDS}
+        state["updatedAt"] = version_timestamp
+        state["currentVersion"] = version
+        state["approvalHistory"] = [
+            comment for comment in current_sow.approvalHistory
+            if superseded_at is None or comment.timestamp < superseded_at
+        ]
+        return SOW(**state)
+    
+    async def migrate_embedded_revisions(self) -> Dict[str, int]:
+        """
+        Move revisionHistory arrays embedded in SOW documents into sow_revisions.
+        
+        Idempotent: revisions are upserted on (sowId, version), so an interrupted
+        run can simply be repeated.
+        
+        Returns:
+            Counts of migrated SOWs and newly inserted revisions
+        """
+        migrated_sows = 0
+        inserted_revisions = 0
+        
+        query = {"revisionHistory.0": {"$exists": True}}
+        async for sow_dict in self.collection.find(query, {"_id": 0, "id": 1, "revisionHistory": 1}):
+            sow_id = sow_dict["id"]
+            operations = [
+                UpdateOne(
+                    {"sowId": sow_id, "version": revision["version"]},
+                    {"$setOnInsert": {**revision, "sowId": sow_id}},
+                    upsert=True
+                )
+                for revision in sow_dict["revisionHistory"]
+            ]
+            result = await self.revisions.bulk_write(operations, ordered=False)
+            inserted_revisions += result.upserted_count
+            
+            await self.collection.update_one({"id": sow_id}, {"$unset": {"revisionHistory": ""}})
+            migrated_sows += 1
+        
+        # Drop empty embedded arrays left by older create_sow calls
+        await self.collection.update_many(
+            {"revisionHistory": {"$size": 0}},
+            {"$unset": {"revisionHistory": ""}}
+        )
+        
+        return {"sows": migrated_sows, "revisions": inserted_revisions}
@@ -0,0 +1,115 @@
+"""
+Streaming CSV export of SOWs for GET /api/sows/export.csv.
+
+Mirrors the columns of the frontend's csv-export.ts. Rows are written as the
+Mongo cursor yields documents and flushed in small chunks, so memory stays
+constant however many SOWs are exported.
+"""
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+import csv
+import io
+
+# Only the fields the export reads; history and revisions are never loaded
+SOW_EXPORT_PROJECTION = {
+    "_id": 0, "id": 1, "projectName": 1, "projectDescription": 1, "clientName": 1,
+    "clientOrganization": 1, "status": 1, "createdAt": 1, "submittedAt": 1, "approvedAt": 1,
+    "updatedAt": 1, "includeMigration": 1, "includeTraining": 1, "migrationStages": 1,
+    "selectedTrainings": 1, "estimatedValue": 1, "estimatedDuration": 1, "approvalHistory": 1,
+}
+
+EXPORT_HEADERS = [
+    "SOW ID", "Project Name", "Project Description", "Client Name", "Organization", "Status",
+    "Created Date", "Submitted Date", "Approved Date", "Days to Approval", "Migration Included",
+    "Migration Stages", "GitHub Migration Type", "Total Repositories", "Public Repos",
+    "Private Repos", "Total Size (GB)", "Users to Migrate", "Estimated Man Hours", "Has Git LFS",
+    "Has Submodules", "CI/CD Migration", "CI/CD Platform", "Training Included", "Training Modules",
+    "Total Participants", "Estimated Value", "Estimated Duration (weeks)",
+    "Number of Approval Comments", "Last Updated Date", "Approval Comments",
+]
+
+# Rows buffered before a chunk is sent to the client
+ROWS_PER_CHUNK = 100
+
+def _date(timestamp: Optional[int]) -> str:
+    if not timestamp:
+        return ""
+    return datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+
+def _yes_no(value: Any) -> str:
+    return "Yes" if value else "No"
+
+def _safe(cell: Any) -> Any:
+    """Neutralize spreadsheet formulas in user-entered text (CSV injection)."""
+    if isinstance(cell, str) and cell[:1] in ("=", "+", "-", "@", "\t", "\r"):
+        return "'" + cell
+    return "" if cell is None else cell
+
+def sow_export_row(sow: Dict[str, Any]) -> List[Any]:
+    """Flatten one SOW document (SOW_EXPORT_PROJECTION) into an export row."""
+    stages = sow.get("migrationStages") or []
+    trainings = sow.get("selectedTrainings") or []
+    comments = sow.get("approvalHistory") or []
+    migration = next((stage for stage in stages if stage.get("stage") == "repository-migration"), {})
+    cicd = next((stage for stage in stages if stage.get("stage") == "cicd-migration"), {})
+    inventory = migration.get("repositoryInventory") or {}
+
+    days_to_approval = ""
+    if sow.get("submittedAt") and sow.get("approvedAt"):
+        days_to_approval = round((sow["approvedAt"] - sow["submittedAt"]) / (1000 * 60 * 60 * 24))
+    total_weeks = sum(stage.get("timelineWeeks") or 0 for stage in stages)
+
+    return [_safe(cell) for cell in [
+        sow.get("id"),
+        sow.get("projectName"),
+        sow.get("projectDescription"),
+        sow.get("clientName"),
+        sow.get("clientOrganization"),
+        sow.get("status"),
+        _date(sow.get("createdAt")),
+        _date(sow.get("submittedAt")),
+        _date(sow.get("approvedAt")),
+        days_to_approval,
+        _yes_no(sow.get("includeMigration")),
+        ", ".join(stage.get("stage", "").replace("-", " ") for stage in stages),
+        (migration.get("githubMigrationType") or "").replace("-", " ").upper(),
+        inventory.get("totalRepositories", ""),
+        inventory.get("publicRepos", ""),
+        inventory.get("privateRepos", ""),
+        inventory.get("totalSizeGB", ""),
+        inventory.get("usersToMigrate", ""),
+        migration.get("estimatedManHours") or "",
+        _yes_no(inventory.get("hasLFS")),
+        _yes_no(inventory.get("hasSubmodules")),
+        _yes_no(cicd.get("includeCICDMigration")),
+        cicd.get("cicdPlatform") or "",
+        _yes_no(sow.get("includeTraining")),
+        "; ".join(f"{training['moduleId']} ({training['participantCount']} participants)" for training in trainings),
+        sum(training.get("participantCount", 0) for training in trainings),
+        sow.get("estimatedValue") or "",
+        total_weeks or sow.get("estimatedDuration") or "",
+        len(comments),
+        _date(sow.get("updatedAt")),
+        " | ".join(f"[{_date(comment.get('timestamp'))} - {comment.get('approverName')}] {comment.get('comment')}" for comment in comments),
+    ]]
+
+async def stream_sows_csv(sows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Yield the CSV export in chunks of ROWS_PER_CHUNK rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # Same preamble as the browser export
+    buffer.write("Xebia SOWGen Platform - Statement of Work Export\r\n")
+    buffer.write(f"Generated on: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}\r\n")
+    buffer.write(f"© {datetime.now(timezone.utc).year} Xebia. All rights reserved.\r\n")
+    buffer.write("\r\n\r\n")
+    writer.writerow(EXPORT_HEADERS)
+
+    rows = 0
+    async for sow in sows:
+        writer.writerow(sow_export_row(sow))
+        rows += 1
+        if rows % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
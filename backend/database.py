@@ -1,75 +1,189 @@
 """
 Database configuration and connection management for MongoDB.
 """
-from pymongo import MongoClient
-from pymongo.database import Database
-from typing import Optional
+from pymongo import AsyncMongoClient, ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.asynchronous.database import AsyncDatabase
+from typing import Dict, List, Optional
+import asyncio
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Indexes per collection, created at startup when missing
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel("email", unique=True),
+        IndexModel("id", unique=True),
+    ],
+    "sows": [
+        IndexModel("id", unique=True),
+        # Compound indexes matching the keyset-paginated list queries:
+        # equality filters first, then the (createdAt, id) sort key
+        IndexModel([("createdAt", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("clientId", ASCENDING), ("createdAt", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("status", ASCENDING), ("createdAt", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("clientId", ASCENDING), ("status", ASCENDING), ("createdAt", DESCENDING), ("id", DESCENDING)]),
+        # Change polling for /api/sows/stream when change streams are unavailable
+        IndexModel("updatedAt"),
+        # Full-text search (/api/sows/search); MongoDB allows one text index per collection
+        IndexModel(
+            [
+                ("projectName", TEXT),
+                ("clientOrganization", TEXT),
+                ("projectDescription", TEXT),
+                ("migrationStages.description", TEXT),
+                ("migrationStages.technicalDetails", TEXT),
+                ("approvalHistory.comment", TEXT),
+            ],
+            name="sow_text",
+            weights={"projectName": 10, "clientOrganization": 5, "projectDescription": 3},
+            default_language="english"
+        ),
+        # SOW stages linked to a tracked inventory (inventory_snapshots.py)
+        IndexModel("migrationStages.inventoryId", sparse=True),
+    ],
+    # SOW revision history collection
+    "sow_revisions": [
+        IndexModel("id", unique=True),
+        IndexModel([("sowId", ASCENDING), ("version", DESCENDING)], unique=True),
+    ],
+    # Shared rate limit counters (RATE_LIMIT_BACKEND=mongodb) expire via TTL
+    "rate_limits": [
+        IndexModel("expiresAt", expireAfterSeconds=0),
+    ],
+    # Background jobs: claim order, per-user listing, finished jobs and files expire via TTL
+    "jobs": [
+        IndexModel("id", unique=True),
+        IndexModel([("status", ASCENDING), ("createdAt", ASCENDING)]),
+        IndexModel([("requestedBy.id", ASCENDING), ("createdAt", DESCENDING)]),
+        IndexModel("expiresAt", expireAfterSeconds=0),
+    ],
+    "job_files": [
+        IndexModel([("jobId", ASCENDING), ("n", ASCENDING)], unique=True),
+        IndexModel("expiresAt", expireAfterSeconds=0),
+    ],
+    # Dashboard rollups, refreshed per client (analytics.py)
+    "sow_rollups": [
+        IndexModel("clientId"),
+        IndexModel("month"),
+    ],
+    # SCM inventory collector caches (scm_inventory.py) expire via TTL
+    "scm_responses": [
+        IndexModel("expiresAt", expireAfterSeconds=0),
+    ],
+    "scm_inventories": [
+        IndexModel("expiresAt", expireAfterSeconds=0),
+    ],
+    # Tracked inventories and their per-repository snapshots (inventory_snapshots.py)
+    "scm_tracked_inventories": [
+        IndexModel("id", unique=True),
+        IndexModel([("createdBy.id", ASCENDING), ("createdAt", DESCENDING)]),
+    ],
+    "scm_repo_snapshots": [
+        IndexModel([("inventoryId", ASCENDING), ("id", ASCENDING)], unique=True),
+    ],
+}
+
+# Indexes from earlier releases that INDEXES now covers, dropped at startup
+OBSOLETE_INDEXES: Dict[str, List[str]] = {
+    # Superseded by the compound (clientId|status, createdAt, id) indexes
+    "sows": ["clientId_1", "status_1", "createdAt_1"],
+}
+
 class MongoDB:
-    """MongoDB connection manager."""
-    
-    client: Optional[MongoClient] = None
-    db: Optional[Database] = None
-    
+    """MongoDB connection manager backed by PyMongo's asyncio client."""
+
+    client: Optional[AsyncMongoClient] = None
+    db: Optional[AsyncDatabase] = None
+
     @classmethod
-    def connect(cls):
-        """Establish connection to MongoDB."""
+    def _create_client(cls):
+        """Create the client and database handles without doing any I/O."""
         mongodb_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
         db_name = os.getenv("MONGODB_DB_NAME", "sowgen_db")
-        
+        max_pool_size = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+
+        cls.client = AsyncMongoClient(
+            mongodb_url,
+            serverSelectionTimeoutMS=5000,
+            maxPoolSize=max_pool_size,
+        )
+        cls.db = cls.client[db_name]
+
+    @classmethod
+    async def connect(cls):
+        """Establish connection to MongoDB (reusing the client get_db may already have created)."""
+        if cls.client is None:
+            cls._create_client()
+        mongodb_url, db_name = os.getenv("MONGODB_URL", "mongodb://localhost:27017"), cls.db.name
+
         try:
-            cls.client = MongoClient(mongodb_url, serverSelectionTimeoutMS=5000)
             # Test the connection
-            cls.client.server_info()
-            cls.db = cls.client[db_name]
+            await cls.client.admin.command("ping")
             print(f"✅ Connected to MongoDB: {db_name}")
-            
+
             # Create indexes
-            cls._create_indexes()
+            await cls._create_indexes()
         except Exception as e:
             print(f"❌ Failed to connect to MongoDB: {e}")
             print(f"   Connection string: {mongodb_url}")
             print(f"   Please ensure MongoDB is running and accessible.")
             raise
-        
+
     @classmethod
-    def _create_indexes(cls):
-        """Create necessary indexes for optimal query performance."""
+    async def _create_indexes(cls):
+        """
+        Create the indexes in INDEXES that do not exist yet.
+
+        Existing index names are read for all collections concurrently, and
+        only missing indexes are created, so a restart against an already
+        indexed database costs one round trip per collection. Indexes listed
+        in OBSOLETE_INDEXES are dropped, since every write still maintains them.
+        """
         if cls.db is None:
             return
-        
+
         try:
-            # Users collection indexes
-            cls.db.users.create_index("email", unique=True)
-            cls.db.users.create_index("id", unique=True)
-            
-            # SOWs collection indexes
-            cls.db.sows.create_index("id", unique=True)
-            cls.db.sows.create_index("clientId")
-            cls.db.sows.create_index("status")
-            cls.db.sows.create_index("createdAt")
-            
-            print("✅ Database indexes created")
+            async def ensure(collection: str, indexes: List[IndexModel]) -> int:
+                existing = await cls.db[collection].index_information()
+                missing = [index for index in indexes if index.document["name"] not in existing]
+                if missing:
+                    await cls.db[collection].create_indexes(missing)
+                for name in OBSOLETE_INDEXES.get(collection, []):
+                    if name in existing:
+                        await cls.db[collection].drop_index(name)
+                        print(f"✅ Dropped obsolete index {collection}.{name}")
+                return len(missing)
+
+            created = await asyncio.gather(*(ensure(collection, indexes) for collection, indexes in INDEXES.items()))
+            if sum(created):
+                print(f"✅ Database indexes created ({sum(created)})")
+            else:
+                print("✅ Database indexes up to date")
         except Exception as e:
             print(f"⚠️  Warning: Could not create some indexes: {e}")
             print("   The application will continue but performance may be affected.")
-        
+
     @classmethod
-    def close(cls):
+    async def close(cls):
         """Close MongoDB connection."""
         if cls.client:
-            cls.client.close()
+            await cls.client.close()
+            cls.client = None
+            cls.db = None
             print("✅ MongoDB connection closed")
-            
+
     @classmethod
-    def get_db(cls) -> Database:
-        """Get database instance."""
+    def get_db(cls) -> AsyncDatabase:
+        """
+        Get database instance.
+
+        The async client connects lazily on first operation, so this can be
+        called from synchronous code (e.g. FastAPI dependencies) safely.
+        """
         if cls.db is None:
-            cls.connect()
+            cls._create_client()
         return cls.db
 
 # Singleton instance
@@ -0,0 +1,292 @@
+"""
+Deterministic cost and effort estimates for SOWs.
+
+A SOW's estimate is the sum of independent parts, one per migration stage
+and one per selected training module, and each part depends on only a few
+inputs. Parts are computed by pure functions memoized on those inputs, so
+SOWs that share stage shapes share the work. Whole SOW estimates are
+cached per (id, currentVersion, updatedAt), so recalculating a portfolio
+of thousands of mostly unchanged SOWs reads their stamps and sums cached
+breakdowns.
+
+Repository migration hours follow the formula the SOW form has always
+shown (hours per repository by migration target plus LFS, submodule, size
+and language surcharges). Training session lengths come from the training
+catalog; rates come from the environment.
+"""
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import math
+import os
+
+from cache import sow_estimate_cache
+from models import SOWStatus
+from training_catalog import training_catalog
+
+# Billing rate for migration engineering hours
+ESTIMATE_HOURLY_RATE = float(os.getenv("ESTIMATE_HOURLY_RATE", "150"))
+
+# Billing rate for trainer delivery hours
+ESTIMATE_TRAINER_HOURLY_RATE = float(os.getenv("ESTIMATE_TRAINER_HOURLY_RATE", "200"))
+
+# Participants per training session; larger groups need more sessions
+ESTIMATE_TRAINING_CLASS_SIZE = int(os.getenv("ESTIMATE_TRAINING_CLASS_SIZE", "20"))
+
+HOURS_PER_WEEK = 40
+
+# Used for modules that are not in the training catalog
+DEFAULT_TRAINING_MODULE_HOURS = 8.0
+
+# Base hours per repository by migration target
+REPO_HOURS_BY_MIGRATION_TYPE = {"github-classic": 2, "github-emu": 3, "ghes": 4}
+
+# Engineering hours per timeline week for stages without an inventory or explicit estimate
+STAGE_WEEKLY_HOURS = {
+    "initial-setup": 20,
+    "repository-migration": 40,
+    "cicd-migration": 30,
+    "cicd-implementation": 30,
+    "training-sessions": 10,
+}
+
+# Automated stages need less hands-on time per week
+AUTOMATED_STAGE_FACTOR = 0.75
+
+# Fields an estimate is computed from, plus what identifies the SOW's version
+SOW_ESTIMATE_PROJECTION = {
+    "_id": 0, "id": 1, "clientId": 1, "currentVersion": 1, "updatedAt": 1,
+    "includeMigration": 1, "includeTraining": 1, "selectedTrainings": 1,
+    "migrationStages.stage": 1, "migrationStages.timelineWeeks": 1, "migrationStages.automated": 1,
+    "migrationStages.githubMigrationType": 1, "migrationStages.estimatedManHours": 1,
+    "migrationStages.repositoryInventory": 1,
+}
+
+# What a portfolio estimate reads for every SOW; estimate inputs are only read for cache misses
+SOW_PORTFOLIO_STAMP_PROJECTION = {
+    "_id": 0, "id": 1, "projectName": 1, "status": 1, "currentVersion": 1, "updatedAt": 1,
+}
+
+# SOW ids per query when fetching estimate inputs for a portfolio
+ESTIMATE_FETCH_BATCH = 1000
+
+def stage_key(stage: Dict[str, Any]) -> Tuple:
+    """The inputs a stage estimate depends on (hashable, so estimates can be memoized)."""
+    inventory = stage.get("repositoryInventory")
+    inventory_key = None
+    if inventory:
+        inventory_key = (
+            inventory.get("totalRepositories", 0),
+            bool(inventory.get("hasLFS")),
+            bool(inventory.get("hasSubmodules")),
+            inventory.get("totalSizeGB", 0) > 100,
+            len(inventory.get("languages") or []),
+        )
+    return (
+        stage.get("stage"),
+        stage.get("timelineWeeks", 0),
+        bool(stage.get("automated")),
+        stage.get("githubMigrationType"),
+        stage.get("estimatedManHours"),
+        inventory_key,
+    )
+
+@lru_cache(maxsize=65536)
+def estimate_stage(key: Tuple) -> Tuple[float, int]:
+    """(engineering hours, timeline weeks) of one migration stage, from stage_key()."""
+    stage, weeks, automated, migration_type, man_hours, inventory = key
+    if inventory is not None:
+        repositories, has_lfs, has_submodules, is_large, language_count = inventory
+        hours = repositories * REPO_HOURS_BY_MIGRATION_TYPE.get(migration_type, 2)
+        if has_lfs:
+            hours += repositories * 0.5
+        if has_submodules:
+            hours += repositories * 0.3
+        if is_large:
+            hours += 20
+        hours = math.ceil(hours + language_count * 2)
+    elif man_hours:
+        hours = man_hours
+    else:
+        hours = weeks * STAGE_WEEKLY_HOURS.get(stage, HOURS_PER_WEEK)
+        if automated:
+            hours *= AUTOMATED_STAGE_FACTOR
+    return float(hours), weeks
+
+@lru_cache(maxsize=65536)
+def estimate_training(module_hours: float, participants: int) -> Tuple[int, float]:
+    """(sessions, trainer delivery hours) of one training module."""
+    sessions = max(1, math.ceil(participants / ESTIMATE_TRAINING_CLASS_SIZE))
+    return sessions, module_hours * sessions
+
+def default_module_hours(module_id: str) -> float:
+    """Session length of a module from the training catalog."""
+    hours = training_catalog.module_hours(module_id)
+    return DEFAULT_TRAINING_MODULE_HOURS if hours is None else hours
+
+def estimate_sow(sow: Any, module_hours: Callable[[str], float] = default_module_hours) -> Dict[str, Any]:
+    """
+    Estimate one SOW (model or raw document) with a per-stage and
+    per-training breakdown.
+
+    estimatedValue is engineering hours at ESTIMATE_HOURLY_RATE plus trainer
+    delivery hours at ESTIMATE_TRAINER_HOURLY_RATE. estimatedDuration is the
+    sum of stage timelines plus the training delivery time in 40-hour weeks.
+    """
+    if not isinstance(sow, dict):
+        sow = sow.model_dump(mode="json")
+
+    stages = []
+    if sow.get("includeMigration"):
+        for stage in sow.get("migrationStages") or []:
+            hours, weeks = estimate_stage(stage_key(stage))
+            stages.append({
+                "stage": stage["stage"],
+                "hours": hours,
+                "weeks": weeks,
+                "cost": round(hours * ESTIMATE_HOURLY_RATE, 2),
+            })
+
+    trainings = []
+    if sow.get("includeTraining"):
+        for training in sow.get("selectedTrainings") or []:
+            module_id = training["moduleId"]
+            participants = training.get("participantCount", 1)
+            sessions, hours = estimate_training(module_hours(module_id), participants)
+            trainings.append({
+                "moduleId": module_id,
+                "participants": participants,
+                "sessions": sessions,
+                "hours": hours,
+                "cost": round(hours * ESTIMATE_TRAINER_HOURLY_RATE, 2),
+            })
+
+    migration_hours = sum(stage["hours"] for stage in stages)
+    training_hours = sum(training["hours"] for training in trainings)
+    return {
+        "estimatedValue": round(sum(part["cost"] for part in stages + trainings), 2),
+        "estimatedDuration": float(sum(stage["weeks"] for stage in stages) + math.ceil(training_hours / HOURS_PER_WEEK)),
+        "migrationHours": migration_hours,
+        "trainingHours": training_hours,
+        "stages": stages,
+        "trainings": trainings,
+    }
+
+def estimate_fields(sow: Any, module_hours: Callable[[str], float] = default_module_hours) -> Dict[str, float]:
+    """Just the estimatedValue/estimatedDuration fields stored on the SOW."""
+    estimate = estimate_sow(sow, module_hours)
+    return {"estimatedValue": estimate["estimatedValue"], "estimatedDuration": estimate["estimatedDuration"]}
+
+def cached_estimate(sow: Dict[str, Any], module_hours: Callable[[str], float] = default_module_hours) -> Dict[str, Any]:
+    """estimate_sow() of a SOW document, reused while its currentVersion and updatedAt are unchanged."""
+    key = (sow["id"], sow.get("currentVersion"), sow.get("updatedAt"))
+    estimate = sow_estimate_cache.get(key)
+    if estimate is None:
+        estimate = estimate_sow(sow, module_hours)
+        sow_estimate_cache.set(key, estimate)
+    return estimate
+
+def summarize_portfolio(
+    entries: Iterable[Tuple[Dict[str, Any], Dict[str, Any]]],
+    details: bool = False
+) -> Dict[str, Any]:
+    """
+    Totals over (SOW stamp, estimate) pairs, broken down by status and by
+    stage type. With details, also one row per SOW.
+    """
+    sows = 0
+    value = weeks = migration_hours = training_hours = 0.0
+    by_status: Dict[str, List[float]] = {}
+    by_stage: Dict[str, List[float]] = {}
+    rows: List[Dict[str, Any]] = []
+
+    for sow, estimate in entries:
+        sows += 1
+        value += estimate["estimatedValue"]
+        weeks += estimate["estimatedDuration"]
+        migration_hours += estimate["migrationHours"]
+        training_hours += estimate["trainingHours"]
+
+        status = sow.get("status", "draft")
+        status_totals = by_status.get(status)
+        if status_totals is None:
+            status_totals = by_status[status] = [0, 0.0]
+        status_totals[0] += 1
+        status_totals[1] += estimate["estimatedValue"]
+        for stage in estimate["stages"]:
+            stage_totals = by_stage.get(stage["stage"])
+            if stage_totals is None:
+                stage_totals = by_stage[stage["stage"]] = [0, 0.0, 0.0]
+            stage_totals[0] += 1
+            stage_totals[1] += stage["hours"]
+            stage_totals[2] += stage["cost"]
+
+        if details:
+            rows.append({
+                "id": sow["id"],
+                "projectName": sow.get("projectName"),
+                "status": status,
+                "estimatedValue": estimate["estimatedValue"],
+                "estimatedDuration": estimate["estimatedDuration"],
+            })
+
+    return {
+        "totals": {
+            "sows": sows,
+            "estimatedValue": round(value, 2),
+            "estimatedWeeks": weeks,
+            "migrationHours": migration_hours,
+            "trainingHours": training_hours,
+        },
+        "byStatus": {
+            status_name: {"sows": count, "estimatedValue": round(total, 2)}
+            for status_name, (count, total) in by_status.items()
+        },
+        "byStage": {
+            stage: {"count": count, "hours": hours, "cost": round(cost, 2)}
+            for stage, (count, hours, cost) in by_stage.items()
+        },
+        "sows": rows if details else None,
+    }
+
+async def estimate_portfolio(
+    sow_service,
+    client_id: Optional[str] = None,
+    status: Optional[SOWStatus] = None,
+    details: bool = False,
+    module_hours: Callable[[str], float] = default_module_hours
+) -> Dict[str, Any]:
+    """
+    Portfolio estimate over the SOWs matching client_id/status.
+
+    Reads only each SOW's stamp first; stages and trainings are fetched
+    (ESTIMATE_FETCH_BATCH ids per query) just for SOWs whose estimate is not
+    cached at their current version, so an unchanged portfolio is summed
+    from sow_estimate_cache.
+    """
+    stamps = [
+        stamp async for stamp in sow_service.iter_sows(SOW_PORTFOLIO_STAMP_PROJECTION, client_id=client_id, status=status)
+    ]
+    estimates = {
+        stamp["id"]: sow_estimate_cache.get((stamp["id"], stamp.get("currentVersion"), stamp.get("updatedAt")))
+        for stamp in stamps
+    }
+
+    missing = [sow_id for sow_id, estimate in estimates.items() if estimate is None]
+    for start in range(0, len(missing), ESTIMATE_FETCH_BATCH):
+        async for sow in sow_service.iter_sows(SOW_ESTIMATE_PROJECTION, sow_ids=missing[start:start + ESTIMATE_FETCH_BATCH]):
+            # Estimated at the version just read, which may be newer than the stamp
+            estimates[sow["id"]] = cached_estimate(sow, module_hours)
+
+    # SOWs deleted between the two reads are left out
+    return summarize_portfolio(
+        ((stamp, estimates[stamp["id"]]) for stamp in stamps if estimates[stamp["id"]] is not None),
+        details
+    )
+
+def cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the SOW, stage and training estimate caches."""
+    return {
+        "sows": sow_estimate_cache.stats(),
+        "stages": estimate_stage.cache_info()._asdict(),
+        "trainings": estimate_training.cache_info()._asdict(),
+    }
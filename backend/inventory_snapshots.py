@@ -0,0 +1,358 @@
+"""
+Tracked repository inventories with incremental refresh (/api/scm/inventories).
+
+A tracked inventory keeps one snapshot document per repository in
+`scm_repo_snapshots`, keyed by (inventoryId, platform repository id), plus
+running totals on the `scm_tracked_inventories` document from which the
+RepositoryInventory is derived.
+
+A refresh lists the organization again (cheap: unchanged listing pages are
+revalidated with ETags, see scm_inventory.py) and compares every listed
+repository with its snapshot. Only repositories that are new or whose
+`pushedAt` changed get the per-repository deep scan; repositories whose
+listing fields are unchanged are not written at all. The totals are
+adjusted by subtracting each changed or removed repository's old
+contribution and adding its new one, so a refresh never re-reads or
+re-sums unchanged snapshots. The new totals are stored, flagged
+`snapshotsPending`, before the snapshots are written; a refresh that finds
+the flag still set (an earlier one failed halfway) re-sums the snapshots
+instead of trusting the stored totals.
+
+Migration stages link to a tracked inventory with `inventoryId`. Linked
+stages get the live inventory when the SOW is saved, and a refresh that
+changes the inventory updates open SOWs (not approved or rejected) through
+SOWService.update_sow, so the change is versioned and re-estimated. That
+happens after the inventory is saved and is best effort: SOWs that cannot
+be updated are counted in `sowsFailed` and logged.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import time
+import uuid
+
+from pymongo import DeleteMany, ReplaceOne, ReturnDocument
+from pymongo.asynchronous.database import AsyncDatabase
+
+from crud import SOWService
+from models import MigrationStageDetail, RepositoryInventory, SOWStatus, SOWUpdate
+from scm_inventory import ScmCollector, ScmError, add_repo, empty_totals, inventory_from_totals
+
+# Seconds a refresh holds an inventory before another one may start
+INVENTORY_REFRESH_LEASE_SECONDS = 3600
+
+# Snapshot writes per bulk_write
+SNAPSHOT_WRITE_BATCH = 1000
+
+# Fields filled by the deep scan; kept from the snapshot while pushedAt is unchanged
+DETAIL_FIELDS = ("languages", "hasLFS", "hasSubmodules")
+
+# SOWs in these statuses follow changes of their linked inventories
+LINKED_SOW_STATUSES = [SOWStatus.DRAFT.value, SOWStatus.PENDING.value, SOWStatus.CHANGES_REQUESTED.value]
+
+TRACKED_INVENTORY_PROJECTION = {"_id": 0, "totals": 0, "refreshingUntil": 0, "snapshotsPending": 0}
+
+class InventoryRefreshRunning(Exception):
+    """Another refresh of the same tracked inventory is in progress."""
+
+def _now_ms() -> int:
+    return int(datetime.now(timezone.utc).timestamp() * 1000)
+
+def _store_totals(totals: Dict[str, Any]) -> Dict[str, Any]:
+    # Language names may contain characters MongoDB does not allow in keys
+    return {**totals, "languages": sorted(totals["languages"].items())}
+
+def _load_totals(stored: Dict[str, Any]) -> Dict[str, Any]:
+    return {**stored, "languages": dict(stored["languages"])}
+
+def visible_owner(user_id: str, role: str) -> Optional[str]:
+    """Clients only see inventories they created; admins and approvers see all."""
+    return None if role in ["xebia-admin", "approver"] else user_id
+
+def merge_snapshot(listed: Dict[str, Any], snapshot: Optional[Dict[str, Any]], deep: bool) -> bool:
+    """
+    Carry deep-scan fields over from the repository's snapshot into its
+    listing record. Returns True if the repository needs a deep scan
+    (new, or pushed since the snapshot).
+    """
+    if not deep:
+        return False
+    if snapshot is None or snapshot.get("pushedAt") != listed.get("pushedAt") or not listed.get("pushedAt"):
+        return True
+    for field in DETAIL_FIELDS:
+        # The listing only knows a primary language; GitLab reports LFS in the listing
+        if field == "languages" or listed[field] is None:
+            listed[field] = snapshot[field]
+    return False
+
+def diff_snapshots(
+    listed: List[Dict[str, Any]],
+    snapshots: Dict[str, Dict[str, Any]],
+    totals: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Compare listed repository records (deep fields already filled) with the
+    stored snapshots by repository id and apply the difference to `totals`
+    in place. Consumes `snapshots`. A repository listed twice (pages can
+    shift while they are fetched concurrently) is only counted once.
+
+    Returns:
+        {"changed": new or changed records to write, "removed": snapshots to
+        delete, "added": count of new repositories, "unchanged": count}
+    """
+    changed = []
+    added = unchanged = 0
+    seen = set()
+    for repo in listed:
+        if repo["id"] in seen:
+            continue
+        seen.add(repo["id"])
+        snapshot = snapshots.pop(repo["id"], None)
+        if snapshot is None:
+            added += 1
+        elif all(snapshot.get(field) == value for field, value in repo.items()):
+            unchanged += 1
+            continue
+        else:
+            add_repo(totals, snapshot, -1)
+        add_repo(totals, repo)
+        changed.append(repo)
+    removed = list(snapshots.values())
+    for snapshot in removed:
+        add_repo(totals, snapshot, -1)
+    return {"changed": changed, "removed": removed, "added": added, "unchanged": unchanged}
+
+def linked_inventory(stage: Dict[str, Any], inventory: Dict[str, Any]) -> Dict[str, Any]:
+    """A stage's repositoryInventory from a tracked inventory, keeping its own usersToMigrate."""
+    users_to_migrate = (stage.get("repositoryInventory") or {}).get("usersToMigrate")
+    return {**inventory, "usersToMigrate": users_to_migrate}
+
+class InventoryTracker:
+    """Tracked inventories, their repository snapshots and linked SOW stages."""
+
+    def __init__(self, db: AsyncDatabase, collector: ScmCollector):
+        self.db = db
+        self.collector = collector
+        self.inventories = db.scm_tracked_inventories
+        self.snapshots = db.scm_repo_snapshots
+
+    async def create(
+        self,
+        platform: str,
+        organization: str,
+        deep: bool,
+        owner: Dict[str, Any],
+        token: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        Start tracking an organization and run its first (full) refresh.
+        Returns the existing tracked inventory if the owner already tracks it.
+        """
+        existing = await self.inventories.find_one(
+            {"platform": platform, "organizationKey": organization.lower(), "deep": deep, "createdBy.id": owner["id"]},
+            TRACKED_INVENTORY_PROJECTION
+        )
+        if existing:
+            return existing
+
+        inventory_id = str(uuid.uuid4())
+        await self.inventories.insert_one({
+            "id": inventory_id,
+            "platform": platform,
+            "organization": organization,
+            "organizationKey": organization.lower(),
+            "deep": deep,
+            "createdBy": owner,
+            "createdAt": _now_ms(),
+            "refreshedAt": None,
+            "inventory": inventory_from_totals(empty_totals()),
+            "totals": _store_totals(empty_totals()),
+            "lastRefresh": None,
+        })
+        try:
+            return await self.refresh(inventory_id, token)
+        except ScmError:
+            # Nothing useful was collected; do not leave an empty inventory behind
+            await self.inventories.delete_one({"id": inventory_id})
+            raise
+
+    async def get(self, inventory_id: str, owner_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        query: Dict[str, Any] = {"id": inventory_id}
+        if owner_id is not None:
+            query["createdBy.id"] = owner_id
+        return await self.inventories.find_one(query, TRACKED_INVENTORY_PROJECTION)
+
+    async def get_all(self, owner_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = {"createdBy.id": owner_id} if owner_id is not None else {}
+        return [
+            inventory async for inventory in
+            self.inventories.find(query, TRACKED_INVENTORY_PROJECTION).sort("createdAt", -1)
+        ]
+
+    async def get_many(self, inventory_ids: List[str], owner_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        query: Dict[str, Any] = {"id": {"$in": inventory_ids}}
+        if owner_id is not None:
+            query["createdBy.id"] = owner_id
+        return {
+            inventory["id"]: inventory
+            async for inventory in self.inventories.find(query, {"_id": 0, "id": 1, "inventory": 1})
+        }
+
+    async def _claim(self, inventory_id: str) -> Optional[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        return await self.inventories.find_one_and_update(
+            {"id": inventory_id, "$or": [{"refreshingUntil": None}, {"refreshingUntil": {"$lt": now}}]},
+            {"$set": {"refreshingUntil": now + timedelta(seconds=INVENTORY_REFRESH_LEASE_SECONDS)}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def refresh(self, inventory_id: str, token: Optional[str]) -> Dict[str, Any]:
+        """
+        Bring a tracked inventory up to date with the platform.
+
+        Raises:
+            LookupError: No such tracked inventory
+            InventoryRefreshRunning: Another refresh holds the inventory
+            ScmError: The platform could not be read
+        """
+        tracked = await self._claim(inventory_id)
+        if tracked is None:
+            if await self.inventories.find_one({"id": inventory_id}, {"_id": 1}) is None:
+                raise LookupError(inventory_id)
+            raise InventoryRefreshRunning(inventory_id)
+
+        try:
+            started = time.perf_counter()
+            platform, deep = tracked["platform"], tracked["deep"]
+            listed = await self.collector.list_repositories(platform, tracked["organization"], token)
+            snapshots = {
+                snapshot["id"]: snapshot
+                async for snapshot in self.snapshots.find({"inventoryId": inventory_id}, {"_id": 0, "inventoryId": 0})
+            }
+
+            needs_details = [repo for repo in listed if merge_snapshot(repo, snapshots.get(repo["id"]), deep)]
+            await asyncio.gather(*(self.collector.add_details(platform, repo, token) for repo in needs_details))
+
+            if tracked.get("snapshotsPending"):
+                # An earlier refresh stored totals but failed before all snapshots were written
+                totals = empty_totals()
+                for snapshot in snapshots.values():
+                    add_repo(totals, snapshot)
+            else:
+                totals = _load_totals(tracked["totals"])
+            diff = diff_snapshots(listed, snapshots, totals)
+            inventory = inventory_from_totals(totals)
+            await self.inventories.update_one(
+                {"id": inventory_id},
+                {"$set": {"inventory": inventory, "totals": _store_totals(totals), "snapshotsPending": True}}
+            )
+            await self._write_snapshots(inventory_id, diff["changed"], diff["removed"])
+
+            refresh = {
+                "added": diff["added"],
+                "changed": len(diff["changed"]) - diff["added"],
+                "removed": len(diff["removed"]),
+                "unchanged": diff["unchanged"],
+                "detailsFetched": len(needs_details),
+                "durationMs": round((time.perf_counter() - started) * 1000),
+                "sowsUpdated": 0,
+                "sowsFailed": 0,
+            }
+            if inventory != tracked["inventory"]:
+                refresh["sowsUpdated"], refresh["sowsFailed"] = await self._update_linked_sows(inventory_id, inventory)
+
+            return await self.inventories.find_one_and_update(
+                {"id": inventory_id},
+                {
+                    "$set": {"refreshedAt": _now_ms(), "lastRefresh": refresh, "refreshingUntil": None},
+                    "$unset": {"snapshotsPending": ""},
+                },
+                projection=TRACKED_INVENTORY_PROJECTION,
+                return_document=ReturnDocument.AFTER
+            )
+        except BaseException:
+            await self.inventories.update_one({"id": inventory_id}, {"$set": {"refreshingUntil": None}})
+            raise
+
+    async def _write_snapshots(self, inventory_id: str, changed: List[Dict[str, Any]], removed: List[Dict[str, Any]]):
+        operations: List[Any] = [
+            ReplaceOne({"inventoryId": inventory_id, "id": repo["id"]}, {**repo, "inventoryId": inventory_id}, upsert=True)
+            for repo in changed
+        ]
+        if removed:
+            operations.append(DeleteMany({"inventoryId": inventory_id, "id": {"$in": [repo["id"] for repo in removed]}}))
+        for start in range(0, len(operations), SNAPSHOT_WRITE_BATCH):
+            await self.snapshots.bulk_write(operations[start:start + SNAPSHOT_WRITE_BATCH], ordered=False)
+
+    async def _update_linked_sows(self, inventory_id: str, inventory: Dict[str, Any]) -> Tuple[int, int]:
+        """
+        Give open SOWs with stages linked to this inventory its new figures
+        (versioned like any edit). A SOW that cannot be updated is logged
+        and skipped; the inventory itself is already saved.
+
+        Returns:
+            Tuple of (SOWs updated, SOWs that failed)
+        """
+        sow_service = SOWService(self.db)
+        updated = failed = 0
+        linked = self.db.sows.find(
+            {"migrationStages.inventoryId": inventory_id, "status": {"$in": LINKED_SOW_STATUSES}},
+            {"_id": 0, "id": 1, "migrationStages": 1}
+        )
+        async for sow in linked:
+            stages = [
+                {**stage, "repositoryInventory": linked_inventory(stage, inventory)}
+                if stage.get("inventoryId") == inventory_id else stage
+                for stage in sow["migrationStages"]
+            ]
+            if stages == sow["migrationStages"]:
+                continue
+            try:
+                result = await sow_service.update_sow(
+                    sow["id"], SOWUpdate(migrationStages=stages), "system", "Inventory refresh"
+                )
+            except Exception as e:  # e.g. SOWVersionConflict from a concurrent edit
+                failed += 1
+                print(f"⚠️  Warning: Could not update SOW {sow['id']} from inventory {inventory_id}: {e}")
+                continue
+            if result is not None:
+                updated += 1
+        return updated, failed
+
+    async def delete(self, inventory_id: str, owner_id: Optional[str] = None) -> bool:
+        """Stop tracking an inventory and drop its snapshots (linked stages keep their last figures)."""
+        query: Dict[str, Any] = {"id": inventory_id}
+        if owner_id is not None:
+            query["createdBy.id"] = owner_id
+        result = await self.inventories.delete_one(query)
+        if result.deleted_count == 0:
+            return False
+        await self.snapshots.delete_many({"inventoryId": inventory_id})
+        return True
+
+async def link_stage_inventories(
+    tracker: InventoryTracker,
+    stages: List[MigrationStageDetail],
+    owner_id: Optional[str] = None
+):
+    """
+    Fill repositoryInventory of migration stages that carry an inventoryId
+    from the tracked inventory, in place.
+
+    Raises:
+        LookupError: A stage links an inventory that does not exist or is not visible to the user
+    """
+    inventory_ids = sorted({stage.inventoryId for stage in stages if stage.inventoryId})
+    if not inventory_ids:
+        return
+    tracked = await tracker.get_many(inventory_ids, owner_id)
+    for stage in stages:
+        if not stage.inventoryId:
+            continue
+        if stage.inventoryId not in tracked:
+            raise LookupError(stage.inventoryId)
+        current = stage.repositoryInventory.model_dump() if stage.repositoryInventory else {}
+        stage.repositoryInventory = RepositoryInventory(
+            **linked_inventory({"repositoryInventory": current}, tracked[stage.inventoryId]["inventory"])
+        )
@@ -0,0 +1,123 @@
+"""
+Job types run by the background job worker (see jobs.py).
+
+Importing this module registers them; both the API process and worker.py
+import it.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+import tempfile
+
+from analytics import rollup_refresher
+from crud import SOWService, UserService, BULK_IMPORT_MAX_ROWS
+from csv_export import SOW_EXPORT_PROJECTION, stream_sows_csv
+from database import mongodb
+from jobs import JobContext, JobError, job_type
+from inventory_snapshots import InventoryRefreshRunning, InventoryTracker
+from models import InventoryRefreshJobParams, NoJobParams, SOWExportRequest, SOWRenderBatchRequest, UserImportRequest
+from scm_inventory import SCM_SERVER_TOKENS, ScmError, ScmRateLimited, scm_collector
+from renderer import (
+    RENDER_ZIP_SPOOL_BYTES, InvalidRenderBatch, find_render_stamps, PDF_AVAILABLE, write_render_archive
+)
+
+# Progress is reported every this many exported rows
+EXPORT_PROGRESS_ROWS = 500
+
+def visible_client_id(requester: Dict[str, Any]) -> Optional[str]:
+    """Same visibility rules as GET /api/sows: clients only see their own SOWs."""
+    return None if requester["role"] in ["xebia-admin", "approver"] else requester["id"]
+
+def _today() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+@job_type("sow-render-batch", SOWRenderBatchRequest, max_concurrency=1)
+async def render_batch_job(context: JobContext):
+    """Zip of rendered SOWs, as POST /api/sows/render-batch."""
+    request: SOWRenderBatchRequest = context.params
+    if request.format == "pdf" and not PDF_AVAILABLE:
+        raise JobError("PDF rendering requires the 'weasyprint' package")
+
+    sow_service = SOWService(mongodb.get_db())
+    try:
+        stamps = await find_render_stamps(sow_service, request, visible_client_id(context.requester))
+    except InvalidRenderBatch as e:
+        raise JobError(str(e))
+
+    await context.progress(0, len(stamps))
+    with tempfile.SpooledTemporaryFile(max_size=RENDER_ZIP_SPOOL_BYTES) as archive:
+        await write_render_archive(
+            sow_service, stamps, request.format, request.sowIds or [], archive, progress=context.progress
+        )
+        archive.seek(0)
+        await context.save_file(
+            f"sows-{request.format}-{_today()}.zip",
+            "application/zip",
+            iter(lambda: archive.read(64 * 1024), b"")
+        )
+    return {"sows": len(stamps)}
+
+@job_type("sow-export-csv", SOWExportRequest, max_concurrency=2)
+async def export_csv_job(context: JobContext):
+    """CSV of the requester's visible SOWs, as GET /api/sows/export.csv."""
+    request: SOWExportRequest = context.params
+    sow_service = SOWService(mongodb.get_db())
+    sows = sow_service.iter_sows(
+        SOW_EXPORT_PROJECTION, client_id=visible_client_id(context.requester), status=request.status
+    )
+    rows = 0
+
+    async def counted_sows():
+        nonlocal rows
+        async for sow in sows:
+            yield sow
+            rows += 1
+            if rows % EXPORT_PROGRESS_ROWS == 0:
+                await context.progress(rows)
+
+    await context.save_file(f"sows-export-{_today()}.csv", "text/csv; charset=utf-8", stream_sows_csv(counted_sows()))
+    await context.progress(rows, rows)
+    return {"rows": rows}
+
+# Not retried: rows created by a failed attempt would be reported as duplicates on the next one
+@job_type("user-import", UserImportRequest, max_attempts=1, roles=["xebia-admin"])
+async def user_import_job(context: JobContext):
+    """Bulk user import, as POST /api/users/bulk."""
+    request: UserImportRequest = context.params
+    if len(request.users) > BULK_IMPORT_MAX_ROWS:
+        raise JobError(f"At most {BULK_IMPORT_MAX_ROWS} users can be imported per job")
+
+    await context.progress(0, len(request.users))
+    user_service = UserService(mongodb.get_db())
+    report = await user_service.import_users(request.users)
+    await context.progress(len(request.users), len(request.users))
+    return report.model_dump(mode="json")
+
+@job_type("revision-migration", NoJobParams, roles=["xebia-admin"])
+async def revision_migration_job(context: JobContext):
+    """Move embedded SOW revision histories into sow_revisions (as migrate_revisions.py; safe to re-run)."""
+    sow_service = SOWService(mongodb.get_db())
+    return await sow_service.migrate_embedded_revisions()
+
+@job_type("analytics-rebuild", NoJobParams, max_concurrency=1, roles=["xebia-admin"])
+async def analytics_rebuild_job(context: JobContext):
+    """Recompute all dashboard rollups from the sows collection (safe to re-run)."""
+    return await rollup_refresher.rebuild()
+
+@job_type("scm-inventory-refresh", InventoryRefreshJobParams, max_concurrency=1, roles=["xebia-admin", "approver"])
+async def inventory_refresh_job(context: JobContext):
+    """Incremental refresh of a tracked inventory, as POST /api/scm/inventories/{id}/refresh."""
+    request: InventoryRefreshJobParams = context.params
+    tracker = InventoryTracker(mongodb.get_db(), scm_collector)
+    inventory = await tracker.get(request.inventoryId)
+    if inventory is None:
+        raise JobError("Inventory not found")
+    try:
+        refreshed = await tracker.refresh(request.inventoryId, SCM_SERVER_TOKENS[inventory["platform"]])
+    except InventoryRefreshRunning:
+        raise JobError("A refresh of this inventory is already running")
+    except ScmRateLimited:
+        # Retried with backoff by the worker
+        raise
+    except ScmError as e:
+        raise JobError(e.message)
+    return {"inventory": refreshed["inventory"], "lastRefresh": refreshed["lastRefresh"]}
@@ -0,0 +1,420 @@
+"""
+Background jobs persisted in the MongoDB `jobs` collection.
+
+Slow work (batch rendering, exports, bulk imports, revision migration) is
+submitted as a job document and executed by a JobWorker, either inside the
+API process (JOB_WORKER_IN_PROCESS) or in a separate `python worker.py`
+process (the Procfile `worker` entry). Any number of workers can share the
+collection: a job is claimed atomically with find_one_and_update and held
+by a lease the worker renews while it runs, so a job whose worker dies is
+picked up again once the lease expires.
+
+Failed attempts are retried with exponential backoff up to the job type's
+max_attempts; handlers raise JobError for failures a retry cannot fix.
+Files a job produces are stored in `job_files` in 1 MiB chunks and expire
+together with the finished job after JOB_RESULT_TTL_HOURS.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Type, Union
+import asyncio
+import os
+import socket
+import uuid
+
+from pydantic import BaseModel
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.asynchronous.database import AsyncDatabase
+
+from database import mongodb
+
+# Jobs one worker runs at once (each job type also has its own limit)
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "2"))
+
+# Seconds between polls for new jobs when idle
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+
+# Seconds a claimed job stays leased without a heartbeat before another worker may take it
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+# Delay before the first retry; doubles with each further attempt
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "10"))
+
+# Hours finished jobs and their files are kept
+JOB_RESULT_TTL_HOURS = float(os.getenv("JOB_RESULT_TTL_HOURS", "24"))
+
+JOB_FILE_CHUNK_BYTES = 1024 * 1024
+
+def _now_ms() -> int:
+    return int(datetime.now(timezone.utc).timestamp() * 1000)
+
+def _expires_at() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(hours=JOB_RESULT_TTL_HOURS)
+
+class JobError(Exception):
+    """A job failure that retrying cannot fix (bad parameters, missing permissions)."""
+
+class JobType:
+    """A registered kind of job: its handler, parameter model and limits."""
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[["JobContext"], Awaitable[Any]],
+        params_model: Type[BaseModel],
+        max_concurrency: int = 1,
+        max_attempts: int = 3,
+        roles: Optional[List[str]] = None
+    ):
+        """
+        Args:
+            name: Job type submitted in POST /api/jobs
+            handler: Coroutine run with a JobContext; its return value becomes the job result
+            params_model: Model the submitted params are validated against
+            max_concurrency: Jobs of this type one worker runs at once
+            max_attempts: Attempts before the job is marked failed
+            roles: User roles allowed to submit it (None allows everyone)
+        """
+        self.name = name
+        self.handler = handler
+        self.params_model = params_model
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.roles = roles
+
+# Registered job types by name (see job_handlers.py)
+JOB_TYPES: Dict[str, JobType] = {}
+
+def job_type(
+    name: str,
+    params_model: Type[BaseModel],
+    max_concurrency: int = 1,
+    max_attempts: int = 3,
+    roles: Optional[List[str]] = None
+):
+    """Decorator registering a job handler under `name`."""
+    def register(handler):
+        JOB_TYPES[name] = JobType(name, handler, params_model, max_concurrency, max_attempts, roles)
+        return handler
+    return register
+
+class JobContext:
+    """What a running handler sees: its parameters, the requester and progress/file helpers."""
+
+    def __init__(self, queue: "JobQueue", job: Dict[str, Any], params: BaseModel):
+        self.queue = queue
+        self.job = job
+        self.id = job["id"]
+        self.params = params
+        # {"id", "name", "role"} of the user who submitted the job
+        self.requester = job["requestedBy"]
+        self.latest_progress: Optional[Dict[str, Any]] = None
+        self.file: Optional[Dict[str, Any]] = None
+
+    async def progress(self, done: int, total: Optional[int] = None, message: Optional[str] = None):
+        """Record progress; it is written with the next lease heartbeat."""
+        self.latest_progress = {"done": done, "total": total, "message": message}
+
+    async def save_file(
+        self,
+        name: str,
+        media_type: str,
+        chunks: Union[Iterable[bytes], AsyncIterator[bytes]]
+    ) -> Dict[str, Any]:
+        """Store the job's output file (one per job), re-chunked into JOB_FILE_CHUNK_BYTES documents."""
+        size = await self.queue.write_file(self.id, chunks)
+        self.file = {"name": name, "mediaType": media_type, "size": size}
+        return self.file
+
+class JobQueue:
+    """Job and job file persistence."""
+
+    def __init__(self, db: AsyncDatabase):
+        self.jobs = db.jobs
+        self.files = db.job_files
+
+    async def submit(self, job_type: JobType, params: BaseModel, requester: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a job; params must already be validated against job_type.params_model."""
+        now = _now_ms()
+        job = {
+            "id": str(uuid.uuid4()),
+            "type": job_type.name,
+            "status": "queued",
+            "params": params.model_dump(mode="json"),
+            "progress": {"done": 0, "total": None, "message": None},
+            "result": None,
+            "file": None,
+            "error": None,
+            "attempts": 0,
+            "maxAttempts": job_type.max_attempts,
+            "requestedBy": requester,
+            "createdAt": now,
+            "runAfter": now,
+            "startedAt": None,
+            "finishedAt": None,
+        }
+        await self.jobs.insert_one(job)
+        job.pop("_id", None)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.jobs.find_one({"id": job_id}, {"_id": 0})
+
+    async def list_jobs(
+        self,
+        requester_id: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """Jobs newest first, optionally only one user's or in one status."""
+        query: Dict[str, Any] = {}
+        if requester_id:
+            query["requestedBy.id"] = requester_id
+        if status:
+            query["status"] = status
+        find_cursor = self.jobs.find(query, {"_id": 0}).sort([("createdAt", DESCENDING)]).limit(limit)
+        return [job async for job in find_cursor]
+
+    async def claim(self, worker_id: str, types: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Atomically take the oldest runnable job of one of these types: queued
+        and due, or running under a lease that has expired.
+        """
+        now = _now_ms()
+        return await self.jobs.find_one_and_update(
+            {
+                "type": {"$in": types},
+                "$or": [
+                    {"status": "queued", "runAfter": {"$lte": now}},
+                    {"status": "running", "leaseUntil": {"$lt": now}},
+                ],
+            },
+            {
+                "$set": {
+                    "status": "running",
+                    "workerId": worker_id,
+                    "leaseUntil": now + int(JOB_LEASE_SECONDS * 1000),
+                    "startedAt": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            projection={"_id": 0},
+            sort=[("createdAt", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def _owned(self, job: Dict[str, Any], worker_id: str) -> Dict[str, Any]:
+        """Filter matching the job only while this worker still holds this attempt's lease."""
+        return {"id": job["id"], "status": "running", "workerId": worker_id, "attempts": job["attempts"]}
+
+    async def heartbeat(self, job: Dict[str, Any], worker_id: str, progress: Optional[Dict[str, Any]]) -> bool:
+        """Extend the lease (and save progress); False if the lease was lost to another worker."""
+        update: Dict[str, Any] = {"leaseUntil": _now_ms() + int(JOB_LEASE_SECONDS * 1000)}
+        if progress is not None:
+            update["progress"] = progress
+        result = await self.jobs.update_one(self._owned(job, worker_id), {"$set": update})
+        return result.matched_count == 1
+
+    async def complete(
+        self,
+        job: Dict[str, Any],
+        worker_id: str,
+        result: Any,
+        file: Optional[Dict[str, Any]],
+        progress: Optional[Dict[str, Any]]
+    ):
+        expires_at = _expires_at()
+        update = {
+            "status": "succeeded",
+            "result": result,
+            "file": file,
+            "error": None,
+            "finishedAt": _now_ms(),
+            "expiresAt": expires_at,
+        }
+        if progress is not None:
+            update["progress"] = progress
+        await self.jobs.update_one(self._owned(job, worker_id), {"$set": update})
+        await self.files.update_many({"jobId": job["id"]}, {"$set": {"expiresAt": expires_at}})
+
+    async def fail(self, job: Dict[str, Any], worker_id: str, error: str, retry: bool):
+        """Record a failed attempt; requeue with backoff while attempts remain."""
+        await self.delete_files(job["id"])
+        if retry and job["attempts"] < job["maxAttempts"]:
+            delay = JOB_RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1)
+            update = {"status": "queued", "error": error, "runAfter": _now_ms() + int(delay * 1000)}
+        else:
+            update = {"status": "failed", "error": error, "finishedAt": _now_ms(), "expiresAt": _expires_at()}
+        await self.jobs.update_one(self._owned(job, worker_id), {"$set": update})
+
+    async def release(self, job: Dict[str, Any], worker_id: str):
+        """Hand a job back to the queue without counting the attempt (worker shutting down)."""
+        await self.delete_files(job["id"])
+        await self.jobs.update_one(
+            self._owned(job, worker_id),
+            {"$set": {"status": "queued", "runAfter": _now_ms()}, "$inc": {"attempts": -1}}
+        )
+
+    async def write_file(self, job_id: str, chunks: Union[Iterable[bytes], AsyncIterator[bytes]]) -> int:
+        """Store a job's file as fixed-size chunk documents; returns its size in bytes."""
+        await self.delete_files(job_id)
+        expires_at = _expires_at()
+        buffer = bytearray()
+        index = 0
+        size = 0
+
+        async def flush(data: bytes):
+            nonlocal index
+            await self.files.insert_one({"jobId": job_id, "n": index, "data": data, "expiresAt": expires_at})
+            index += 1
+
+        async def iterate():
+            if hasattr(chunks, "__aiter__"):
+                async for chunk in chunks:
+                    yield chunk
+            else:
+                for chunk in chunks:
+                    yield chunk
+
+        async for chunk in iterate():
+            buffer += chunk
+            size += len(chunk)
+            while len(buffer) >= JOB_FILE_CHUNK_BYTES:
+                await flush(bytes(buffer[:JOB_FILE_CHUNK_BYTES]))
+                del buffer[:JOB_FILE_CHUNK_BYTES]
+        if buffer or index == 0:
+            await flush(bytes(buffer))
+        return size
+
+    async def read_file(self, job_id: str) -> AsyncIterator[bytes]:
+        """Yield a job's file chunk by chunk."""
+        find_cursor = self.files.find({"jobId": job_id}, {"_id": 0, "data": 1}, batch_size=4).sort([("n", ASCENDING)])
+        async for chunk in find_cursor:
+            yield bytes(chunk["data"])
+
+    async def delete_files(self, job_id: str):
+        await self.files.delete_many({"jobId": job_id})
+
+class JobWorker:
+    """
+    Claims and runs jobs: at most `concurrency` at once, and at most each
+    type's max_concurrency per type. Idle workers poll every
+    JOB_POLL_SECONDS; submissions in the same process wake them at once.
+    """
+
+    def __init__(self, concurrency: int = JOB_CONCURRENCY):
+        self.concurrency = concurrency
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.running: Dict[str, asyncio.Task] = {}
+        self.running_by_type: Dict[str, int] = {}
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.succeeded = 0
+        self.failed = 0
+
+    def start(self):
+        """Start the claim loop on the running event loop."""
+        if self.task is None or self.task.done():
+            self.wakeup = asyncio.Event()
+            self.task = asyncio.create_task(self._run())
+
+    def notify(self):
+        """Wake the claim loop (a job was submitted or a slot freed up)."""
+        self.wakeup.set()
+
+    async def stop(self):
+        """Stop claiming and hand running jobs back to the queue."""
+        tasks = [task for task in [self.task, *self.running.values()] if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workerId": self.worker_id,
+            "active": self.task is not None and not self.task.done(),
+            "concurrency": self.concurrency,
+            "running": dict(self.running_by_type),
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+        }
+
+    async def _run(self):
+        queue = JobQueue(mongodb.get_db())
+        while True:
+            self.wakeup.clear()
+            try:
+                await self._claim_jobs(queue)
+            except Exception as e:
+                print(f"⚠️  Warning: Could not claim jobs: {e}")
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim_jobs(self, queue: JobQueue):
+        while len(self.running) < self.concurrency:
+            types = [
+                name for name, registered in JOB_TYPES.items()
+                if self.running_by_type.get(name, 0) < registered.max_concurrency
+            ]
+            if not types:
+                return
+            job = await queue.claim(self.worker_id, types)
+            if job is None:
+                return
+            self.running_by_type[job["type"]] = self.running_by_type.get(job["type"], 0) + 1
+            self.running[job["id"]] = asyncio.create_task(self._execute(queue, job))
+
+    async def _execute(self, queue: JobQueue, job: Dict[str, Any]):
+        registered = JOB_TYPES[job["type"]]
+        context = None
+        heartbeat = None
+        try:
+            if job["attempts"] > job["maxAttempts"]:
+                # Lease expired on the last attempt, e.g. the worker was killed mid-job
+                await queue.fail(job, self.worker_id, "Job did not finish (worker lost)", retry=False)
+                self.failed += 1
+                return
+            context = JobContext(queue, job, registered.params_model(**job["params"]))
+            heartbeat = asyncio.create_task(self._heartbeat(queue, job, context, asyncio.current_task()))
+            result = await registered.handler(context)
+            heartbeat.cancel()
+            await queue.complete(job, self.worker_id, result, context.file, context.latest_progress)
+            self.succeeded += 1
+        except asyncio.CancelledError:
+            if heartbeat is not None and heartbeat.done() and not heartbeat.cancelled():
+                # Lease lost: another worker owns the job now
+                return
+            await asyncio.shield(queue.release(job, self.worker_id))
+            raise
+        except JobError as e:
+            await queue.fail(job, self.worker_id, str(e), retry=False)
+            self.failed += 1
+        except Exception as e:
+            print(f"⚠️  Warning: Job {job['id']} ({job['type']}) attempt {job['attempts']} failed: {e}")
+            await queue.fail(job, self.worker_id, f"{type(e).__name__}: {e}", retry=True)
+            self.failed += 1
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+            self.running.pop(job["id"], None)
+            self.running_by_type[job["type"]] -= 1
+            self.notify()
+
+    async def _heartbeat(self, queue: JobQueue, job: Dict[str, Any], context: JobContext, runner: asyncio.Task):
+        """Renew the lease while the job runs; cancel the job if the lease is lost."""
+        interval = min(JOB_LEASE_SECONDS / 3, 2.0)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                owned = await queue.heartbeat(job, self.worker_id, context.latest_progress)
+            except Exception as e:
+                print(f"⚠️  Warning: Could not renew lease for job {job['id']}: {e}")
+                continue
+            if not owned:
+                runner.cancel()
+                return
+
+# Per-process worker; started on API startup when JOB_WORKER_IN_PROCESS is set, or by worker.py
+job_worker = JobWorker()
@@ -2,33 +2,203 @@
 FastAPI Backend for SOWgen.ai
 MongoDB integration for data persistence on GitHub Pages.
 """
-from fastapi import FastAPI, HTTPException, Depends, status, Header, Request
+from fastapi import FastAPI, HTTPException, Depends, status, Header, Request, Response, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import List, Optional
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+from fastapi.routing import APIRoute
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Union
 from datetime import datetime, timezone
+from pydantic import ValidationError
+import asyncio
+import csv
+import hashlib
+import io
 import os
+import secrets
+import tempfile
 from dotenv import load_dotenv
 
 from database import mongodb
 from models import (
-    User, UserCreate, UserUpdate,
-    SOW, SOWCreate, SOWUpdate, SOWStatus,
-    ApprovalComment, Token, LoginRequest
+    User, UserCreate, UserUpdate, UserBulkImportResponse,
+    SOW, SOWBase, SOWCreate, SOWUpdate, SOWStatus, SOWSummary, SOWSearchResult, SOWRevision,
+    SOWBulkAction, SOWBulkRequest, SOWBulkItemResult, SOWBulkResponse, SOWRenderBatchRequest,
+    SOWEstimate, PortfolioEstimate, AnalyticsSummary, OrganizationAnalytics, MonthlyAnalytics, ScmInventoryRequest, ScmInventoryResponse, ScmTrackRequest, ScmRefreshRequest, TrackedInventory,
+    MigrationStageDetail, SelectedTraining, TrainingModule, TrainingTrack, TrainingLevel, Job, JobCreate, JobStatus, ApprovalComment, Token, LoginRequest
+)
+from crud import UserService, SOWService, SOWVersionConflict, BULK_IMPORT_MAX_ROWS
+from auth import (
+    verify_password_async, create_access_token, decode_access_token,
+    auth_pool, AuthPoolSaturated
+)
+from readiness import ReadinessGateMiddleware, readiness
+from rate_limiter import login_limiter, api_limiter, RateLimitMiddleware
+from cache import user_cache, sow_payload_cache, render_cache
+from metrics import MetricsMiddleware, registry, response_serialization_duration
+from sow_events import sow_events, SOW_STREAM_HEARTBEAT_SECONDS
+from serialization import FAST_JSON, model_json, sow_document_json, sow_stamp, sow_summary_json
+from csv_export import SOW_EXPORT_PROJECTION, stream_sows_csv
+from analytics import rollup_refresher, get_monthly, get_organizations, get_summary
+from estimation import cached_estimate, estimate_portfolio, estimate_sow, cache_stats as estimate_cache_stats
+from jobs import JOB_TYPES, JobQueue, job_worker
+from scm_inventory import SCM_SERVER_TOKENS, ScmError, ScmRateLimited, scm_collector
+from training_catalog import training_catalog
+from inventory_snapshots import InventoryRefreshRunning, InventoryTracker, link_stage_inventories, visible_owner
+import job_handlers  # registers the job types
+from renderer import (
+    RENDER_FORMATS, RENDER_ZIP_SPOOL_BYTES, InvalidRenderBatch,
+    find_render_stamps, render_filename, render_pool, render_sows, write_render_archive, PDF_AVAILABLE
 )
-from crud import UserService, SOWService
-from auth import verify_password, create_access_token, decode_access_token
-from rate_limiter import login_limiter
 
 # Load environment variables
 load_dotenv()
 
+class MetricsRoute(APIRoute):
+    """Route that times Pydantic validation/serialization of its response model."""
+    
+    def get_route_handler(self):
+        # FastAPI validates and serializes return values through this field
+        field = self.secure_cloned_response_field
+        if field is not None:
+            validate, serialize = field.validate, field.serialize
+            path = self.path
+            
+            def timed_validate(*args, **kwargs):
+                with response_serialization_duration.time(path, "validate"):
+                    return validate(*args, **kwargs)
+            
+            def timed_serialize(*args, **kwargs):
+                with response_serialization_duration.time(path, "serialize"):
+                    return serialize(*args, **kwargs)
+            
+            field.validate, field.serialize = timed_validate, timed_serialize
+        return super().get_route_handler()
+
+DEMO_USERS = [
+    UserCreate(
+        name="Demo Client",
+        email="client@example.com",
+        role="client",
+        organization="Acme Corp",
+        password="Demo123!"
+    ),
+    UserCreate(
+        name="Xebia Admin",
+        email="admin@xebia.com",
+        role="xebia-admin",
+        organization="Xebia",
+        password="Admin123!"
+    ),
+    UserCreate(
+        name="Xebia Approver",
+        email="approver@xebia.com",
+        role="approver",
+        organization="Xebia",
+        password="Approver123!"
+    )
+]
+
+async def seed_demo_users():
+    """Create the demo users if there are no users at all."""
+    db = mongodb.get_db()
+    # Collection metadata only; no need to read any user to know it is empty
+    if await db.users.estimated_document_count() > 0:
+        return
+    
+    print("🔄 Initializing demo users...")
+    # One auth pool job per user, so the bcrypt hashes run in parallel
+    user_service = UserService(db)
+    results = await asyncio.gather(
+        *(user_service.create_user(user_data) for user_data in DEMO_USERS), return_exceptions=True
+    )
+    for user_data, result in zip(DEMO_USERS, results):
+        if isinstance(result, Exception):
+            print(f"⚠️  Warning: Could not create demo user {user_data.email}: {result}")
+    print("✅ Demo users initialized")
+
+async def prepare_database():
+    """
+    Connect to MongoDB, create missing indexes and seed demo users, then
+    open the readiness gate and start the background workers.
+    
+    Runs in the background so the server accepts connections right away;
+    failed attempts (e.g. MongoDB not reachable yet) are retried with backoff.
+    """
+    delay = 1
+    while True:
+        try:
+            await mongodb.connect()
+            await seed_demo_users()
+            break
+        except Exception as e:
+            readiness.failed(e)
+            print(f"⚠️  Warning: Startup failed, retrying in {delay}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+    
+    readiness.set_ready()
+    print(f"✅ Ready in {readiness.ready_seconds}s")
+    
+    # Run background jobs in this process unless a separate worker.py handles them
+    if JOB_WORKER_IN_PROCESS:
+        job_worker.start()
+    
+    # Build dashboard rollups in the background if they do not exist yet
+    await rollup_refresher.ensure_built()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the background startup work; shut everything down on exit."""
+    readiness.reset()
+    
+    # Drop idle API rate limit buckets in the background
+    rate_limit_eviction = asyncio.create_task(api_limiter.run_eviction())
+    startup = asyncio.create_task(prepare_database())
+    
+    yield
+    
+    rate_limit_eviction.cancel()
+    startup.cancel()
+    sow_events.stop()
+    await rollup_refresher.stop()
+    await job_worker.stop()
+    await scm_collector.close()
+    await mongodb.close()
+    auth_pool.shutdown()
+    render_pool.shutdown()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="SOWgen.ai API",
     description="Backend API for SOW Generation Platform with MongoDB persistence",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson-backed rendering for every endpoint on the FAST_JSON path
+    default_response_class=ORJSONResponse if FAST_JSON else JSONResponse,
+    lifespan=lifespan
 )
+app.router.route_class = MetricsRoute
+
+def rate_limit_identity(scope: dict) -> str:
+    """Rate limit key: the authenticated user if the bearer token is valid, else the client IP."""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            payload = decode_access_token(token) if scheme.lower() == "bearer" else None
+            if payload and payload.get("sub"):
+                return f"user:{payload['sub']}"
+            break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+# Hold API requests until startup (MongoDB, indexes, demo users) is done.
+# Innermost, so held requests are still rate limited and get CORS headers.
+app.add_middleware(ReadinessGateMiddleware, state=readiness)
+
+# Per-user/per-IP token buckets for every API route group. Added before CORS
+# so that CORS stays outermost and 429 responses still carry CORS headers.
+app.add_middleware(RateLimitMiddleware, limiter=api_limiter, identify=rate_limit_identity)
 
 # CORS configuration for GitHub Pages
 allowed_origins = os.getenv("ALLOWED_ORIGINS", "http://localhost:5000").split(",")
@@ -38,64 +208,58 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset", "Retry-After", "Content-Disposition"],
 )
 
+# Request latency/in-flight metrics; outermost so they include every other middleware
+app.add_middleware(MetricsMiddleware)
+
+# Optional bearer token required to scrape /metrics
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
 # Security scheme
 security = HTTPBearer()
 
-# Database connection on startup
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database connection on startup."""
-    mongodb.connect()
-    
-    # Initialize demo users if database is empty
-    db = mongodb.get_db()
-    user_service = UserService(db)
-    
-    if len(user_service.get_all_users()) == 0:
-        print("🔄 Initializing demo users...")
-        demo_users = [
-            UserCreate(
-                name="Demo Client",
-                email="client@example.com",
-                role="client",
-                organization="Acme Corp",
-                password="Demo123!"
-            ),
-            UserCreate(
-                name="Xebia Admin",
-                email="admin@xebia.com",
-                role="xebia-admin",
-                organization="Xebia",
-                password="Admin123!"
-            ),
-            UserCreate(
-                name="Xebia Approver",
-                email="approver@xebia.com",
-                role="approver",
-                organization="Xebia",
-                password="Approver123!"
-            )
-        ]
-        
-        for user_data in demo_users:
-            try:
-                user_service.create_user(user_data)
-            except Exception as e:
-                print(f"⚠️  Warning: Could not create demo user {user_data.email}: {e}")
-        
-        print("✅ Demo users initialized")
+# Upper bound for the page size of paginated list endpoints
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "200"))
+
+# Run queued jobs inside the API process (disable when running worker.py separately)
+JOB_WORKER_IN_PROCESS = os.getenv("JOB_WORKER_IN_PROCESS", "true").lower() in ("1", "true", "yes")
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Close database connection on shutdown."""
-    mongodb.close()
+@app.exception_handler(AuthPoolSaturated)
+async def auth_pool_saturated_handler(request: Request, exc: AuthPoolSaturated):
+    """Shed load when password hashing is backed up instead of queueing indefinitely."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy. Please try again shortly."},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
 
 # Authentication dependency
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
     """Validate JWT token and return current user."""
-    token = credentials.credentials
+    return await resolve_user(credentials.credentials)
+
+async def get_stream_user(
+    authorization: Optional[str] = Header(None),
+    token: Optional[str] = Query(None)
+) -> User:
+    """
+    Like get_current_user, but also accepts the JWT as a `token` query
+    parameter, since browsers cannot set headers on EventSource requests.
+    """
+    if authorization and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await resolve_user(token)
+
+async def resolve_user(token: str) -> User:
+    """Validate a JWT and return the user it was issued to."""
     payload = decode_access_token(token)
     
     if payload is None:
@@ -113,9 +277,14 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Signature and expiry are checked above on every call; only the DB lookup is cached
+    cached_user = user_cache.get(email)
+    if cached_user is not None:
+        return cached_user
+    
     db = mongodb.get_db()
     user_service = UserService(db)
-    user_dict = user_service.get_user_by_email(email)
+    user_dict = await user_service.get_user_by_email(email)
     
     if user_dict is None:
         raise HTTPException(
@@ -126,7 +295,9 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     
     user_dict.pop("hashed_password", None)
     user_dict.pop("_id", None)
-    return User(**user_dict)
+    user = User(**user_dict)
+    user_cache.set(email, user)
+    return user
 
 # Health check endpoint
 @app.get("/")
@@ -144,10 +315,21 @@ async def health_check():
     try:
         db = mongodb.get_db()
         # Test database connection
-        db.command("ping")
+        await db.command("ping")
         return {
             "status": "healthy",
             "database": "connected",
+            "userCache": user_cache.stats(),
+            "sowPayloadCache": sow_payload_cache.stats(),
+            "sowStream": sow_events.stats(),
+            "authPool": auth_pool.stats(),
+            "renderPool": render_pool.stats(),
+            "renderCache": render_cache.stats(),
+            "jobWorker": job_worker.stats(),
+            "estimateCache": estimate_cache_stats(),
+            "analyticsRollups": rollup_refresher.stats(),
+            "scmCollector": scm_collector.stats(),
+            "startup": readiness.stats(),
             "timestamp": int(datetime.now(timezone.utc).timestamp() * 1000)
         }
     except Exception as e:
@@ -157,6 +339,32 @@ async def health_check():
             "error": str(e)
         }
 
+@app.get("/ready")
+async def ready():
+    """
+    Readiness probe: 200 once MongoDB is reachable, indexes exist and demo
+    users are seeded, 503 while startup is still running.
+    """
+    if not readiness.ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "starting", **readiness.stats()}
+        )
+    return {"status": "ready", **readiness.stats()}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus metrics in the text exposition format."""
+    if METRICS_TOKEN and not (
+        authorization and secrets.compare_digest(authorization, f"Bearer {METRICS_TOKEN}")
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return Response(content=registry.render(), media_type="text/plain; version=0.0.4")
+
 # Authentication endpoints
 @app.post("/api/auth/login", response_model=dict)
 async def login(login_data: LoginRequest, request: Request):
@@ -165,30 +373,34 @@ async def login(login_data: LoginRequest, request: Request):
     client_ip = request.client.host if request.client else "unknown"
     
     # Check rate limit
-    allowed, remaining = login_limiter.is_allowed(client_ip)
+    allowed, remaining = await login_limiter.is_allowed(client_ip)
+    rate_limit_headers = {
+        "X-RateLimit-Limit": str(login_limiter.max_requests),
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(login_limiter.reset_seconds()),
+    }
     if not allowed:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Too many login attempts. Please try again later.",
             headers={
-                "Retry-After": "300",  # 5 minutes
-                "X-RateLimit-Limit": "5",
-                "X-RateLimit-Remaining": "0"
+                "Retry-After": str(login_limiter.window_seconds),
+                **rate_limit_headers
             }
         )
     
     db = mongodb.get_db()
     user_service = UserService(db)
     
-    user_dict = user_service.get_user_by_email(login_data.email)
+    user_dict = await user_service.get_user_by_email(login_data.email)
     
-    if not user_dict or not verify_password(login_data.password, user_dict["hashed_password"]):
+    if not user_dict or not await verify_password_async(login_data.password, user_dict["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={
                 "WWW-Authenticate": "Bearer",
-                "X-RateLimit-Remaining": str(remaining - 1)
+                **rate_limit_headers
             },
         )
     
@@ -226,14 +438,104 @@ async def create_user(
     user_service = UserService(db)
     
     # Check if user already exists
-    existing_user = user_service.get_user_by_email(user_data.email)
+    existing_user = await user_service.get_user_by_email(user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User with this email already exists"
         )
     
-    return user_service.create_user(user_data)
+    return await user_service.create_user(user_data)
+
+async def read_bulk_rows(request: Request) -> List[Dict[str, Any]]:
+    """Read bulk import rows from a JSON array, a text/csv body or a multipart `file` upload."""
+    content_type = request.headers.get("content-type", "")
+    
+    if content_type.startswith("application/json"):
+        try:
+            rows = await request.json()
+        except ValueError:
+            rows = None
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Expected a JSON array of user objects"
+            )
+        return rows
+    
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Expected a CSV file in the 'file' form field"
+            )
+        raw = await upload.read()
+    elif content_type.startswith("text/csv"):
+        raw = await request.body()
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send application/json, text/csv or multipart/form-data"
+        )
+    
+    try:
+        text = raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV must be UTF-8 encoded"
+        )
+    # Empty CSV cells mean "not provided"
+    return [
+        {key.strip(): value for key, value in row.items() if key and value not in (None, "")}
+        for row in csv.DictReader(io.StringIO(text))
+    ]
+
+@app.post(
+    "/api/users/bulk",
+    response_model=UserBulkImportResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": UserCreate.model_json_schema()}},
+                "text/csv": {"schema": {"type": "string"}},
+                "multipart/form-data": {
+                    "schema": {"type": "object", "properties": {"file": {"type": "string", "format": "binary"}}}
+                },
+            },
+        }
+    },
+)
+async def create_users_bulk(
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create many users at once (admin only).
+    
+    Accepts a JSON array of users, or CSV with a header row of
+    name,email,role,organization,password[,avatarUrl]. Rows are validated
+    and inserted independently; the response reports the outcome per row.
+    """
+    if current_user.role != "xebia-admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can create users"
+        )
+    
+    rows = await read_bulk_rows(request)
+    if len(rows) > BULK_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {BULK_IMPORT_MAX_ROWS} users can be imported per request"
+        )
+    
+    db = mongodb.get_db()
+    user_service = UserService(db)
+    return await user_service.import_users(rows)
 
 @app.get("/api/users", response_model=List[User])
 async def get_users(current_user: User = Depends(get_current_user)):
@@ -246,7 +548,7 @@ async def get_users(current_user: User = Depends(get_current_user)):
     
     db = mongodb.get_db()
     user_service = UserService(db)
-    return user_service.get_all_users()
+    return await user_service.get_all_users()
 
 @app.get("/api/users/{user_id}", response_model=User)
 async def get_user(
@@ -257,7 +559,7 @@ async def get_user(
     db = mongodb.get_db()
     user_service = UserService(db)
     
-    user = user_service.get_user_by_id(user_id)
+    user = await user_service.get_user_by_id(user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -290,7 +592,7 @@ async def update_user(
     db = mongodb.get_db()
     user_service = UserService(db)
     
-    user = user_service.update_user(user_id, user_data)
+    user = await user_service.update_user(user_id, user_data)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -314,7 +616,7 @@ async def delete_user(
     db = mongodb.get_db()
     user_service = UserService(db)
     
-    if not user_service.delete_user(user_id):
+    if not await user_service.delete_user(user_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
@@ -330,48 +632,452 @@ async def create_sow(
     db = mongodb.get_db()
     sow_service = SOWService(db)
     
-    return sow_service.create_sow(sow_data)
+    check_trainings(sow_data.selectedTrainings)
+    await link_inventories(sow_data.migrationStages, current_user)
+    return await sow_service.create_sow(sow_data)
+
+def check_trainings(trainings: Optional[List[SelectedTraining]]):
+    """Reject selected trainings that are not in the training catalog."""
+    unknown = training_catalog.unknown_module_ids(trainings or [])
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown training module(s): {', '.join(unknown)}"
+        )
 
-@app.get("/api/sows", response_model=List[SOW])
+async def link_inventories(stages: Optional[List[MigrationStageDetail]], current_user: User):
+    """Fill stages linked to a tracked inventory (`inventoryId`) with its current figures."""
+    if not stages:
+        return
+    tracker = InventoryTracker(mongodb.get_db(), scm_collector)
+    try:
+        await link_stage_inventories(tracker, stages, visible_owner(current_user.id, current_user.role))
+    except LookupError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown inventory: {e.args[0]}"
+        )
+
+def sow_etag(version: int, updated_at: int) -> str:
+    """ETag for one SOW; comments and updates always change updatedAt."""
+    return f'"{version}-{updated_at}"'
+
+def sows_page_etag(stamps: List[tuple], view: str, next_cursor: Optional[str]) -> str:
+    """ETag for a list page, derived from each SOW's (id, currentVersion, updatedAt)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{view}|{next_cursor}".encode())
+    for sow_id, version, updated_at in stamps:
+        digest.update(f"|{sow_id}:{version}:{updated_at}".encode())
+    return f'"{digest.hexdigest()}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak If-None-Match comparison (RFC 9110): W/ prefixes are ignored."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def serialize_sow(sow: Union[SOW, Dict[str, Any]], route: str) -> bytes:
+    """
+    Serialize a SOW model, or a raw document on the FAST_JSON path, and keep
+    the payload in the SOW payload cache.
+    """
+    with response_serialization_duration.time(route, "serialize"):
+        payload = model_json(sow) if isinstance(sow, SOW) else sow_document_json(sow)
+    sow_id, version, updated_at = sow_stamp(sow)
+    sow_payload_cache.set(sow_id, (version, updated_at), payload)
+    return payload
+
+@app.get("/api/sows", response_model=List[Union[SOW, SOWSummary]])
 async def get_sows(
-    status: Optional[str] = None,
+    request: Request,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    view: str = Query("full", pattern="^(full|summary)$"),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all SOWs, optionally filtered by status."""
+    """
+    Get SOWs newest first, optionally filtered by status.
+    
+    Pass `limit` to page through results; the cursor for the next page is
+    returned in the `X-Next-Cursor` header. `view=summary` omits stages,
+    trainings and history. Responses carry an ETag; send it back in
+    `If-None-Match` to get `304 Not Modified` when nothing on the page changed.
+    """
     db = mongodb.get_db()
     sow_service = SOWService(db)
     
     # Clients can only see their own SOWs
     client_id = None if current_user.role in ["xebia-admin", "approver"] else current_user.id
     
-    if status:
+    status_enum = None
+    if status_filter:
         try:
-            status_enum = SOWStatus(status)
-            return sow_service.get_sows_by_status(status_enum, client_id)
+            status_enum = SOWStatus(status_filter)
         except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid status: {status}"
+                detail=f"Invalid status: {status_filter}"
             )
     
-    return sow_service.get_all_sows(client_id)
+    try:
+        if view == "summary":
+            sows, next_cursor = await sow_service.get_sows_page(
+                client_id=client_id,
+                status=status_enum,
+                limit=limit,
+                cursor=cursor,
+                summary=True,
+                validate=not FAST_JSON
+            )
+            stamps = [sow_stamp(sow) for sow in sows]
+        else:
+            # Only read version stamps first; full documents are loaded for cache misses
+            stamp_dicts, next_cursor = await sow_service.get_sow_stamps_page(
+                client_id=client_id,
+                status=status_enum,
+                limit=limit,
+                cursor=cursor
+            )
+            stamps = [sow_stamp(stamp) for stamp in stamp_dicts]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    
+    headers = {"ETag": sows_page_etag(stamps, view, next_cursor), "Cache-Control": "private, no-cache"}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    if view == "summary":
+        with response_serialization_duration.time("/api/sows", "serialize"):
+            payloads = [sow_summary_json(sow) if FAST_JSON else model_json(sow) for sow in sows]
+    else:
+        cached = {
+            sow_id: sow_payload_cache.get(sow_id, (version, updated_at))
+            for sow_id, version, updated_at in stamps
+        }
+        missing = [sow_id for sow_id, payload in cached.items() if payload is None]
+        if missing:
+            for sow_id, sow in (await sow_service.get_sows_by_ids(missing, validate=not FAST_JSON)).items():
+                cached[sow_id] = serialize_sow(sow, "/api/sows")
+        # SOWs deleted since the stamp query are left out
+        payloads = [cached[sow_id] for sow_id, _, _ in stamps if cached[sow_id] is not None]
+    
+    return Response(content=b"[" + b",".join(payloads) + b"]", media_type="application/json", headers=headers)
+
+@app.get("/api/sows/export.csv")
+async def export_sows_csv(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Export SOWs as CSV, newest first, optionally filtered by status.
+    
+    Rows are streamed from a MongoDB cursor as they are read, so memory use
+    does not grow with the number of SOWs exported.
+    """
+    db = mongodb.get_db()
+    sow_service = SOWService(db)
+    
+    # Same visibility rules as GET /api/sows
+    client_id = None if current_user.role in ["xebia-admin", "approver"] else current_user.id
+    
+    status_enum = None
+    if status_filter:
+        try:
+            status_enum = SOWStatus(status_filter)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid status: {status_filter}"
+            )
+    
+    sows = sow_service.iter_sows(SOW_EXPORT_PROJECTION, client_id=client_id, status=status_enum)
+    filename = f"sows-export-{datetime.now(timezone.utc).strftime('%Y-%m-%d')}.csv"
+    return StreamingResponse(
+        stream_sows_csv(sows),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"}
+    )
+
+@app.get("/api/sows/stream")
+async def stream_sows(current_user: User = Depends(get_stream_user)):
+    """
+    Server-sent events for SOW changes the user is allowed to see.
+    
+    Emits `sow` events ({type, id, clientId, status, currentVersion,
+    updatedAt}) and `resync` events when the client should refetch its list.
+    Browsers can pass the JWT as `?token=` because EventSource cannot send headers.
+    """
+    # Same visibility rules as GET /api/sows
+    client_id = None if current_user.role in ["xebia-admin", "approver"] else current_user.id
+    
+    async def event_stream():
+        subscriber = sow_events.subscribe(client_id)
+        try:
+            # Ask EventSource to reconnect after 5 seconds if the connection drops
+            yield b"retry: 5000\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscriber.queue.get(), timeout=SOW_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle connection
+                    frame = b": keepalive\n\n"
+                yield frame
+        finally:
+            sow_events.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/sows/search", response_model=List[SOWSearchResult])
+async def search_sows(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Full-text search over project names, descriptions, client organizations,
+    migration stage details and approval comments, most relevant first.
+    
+    `q` accepts MongoDB text search syntax: words match any stemmed form,
+    "quoted phrases" must all appear and -words exclude SOWs. The cursor for
+    the next page is returned in the `X-Next-Cursor` header; paging stops
+    after SEARCH_MAX_RESULTS results.
+    """
+    db = mongodb.get_db()
+    sow_service = SOWService(db)
+    
+    # Same visibility rules as GET /api/sows
+    client_id = None if current_user.role in ["xebia-admin", "approver"] else current_user.id
+    
+    status_enum = None
+    if status_filter:
+        try:
+            status_enum = SOWStatus(status_filter)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid status: {status_filter}"
+            )
+    
+    try:
+        results, next_cursor = await sow_service.search_sows(
+            q, client_id=client_id, status=status_enum, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return results
 
 @app.get("/api/sows/{sow_id}", response_model=SOW)
 async def get_sow(
     sow_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get SOW by ID.
+    
+    The response carries an ETag; send it back in `If-None-Match` to get
+    `304 Not Modified` while the SOW is unchanged.
+    """
+    db = mongodb.get_db()
+    sow_service = SOWService(db)
+    
+    stamp = await sow_service.get_sow_stamp(sow_id)
+    if not stamp:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="SOW not found"
+        )
+    
+    # Clients can only view their own SOWs
+    if current_user.role == "client" and stamp["clientId"] != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this SOW"
+        )
+    
+    _, version, updated_at = sow_stamp(stamp)
+    headers = {"ETag": sow_etag(version, updated_at), "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    payload = sow_payload_cache.get(sow_id, (version, updated_at))
+    if payload is None:
+        sow = (await sow_service.get_sows_by_ids([sow_id], validate=not FAST_JSON)).get(sow_id)
+        if not sow:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="SOW not found"
+            )
+        payload = serialize_sow(sow, "/api/sows/{sow_id}")
+        _, version, updated_at = sow_stamp(sow)
+        headers["ETag"] = sow_etag(version, updated_at)
+    
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+def check_render_format(fmt: str):
+    """400 for unknown formats, 501 for PDF when WeasyPrint is not installed."""
+    if fmt not in RENDER_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format: {fmt}"
+        )
+    if fmt == "pdf" and not PDF_AVAILABLE:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="PDF rendering requires the 'weasyprint' package"
+        )
+
+@app.get("/api/sows/{sow_id}/render")
+async def render_sow(
+    sow_id: str,
+    fmt: str = Query("html", alias="format"),
     current_user: User = Depends(get_current_user)
 ):
-    """Get SOW by ID."""
+    """
+    Render a SOW as a printable HTML page or PDF.
+    
+    Rendered documents are cached per (SOW id, version), so exporting an
+    unchanged SOW again does not re-render it.
+    """
+    check_render_format(fmt)
     db = mongodb.get_db()
     sow_service = SOWService(db)
     
-    sow = sow_service.get_sow_by_id(sow_id)
+    stamp = await sow_service.get_sow_stamp(sow_id)
+    if not stamp:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="SOW not found"
+        )
+    
+    # Clients can only view their own SOWs
+    if current_user.role == "client" and stamp["clientId"] != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this SOW"
+        )
+    
+    [document] = await render_sows(sow_service, [stamp], fmt)
+    if document is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="SOW not found"
+        )
+    
+    media_type, _ = RENDER_FORMATS[fmt]
+    disposition = "inline" if fmt == "html" else "attachment"
+    return Response(
+        content=document,
+        media_type=media_type,
+        headers={"Content-Disposition": f'{disposition}; filename="{render_filename(stamp, fmt)}"'}
+    )
+
+@app.get("/api/sows/{sow_id}/estimate", response_model=SOWEstimate)
+async def get_sow_estimate(
+    sow_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get the breakdown behind a SOW's estimatedValue and estimatedDuration."""
+    db = mongodb.get_db()
+    sow_service = SOWService(db)
+    
+    sow = await sow_service.get_sow_estimate_inputs(sow_id)
     if not sow:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="SOW not found"
         )
     
+    # Clients can only view their own SOWs
+    if current_user.role == "client" and sow["clientId"] != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this SOW"
+        )
+    
+    return cached_estimate(sow)
+
+@app.get("/api/sows/{sow_id}/revisions", response_model=List[SOWRevision])
+async def get_sow_revisions(
+    sow_id: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get a SOW's revision history, newest version first.
+    
+    Pass `limit` to page through results; the cursor for the next page is
+    returned in the `X-Next-Cursor` header.
+    """
+    db = mongodb.get_db()
+    sow_service = SOWService(db)
+    
+    sow = await sow_service.get_sow_by_id(sow_id)
+    if not sow:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="SOW not found"
+        )
+    
+    # Clients can only view their own SOWs
+    if current_user.role == "client" and sow.clientId != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this SOW"
+        )
+    
+    try:
+        revisions, next_cursor = await sow_service.get_revisions_page(sow_id, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return revisions
+
+@app.get("/api/sows/{sow_id}/versions/{version}", response_model=SOW)
+async def get_sow_version(
+    sow_id: str,
+    version: int,
+    current_user: User = Depends(get_current_user)
+):
+    """Get a SOW as it was at a given version."""
+    db = mongodb.get_db()
+    sow_service = SOWService(db)
+    
+    sow = await sow_service.get_sow_at_version(sow_id, version)
+    if not sow:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="SOW version not found"
+        )
+    
     # Clients can only view their own SOWs
     if current_user.role == "client" and sow.clientId != current_user.id:
         raise HTTPException(
@@ -387,26 +1093,33 @@ async def update_sow(
     sow_data: SOWUpdate,
     current_user: User = Depends(get_current_user)
 ):
-    """Update SOW information."""
+    """
+    Update SOW information.
+    
+    Send `expectedVersion` (the `currentVersion` you last read) to get a 409
+    instead of overwriting someone else's concurrent edit.
+    """
     db = mongodb.get_db()
     sow_service = SOWService(db)
     
-    # Get existing SOW to check permissions
-    existing_sow = sow_service.get_sow_by_id(sow_id)
-    if not existing_sow:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="SOW not found"
-        )
+    # Clients can only update their own SOWs; checked atomically with the update
+    owner_id = current_user.id if current_user.role == "client" else None
     
-    # Check permissions
-    if current_user.role == "client" and existing_sow.clientId != current_user.id:
+    check_trainings(sow_data.selectedTrainings)
+    await link_inventories(sow_data.migrationStages, current_user)
+    try:
+        sow = await sow_service.update_sow(sow_id, sow_data, current_user.id, current_user.name, owner_id=owner_id)
+    except PermissionError:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this SOW"
         )
+    except SOWVersionConflict as conflict:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"SOW was modified concurrently; current version is {conflict.current_version}"
+        )
     
-    sow = sow_service.update_sow(sow_id, sow_data, current_user.id, current_user.name)
     if not sow:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -426,7 +1139,7 @@ async def delete_sow(
     
     # Use atomic delete with permission check to prevent race conditions
     is_admin = current_user.role == "xebia-admin"
-    deleted = sow_service.delete_sow_with_permission(sow_id, current_user.id, is_admin)
+    deleted = await sow_service.delete_sow_with_permission(sow_id, current_user.id, is_admin)
     
     if not deleted:
         # Atomic operation failed - either SOW not found or permission denied
@@ -437,6 +1150,116 @@ async def delete_sow(
             detail="SOW not found or not authorized"
         )
 
+@app.post("/api/sows/bulk", response_model=SOWBulkResponse)
+async def bulk_sow_operation(
+    request: SOWBulkRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Apply one operation to many SOWs: set status, assign an approver, or delete.
+    
+    Permissions are checked per SOW exactly as for the single-SOW endpoints
+    (clients only touch their own SOWs, only admins delete others'), and each
+    updated SOW gets its own revision. Results are reported per SOW; one
+    failing item does not stop the others.
+    """
+    db = mongodb.get_db()
+    sow_service = SOWService(db)
+    
+    # Preserve request order but act on each SOW once
+    sow_ids = list(dict.fromkeys(request.sowIds))
+    results = []
+    
+    if request.action == SOWBulkAction.DELETE:
+        is_admin = current_user.role == "xebia-admin"
+        deleted = await sow_service.bulk_delete_sows(sow_ids, current_user.id, is_admin)
+        for sow_id in sow_ids:
+            if deleted[sow_id]:
+                results.append(SOWBulkItemResult(id=sow_id, status="deleted"))
+            else:
+                results.append(SOWBulkItemResult(id=sow_id, status="error", error="SOW not found or not authorized"))
+    else:
+        if request.action == SOWBulkAction.SET_STATUS:
+            if request.status is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="status is required for set-status"
+                )
+            fields = {"status": request.status.value}
+        else:
+            if not request.approverId:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="approverId is required for assign-approver"
+                )
+            fields = {"currentApproverId": request.approverId}
+        
+        # Clients can only update their own SOWs; checked in the update filter
+        owner_id = current_user.id if current_user.role == "client" else None
+        outcomes = await sow_service.bulk_update_sows(
+            sow_ids, fields, current_user.id, current_user.name, owner_id=owner_id
+        )
+        errors = {
+            "not-found": "SOW not found or not authorized",
+            "conflict": "SOW was modified concurrently; retry",
+        }
+        for sow_id in sow_ids:
+            outcome, version = outcomes[sow_id]
+            if outcome in errors:
+                results.append(SOWBulkItemResult(id=sow_id, status="error", error=errors[outcome]))
+            else:
+                results.append(SOWBulkItemResult(id=sow_id, status=outcome, currentVersion=version))
+    
+    failed = sum(1 for result in results if result.status == "error")
+    return SOWBulkResponse(succeeded=len(results) - failed, failed=failed, results=results)
+
+@app.post("/api/sows/render-batch")
+async def render_sows_batch(
+    request: SOWRenderBatchRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Render many SOWs into one zip archive (one HTML or PDF file per SOW).
+    
+    Select SOWs by `sowIds`, or by `status` and an `approvedFrom`/`approvedTo`
+    range (e.g. a quarter's approved SOWs). Clients only get their own SOWs;
+    requested ids that are missing or not visible are listed in MISSING.txt.
+    """
+    check_render_format(request.format)
+    db = mongodb.get_db()
+    sow_service = SOWService(db)
+    
+    # Same visibility rules as GET /api/sows
+    client_id = None if current_user.role in ["xebia-admin", "approver"] else current_user.id
+    
+    try:
+        stamps = await find_render_stamps(sow_service, request, client_id)
+    except InvalidRenderBatch as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    archive = tempfile.SpooledTemporaryFile(max_size=RENDER_ZIP_SPOOL_BYTES)
+    try:
+        await write_render_archive(sow_service, stamps, request.format, request.sowIds or [], archive)
+        archive.seek(0)
+    except BaseException:
+        archive.close()
+        raise
+    
+    def read_archive():
+        with archive:
+            while chunk := archive.read(64 * 1024):
+                yield chunk
+    
+    filename = f"sows-{request.format}-{datetime.now(timezone.utc).strftime('%Y-%m-%d')}.zip"
+    return StreamingResponse(
+        read_archive(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @app.post("/api/sows/{sow_id}/comments", response_model=SOW)
 async def add_approval_comment(
     sow_id: str,
@@ -447,7 +1270,7 @@ async def add_approval_comment(
     db = mongodb.get_db()
     sow_service = SOWService(db)
     
-    sow = sow_service.add_approval_comment(sow_id, comment)
+    sow = await sow_service.add_approval_comment(sow_id, comment)
     if not sow:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -456,6 +1279,347 @@ async def add_approval_comment(
     
     return sow
 
+# Training catalog endpoints
+@app.get("/api/training-modules", response_model=List[TrainingModule])
+async def get_training_modules(
+    request: Request,
+    track: Optional[TrainingTrack] = None,
+    level: Optional[TrainingLevel] = None
+):
+    """
+    Training module catalog, optionally filtered by track and level.
+    
+    The catalog only changes with a deploy: responses carry an ETag and
+    `If-None-Match` gets `304 Not Modified`.
+    """
+    body, etag = training_catalog.response(track, level)
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=300"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.get("/api/training-modules/{module_id}", response_model=TrainingModule)
+async def get_training_module(module_id: str):
+    """Get one training module by id."""
+    module = training_catalog.get(module_id)
+    if not module:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Training module not found"
+        )
+    return module
+
+# Estimate endpoints
+@app.post("/api/estimates", response_model=SOWEstimate)
+async def estimate_draft(
+    draft: SOWBase,
+    current_user: User = Depends(get_current_user)
+):
+    """Estimate a SOW draft without saving it (what the SOW form shows while editing)."""
+    check_trainings(draft.selectedTrainings)
+    return estimate_sow(draft)
+
+@app.get("/api/estimates/portfolio", response_model=PortfolioEstimate)
+async def estimate_portfolio_report(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    details: bool = Query(False),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Estimate totals over all SOWs the user can see, by status and by stage
+    type. With `details=true`, also one row per SOW.
+    
+    Estimates are cached per SOW version, so only SOWs changed since the
+    last report are re-estimated.
+    """
+    db = mongodb.get_db()
+    sow_service = SOWService(db)
+    
+    # Same visibility rules as GET /api/sows
+    client_id = None if current_user.role in ["xebia-admin", "approver"] else current_user.id
+    
+    status_enum = None
+    if status_filter:
+        try:
+            status_enum = SOWStatus(status_filter)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid status: {status_filter}"
+            )
+    
+    return await estimate_portfolio(sow_service, client_id=client_id, status=status_enum, details=details)
+
+# Analytics endpoints
+async def analytics_scope(current_user: User) -> Optional[str]:
+    """Apply this process's pending rollup refreshes, then return the client filter for the user."""
+    await rollup_refresher.flush()
+    # Same visibility rules as GET /api/sows
+    return None if current_user.role in ["xebia-admin", "approver"] else current_user.id
+
+@app.get("/api/analytics/summary", response_model=AnalyticsSummary)
+async def analytics_summary(current_user: User = Depends(get_current_user)):
+    """SOW counts and value by status, approval rate and average approval turnaround."""
+    client_id = await analytics_scope(current_user)
+    return await get_summary(mongodb.get_db(), client_id)
+
+@app.get("/api/analytics/organizations", response_model=List[OrganizationAnalytics])
+async def analytics_organizations(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(get_current_user)
+):
+    """SOW count and estimated value per client organization, largest value first."""
+    client_id = await analytics_scope(current_user)
+    return await get_organizations(mongodb.get_db(), client_id, limit)
+
+@app.get("/api/analytics/monthly", response_model=List[MonthlyAnalytics])
+async def analytics_monthly(
+    months: int = Query(12, ge=1, le=120),
+    current_user: User = Depends(get_current_user)
+):
+    """SOWs created per month over the last `months` months, with approvals and turnaround."""
+    client_id = await analytics_scope(current_user)
+    return await get_monthly(mongodb.get_db(), client_id, months)
+
+# SCM inventory endpoints
+@app.post("/api/scm/inventory", response_model=ScmInventoryResponse)
+async def collect_scm_inventory(
+    request: ScmInventoryRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Collect the repository inventory of a whole organization, group or workspace.
+    
+    Repositories are listed concurrently and the result is cached; set
+    `refresh` to collect again before the cache expires. Admins and
+    approvers who send no `token` use the server's configured token for the
+    platform; everyone else without a token only sees public repositories.
+    """
+    try:
+        return await scm_collector.collect(
+            request.platform.value,
+            request.organization.strip(),
+            token=scm_token(request.token, request.platform.value, current_user),
+            deep=request.deep,
+            refresh=request.refresh
+        )
+    except ScmError as e:
+        raise scm_http_error(e)
+
+def scm_token(token: Optional[str], platform: str, current_user: User) -> Optional[str]:
+    """The user's token, or the server's token for admins and approvers who send none."""
+    if not token and current_user.role in ["xebia-admin", "approver"]:
+        return SCM_SERVER_TOKENS[platform]
+    return token
+
+def scm_http_error(error: ScmError) -> HTTPException:
+    """HTTP error for a failed platform request; rate limits carry Retry-After."""
+    if isinstance(error, ScmRateLimited):
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=error.message,
+            headers={"Retry-After": str(error.retry_after)}
+        )
+    return HTTPException(status_code=error.status_code, detail=error.message)
+
+@app.post("/api/scm/inventories", response_model=TrackedInventory, status_code=status.HTTP_201_CREATED)
+async def track_scm_inventory(
+    request: ScmTrackRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Start tracking an organization's inventory and collect it in full.
+    
+    Returns the existing tracked inventory if you already track the same
+    organization. Link migration stages to it with `inventoryId`.
+    """
+    tracker = InventoryTracker(mongodb.get_db(), scm_collector)
+    try:
+        return await tracker.create(
+            request.platform.value,
+            request.organization.strip(),
+            request.deep,
+            {"id": current_user.id, "name": current_user.name},
+            scm_token(request.token, request.platform.value, current_user)
+        )
+    except ScmError as e:
+        raise scm_http_error(e)
+
+@app.get("/api/scm/inventories", response_model=List[TrackedInventory])
+async def get_scm_inventories(current_user: User = Depends(get_current_user)):
+    """Tracked inventories, newest first (clients see the ones they created)."""
+    tracker = InventoryTracker(mongodb.get_db(), scm_collector)
+    return await tracker.get_all(visible_owner(current_user.id, current_user.role))
+
+@app.get("/api/scm/inventories/{inventory_id}", response_model=TrackedInventory)
+async def get_scm_inventory(
+    inventory_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get a tracked inventory and what its last refresh changed."""
+    tracker = InventoryTracker(mongodb.get_db(), scm_collector)
+    inventory = await tracker.get(inventory_id, visible_owner(current_user.id, current_user.role))
+    if not inventory:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Inventory not found"
+        )
+    return inventory
+
+@app.post("/api/scm/inventories/{inventory_id}/refresh", response_model=TrackedInventory)
+async def refresh_scm_inventory(
+    inventory_id: str,
+    request: ScmRefreshRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Bring a tracked inventory up to date.
+    
+    Only repositories that are new or were pushed since the last refresh are
+    scanned again; open SOWs with linked stages get the new figures.
+    """
+    tracker = InventoryTracker(mongodb.get_db(), scm_collector)
+    inventory = await tracker.get(inventory_id, visible_owner(current_user.id, current_user.role))
+    if not inventory:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Inventory not found"
+        )
+    
+    try:
+        return await tracker.refresh(inventory_id, scm_token(request.token, inventory["platform"], current_user))
+    except InventoryRefreshRunning:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A refresh of this inventory is already running"
+        )
+    except ScmError as e:
+        raise scm_http_error(e)
+
+@app.delete("/api/scm/inventories/{inventory_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_scm_inventory(
+    inventory_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Stop tracking an inventory; linked stages keep their last figures."""
+    tracker = InventoryTracker(mongodb.get_db(), scm_collector)
+    if not await tracker.delete(inventory_id, visible_owner(current_user.id, current_user.role)):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Inventory not found"
+        )
+
+# Job endpoints
+def job_visible_to(job: Dict[str, Any], user: User) -> bool:
+    """Users see their own jobs; admins see all."""
+    return user.role == "xebia-admin" or job["requestedBy"]["id"] == user.id
+
+@app.post("/api/jobs", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(
+    job_create: JobCreate,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Queue a background job and return it immediately.
+    
+    Poll `GET /api/jobs/{job_id}` for status and progress; jobs that produce
+    a file are downloaded from `GET /api/jobs/{job_id}/result`.
+    """
+    registered = JOB_TYPES.get(job_create.type)
+    if registered is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown job type: {job_create.type}"
+        )
+    if registered.roles is not None and current_user.role not in registered.roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not authorized to run {job_create.type} jobs"
+        )
+    try:
+        params = registered.params_model(**job_create.params)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=e.errors(include_url=False, include_context=False)
+        )
+    
+    db = mongodb.get_db()
+    job_queue = JobQueue(db)
+    job = await job_queue.submit(
+        registered, params, {"id": current_user.id, "name": current_user.name, "role": current_user.role}
+    )
+    job_worker.notify()
+    return job
+
+@app.get("/api/jobs", response_model=List[Job])
+async def get_jobs(
+    status_filter: Optional[JobStatus] = Query(None, alias="status"),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the user's jobs newest first (admins get everyone's)."""
+    db = mongodb.get_db()
+    job_queue = JobQueue(db)
+    requester_id = None if current_user.role == "xebia-admin" else current_user.id
+    return await job_queue.list_jobs(
+        requester_id=requester_id,
+        status=status_filter.value if status_filter else None,
+        limit=limit
+    )
+
+@app.get("/api/jobs/{job_id}", response_model=Job)
+async def get_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get a job's status, progress and result."""
+    db = mongodb.get_db()
+    job_queue = JobQueue(db)
+    
+    job = await job_queue.get(job_id)
+    if not job or not job_visible_to(job, current_user):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Download the file a finished job produced."""
+    db = mongodb.get_db()
+    job_queue = JobQueue(db)
+    
+    job = await job_queue.get(job_id)
+    if not job or not job_visible_to(job, current_user):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    if job["status"] != JobStatus.SUCCEEDED.value:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job is {job['status']}"
+        )
+    if not job.get("file"):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job has no result file"
+        )
+    
+    return StreamingResponse(
+        job_queue.read_file(job_id),
+        media_type=job["file"]["mediaType"],
+        headers={
+            "Content-Disposition": f'attachment; filename="{job["file"]["name"]}"',
+            "Content-Length": str(job["file"]["size"]),
+        }
+    )
+
 if __name__ == "__main__":
     import uvicorn
     
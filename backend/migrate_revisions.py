@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+One-off migration: move embedded SOW revisionHistory arrays into the
+sow_revisions collection.
+
+Safe to run more than once and while the API is serving traffic; SOWs that
+were already migrated are skipped.
+
+    python migrate_revisions.py
+"""
+import asyncio
+
+from database import mongodb
+from crud import SOWService
+
+async def main():
+    await mongodb.connect()
+    try:
+        sow_service = SOWService(mongodb.get_db())
+        result = await sow_service.migrate_embedded_revisions()
+        print(f"✅ Migrated {result['revisions']} revision(s) from {result['sows']} SOW(s)")
+    finally:
+        await mongodb.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
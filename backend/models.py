@@ -2,7 +2,7 @@
 Pydantic models for request/response validation and MongoDB documents.
 """
 from pydantic import BaseModel, Field, EmailStr, field_validator
-from typing import List, Optional, Any, Dict
+from typing import List, Optional, Any, Dict, Union
 from enum import Enum
 import re
 
@@ -34,6 +34,13 @@ class GitHubMigrationType(str, Enum):
     GITHUB_EMU = "github-emu"
     GHES = "ghes"
 
+class SCMPlatform(str, Enum):
+    """SCM platforms the inventory collector can scan."""
+    GITHUB = "github"
+    GITLAB = "gitlab"
+    BITBUCKET = "bitbucket"
+    AZURE_DEVOPS = "azure-devops"
+
 class TrainingTrack(str, Enum):
     """Training track enumeration."""
     GITHUB = "github"
@@ -93,6 +100,20 @@ class User(UserBase):
     class Config:
         from_attributes = True
 
+class UserBulkResult(BaseModel):
+    """Outcome of one row of a bulk user import."""
+    row: int  # 1-based position in the submitted list/CSV (header excluded)
+    email: Optional[str] = None
+    status: str  # 'created' | 'error'
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class UserBulkImportResponse(BaseModel):
+    """Bulk user import response."""
+    created: int
+    failed: int
+    results: List[UserBulkResult]
+
 # Repository Inventory Models
 class RepositoryInventory(BaseModel):
     """Repository inventory model."""
@@ -107,6 +128,61 @@ class RepositoryInventory(BaseModel):
     averageRepoSizeMB: float = Field(0.0, ge=0)
     usersToMigrate: Optional[int] = Field(None, ge=0)
 
+class ScmInventoryRequest(BaseModel):
+    """Organization to collect a repository inventory for (POST /api/scm/inventory)."""
+    platform: SCMPlatform
+    organization: str = Field(..., min_length=1, max_length=200, pattern=r"^[A-Za-z0-9][A-Za-z0-9_.\-/ ]*$")
+    token: Optional[str] = Field(None, max_length=500)
+    deep: bool = False  # also read per-repository languages, .gitmodules and .gitattributes
+    refresh: bool = False  # ignore a recently cached inventory
+
+class ScmInventoryResponse(BaseModel):
+    """Repository inventory collected from an SCM platform."""
+    platform: SCMPlatform
+    organization: str
+    inventory: RepositoryInventory
+    fetchedAt: int
+    cached: bool
+
+class ScmTrackRequest(BaseModel):
+    """Organization to track with incremental refreshes (POST /api/scm/inventories)."""
+    platform: SCMPlatform
+    organization: str = Field(..., min_length=1, max_length=200, pattern=r"^[A-Za-z0-9][A-Za-z0-9_.\-/ ]*$")
+    token: Optional[str] = Field(None, max_length=500)
+    deep: bool = False
+
+class ScmRefreshRequest(BaseModel):
+    """Token for refreshing a tracked inventory (never stored)."""
+    token: Optional[str] = Field(None, max_length=500)
+
+class InventoryRefreshStats(BaseModel):
+    """What the last refresh of a tracked inventory did."""
+    added: int
+    changed: int
+    removed: int
+    unchanged: int
+    detailsFetched: int  # repositories deep-scanned (new or pushed since the last refresh)
+    sowsUpdated: int  # open SOWs whose linked stages got the new figures
+    sowsFailed: int = 0  # open SOWs that could not be updated (e.g. concurrent edit)
+    durationMs: int
+
+class InventoryOwner(BaseModel):
+    """User who started tracking an inventory."""
+    id: str
+    name: str
+
+class TrackedInventory(BaseModel):
+    """Organization inventory kept current from per-repository snapshots."""
+    id: str
+    platform: SCMPlatform
+    organization: str
+    deep: bool
+    inventory: RepositoryInventory
+    createdBy: InventoryOwner
+    createdAt: int
+    refreshedAt: Optional[int] = None
+    lastRefresh: Optional[InventoryRefreshStats] = None
+
 # Migration Stage Models
 class MigrationStageDetail(BaseModel):
     """Migration stage detail model."""
@@ -117,6 +193,7 @@ class MigrationStageDetail(BaseModel):
     automated: bool
     githubMigrationType: Optional[GitHubMigrationType] = None
     repositoryInventory: Optional[RepositoryInventory] = None
+    inventoryId: Optional[str] = None  # tracked inventory that keeps repositoryInventory current
     estimatedManHours: Optional[float] = Field(None, ge=0)
     includeCICDMigration: Optional[bool] = None
     cicdPlatform: Optional[str] = Field(None, max_length=100)
@@ -150,21 +227,24 @@ class ApprovalComment(BaseModel):
 
 # SOW Revision Models
 class SOWRevisionChange(BaseModel):
-    """SOW revision change model."""
+    """SOW revision change model (one changed leaf, dot-separated path in `field`)."""
     field: str
+    op: Optional[str] = None  # 'replace' | 'add' | 'remove'
     oldValue: Any
     newValue: Any
 
 class SOWRevision(BaseModel):
-    """SOW revision model."""
+    """SOW revision model, stored one document per revision in `sow_revisions`."""
     id: str
+    sowId: Optional[str] = None
     version: int
     timestamp: int
     changedBy: str
     changedByName: str
     changeDescription: str
     changes: List[SOWRevisionChange] = []
-    snapshot: Dict[str, Any]
+    # Full pre-update state, only stored on keyframe revisions
+    snapshot: Optional[Dict[str, Any]] = None
 
 # SOW Models
 class SOWBase(BaseModel):
@@ -192,8 +272,8 @@ class SOWUpdate(BaseModel):
     migrationStages: Optional[List[MigrationStageDetail]] = None
     selectedTrainings: Optional[List[SelectedTraining]] = None
     currentApproverId: Optional[str] = None
-    estimatedValue: Optional[float] = None
-    estimatedDuration: Optional[float] = None
+    # Optimistic concurrency: reject the update unless the SOW is still at this version
+    expectedVersion: Optional[int] = Field(None, ge=1)
 
 class SOW(SOWBase):
     """Complete SOW model."""
@@ -208,14 +288,197 @@ class SOW(SOWBase):
     approvedAt: Optional[int] = None
     approvalHistory: List[ApprovalComment] = []
     currentApproverId: Optional[str] = None
+    # Computed by estimation.py whenever the stages or trainings change
     estimatedValue: Optional[float] = None
     estimatedDuration: Optional[float] = None
     currentVersion: int = 1
+    # Kept for response compatibility; revisions are served by GET /api/sows/{id}/revisions
     revisionHistory: List[SOWRevision] = []
 
     class Config:
         from_attributes = True
 
+class SOWSummary(BaseModel):
+    """Lightweight SOW projection for list views (no stages, trainings or history)."""
+    id: str
+    projectName: str
+    clientId: str
+    clientName: str
+    clientOrganization: str
+    status: SOWStatus = SOWStatus.DRAFT
+    includeMigration: bool = False
+    includeTraining: bool = False
+    createdAt: int
+    updatedAt: int
+    submittedAt: Optional[int] = None
+    approvedAt: Optional[int] = None
+    currentApproverId: Optional[str] = None
+    estimatedValue: Optional[float] = None
+    estimatedDuration: Optional[float] = None
+    currentVersion: int = 1
+
+class SOWSearchResult(SOWSummary):
+    """SOW summary matched by GET /api/sows/search, with its text relevance score."""
+    score: float
+
+class SOWBulkAction(str, Enum):
+    """Operations supported by POST /api/sows/bulk."""
+    SET_STATUS = "set-status"
+    ASSIGN_APPROVER = "assign-approver"
+    DELETE = "delete"
+
+class SOWBulkRequest(BaseModel):
+    """Bulk SOW operation request."""
+    action: SOWBulkAction
+    sowIds: List[str] = Field(..., min_length=1, max_length=500)
+    status: Optional[SOWStatus] = None  # required for set-status
+    approverId: Optional[str] = None  # required for assign-approver
+
+class SOWBulkItemResult(BaseModel):
+    """Outcome of a bulk operation for one SOW."""
+    id: str
+    status: str  # 'updated' | 'unchanged' | 'deleted' | 'error'
+    currentVersion: Optional[int] = None
+    error: Optional[str] = None
+
+class SOWBulkResponse(BaseModel):
+    """Bulk SOW operation response."""
+    succeeded: int
+    failed: int
+    results: List[SOWBulkItemResult]
+
+class SOWRenderBatchRequest(BaseModel):
+    """Batch render request: explicit SOW ids, or a status/approval-date filter."""
+    sowIds: Optional[List[str]] = Field(None, min_length=1, max_length=500)
+    status: Optional[SOWStatus] = None
+    approvedFrom: Optional[int] = None  # epoch ms, inclusive
+    approvedTo: Optional[int] = None  # epoch ms, exclusive
+    format: str = Field("html", pattern="^(html|pdf)$")
+
+# Estimate Models
+class StageEstimate(BaseModel):
+    """Estimate of one migration stage."""
+    stage: MigrationStage
+    hours: float
+    weeks: int
+    cost: float
+
+class TrainingEstimate(BaseModel):
+    """Estimate of one selected training module."""
+    moduleId: str
+    participants: int
+    sessions: int
+    hours: float  # trainer delivery hours over all sessions
+    cost: float
+
+class SOWEstimate(BaseModel):
+    """Server-computed SOW estimate with its breakdown."""
+    estimatedValue: float
+    estimatedDuration: float  # weeks
+    migrationHours: float
+    trainingHours: float
+    stages: List[StageEstimate] = []
+    trainings: List[TrainingEstimate] = []
+
+class PortfolioEstimate(BaseModel):
+    """Estimate totals over all SOWs visible to the user."""
+    totals: Dict[str, Union[int, float]]
+    byStatus: Dict[str, Dict[str, Union[int, float]]]
+    byStage: Dict[str, Dict[str, Union[int, float]]]
+    sows: Optional[List[Dict[str, Any]]] = None
+
+# Analytics Models
+class StatusTotals(BaseModel):
+    """SOW count and estimated value of one status."""
+    sows: int
+    estimatedValue: float
+
+class AnalyticsSummary(BaseModel):
+    """Dashboard totals over the SOWs visible to the user."""
+    totalSOWs: int
+    estimatedValue: float
+    byStatus: Dict[str, StatusTotals]
+    approvalRate: float  # percent of SOWs that are approved
+    avgApprovalTimeDays: Optional[float] = None  # submittedAt to approvedAt
+
+class OrganizationAnalytics(BaseModel):
+    """SOW totals of one client organization."""
+    clientOrganization: str
+    sows: int
+    approved: int
+    estimatedValue: float
+
+class MonthlyAnalytics(BaseModel):
+    """SOW totals of one month of creation (YYYY-MM, UTC)."""
+    month: str
+    sows: int
+    approved: int
+    estimatedValue: float
+    avgApprovalTimeDays: Optional[float] = None
+
+class SOWExportRequest(BaseModel):
+    """Parameters of a CSV export job (same filter as GET /api/sows/export.csv)."""
+    status: Optional[SOWStatus] = None
+
+class UserImportRequest(BaseModel):
+    """Parameters of a bulk user import job (rows as accepted by POST /api/users/bulk)."""
+    users: List[Dict[str, Any]] = Field(..., min_length=1)
+
+class InventoryRefreshJobParams(BaseModel):
+    """Parameters of a tracked inventory refresh job (uses the server's SCM token)."""
+    inventoryId: str
+
+class NoJobParams(BaseModel):
+    """Parameters of jobs that take none."""
+
+# Job Models
+class JobStatus(str, Enum):
+    """Background job status enumeration."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class JobCreate(BaseModel):
+    """Job submission."""
+    type: str
+    params: Dict[str, Any] = {}
+
+class JobProgress(BaseModel):
+    """Progress reported by a running job."""
+    done: int = 0
+    total: Optional[int] = None
+    message: Optional[str] = None
+
+class JobFile(BaseModel):
+    """File produced by a job, downloadable from GET /api/jobs/{job_id}/result."""
+    name: str
+    mediaType: str
+    size: int
+
+class JobRequester(BaseModel):
+    """User who submitted a job."""
+    id: str
+    name: str
+    role: str
+
+class Job(BaseModel):
+    """Background job model."""
+    id: str
+    type: str
+    status: JobStatus
+    params: Dict[str, Any]
+    progress: JobProgress
+    result: Optional[Any] = None
+    file: Optional[JobFile] = None
+    error: Optional[str] = None  # last failure, also kept while a retry is queued
+    attempts: int
+    maxAttempts: int
+    requestedBy: JobRequester
+    createdAt: int
+    startedAt: Optional[int] = None
+    finishedAt: Optional[int] = None
+
 # Authentication Models
 class Token(BaseModel):
     """Token model."""
@@ -1,76 +1,406 @@
 """
-Simple in-memory rate limiter for API endpoints.
+Rate limiter for API endpoints with pluggable storage.
+
+Counts use the sliding-window-counter approximation: each key keeps only the
+hit count of the current and the previous fixed window, and the previous
+window's count is weighted by how much of it still overlaps the sliding
+window. That is O(1) memory per key regardless of traffic.
+
+Storage backends:
+    memory  - per-process dict (default; limits are per worker)
+    mongodb - shared `rate_limits` collection with a TTL index
+    redis   - shared Redis-compatible store (requires the `redis` package)
+
+Select one with RATE_LIMIT_BACKEND.
+
+RateLimitMiddleware applies per-route-group, per-client token buckets to
+every API request (api_limiter); those buckets are always per process.
 """
-from datetime import datetime, timezone, timedelta
-from collections import defaultdict
-from typing import Dict, Tuple
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from pymongo import ReturnDocument
+import asyncio
+import math
+import os
+import re
 import threading
+import time
+
+from database import mongodb
+
+class RateLimitStorage(ABC):
+    """Interface for fixed-window hit counters shared by RateLimiter."""
+    
+    @abstractmethod
+    async def increment(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        """
+        Count one hit for `key` in fixed window number `window`.
+        
+        Returns:
+            Tuple of (hits in this window including this one, hits in the previous window)
+        """
+    
+    @abstractmethod
+    async def decrement(self, key: str, window: int, window_seconds: int):
+        """Undo one hit recorded by increment (used for rejected requests)."""
+    
+    @abstractmethod
+    async def reset(self, key: str):
+        """Forget all hits for `key`."""
+    
+    def cleanup(self, window: int):
+        """Drop counters older than the previous window (shared stores expire on their own)."""
+
+class MemoryRateLimitStorage(RateLimitStorage):
+    """Thread-safe per-process storage; stale keys are swept as windows roll over."""
+    
+    def __init__(self):
+        # key -> [window, hits in window, hits in previous window]
+        self.counters: Dict[str, list] = {}
+        self.lock = threading.Lock()
+        self.last_sweep_window = 0
+    
+    def _roll(self, key: str, window: int) -> list:
+        counter = self.counters.get(key)
+        if counter is None or counter[0] < window - 1:
+            counter = [window, 0, 0]
+        elif counter[0] == window - 1:
+            counter = [window, 0, counter[1]]
+        self.counters[key] = counter
+        return counter
+    
+    async def increment(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        with self.lock:
+            if window > self.last_sweep_window:
+                self._sweep(window)
+            counter = self._roll(key, window)
+            counter[1] += 1
+            return counter[1], counter[2]
+    
+    async def decrement(self, key: str, window: int, window_seconds: int):
+        with self.lock:
+            counter = self.counters.get(key)
+            if counter is not None and counter[0] == window and counter[1] > 0:
+                counter[1] -= 1
+    
+    async def reset(self, key: str):
+        with self.lock:
+            self.counters.pop(key, None)
+    
+    def _sweep(self, window: int):
+        stale = [key for key, counter in self.counters.items() if counter[0] < window - 1]
+        for key in stale:
+            del self.counters[key]
+        self.last_sweep_window = window
+    
+    def cleanup(self, window: int):
+        with self.lock:
+            self._sweep(window)
+
+class MongoRateLimitStorage(RateLimitStorage):
+    """
+    Counters in the `rate_limits` collection, one document per key and window.
+    Documents carry an `expiresAt` date and are removed by the TTL index that
+    database.MongoDB creates on startup.
+    """
+    
+    def __init__(self, collection_name: str = "rate_limits"):
+        self.collection_name = collection_name
+    
+    @property
+    def collection(self):
+        # Resolved lazily: the limiter is created at import, before the app connects
+        return mongodb.get_db()[self.collection_name]
+    
+    async def increment(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        # Keep each window until the one after it has also ended
+        expires_at = datetime.fromtimestamp((window + 2) * window_seconds, tz=timezone.utc)
+        current = await self.collection.find_one_and_update(
+            {"_id": f"{key}:{window}"},
+            {"$inc": {"hits": 1}, "$setOnInsert": {"expiresAt": expires_at}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        previous = await self.collection.find_one({"_id": f"{key}:{window - 1}"}, {"hits": 1})
+        return current["hits"], previous["hits"] if previous else 0
+    
+    async def decrement(self, key: str, window: int, window_seconds: int):
+        await self.collection.update_one({"_id": f"{key}:{window}", "hits": {"$gt": 0}}, {"$inc": {"hits": -1}})
+    
+    async def reset(self, key: str):
+        await self.collection.delete_many({"_id": {"$regex": f"^{re.escape(key)}:"}})
+
+class RedisRateLimitStorage(RateLimitStorage):
+    """Counters in a Redis-compatible store, expired with EXPIRE."""
+    
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package") from exc
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+    
+    async def increment(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.incr(f"{self.prefix}{key}:{window}")
+            pipe.expire(f"{self.prefix}{key}:{window}", window_seconds * 2)
+            pipe.get(f"{self.prefix}{key}:{window - 1}")
+            current, _, previous = await pipe.execute()
+        return int(current), int(previous or 0)
+    
+    async def decrement(self, key: str, window: int, window_seconds: int):
+        await self.client.decr(f"{self.prefix}{key}:{window}")
+    
+    async def reset(self, key: str):
+        stored = [name async for name in self.client.scan_iter(f"{self.prefix}{key}:*")]
+        if stored:
+            await self.client.delete(*stored)
+
+def create_rate_limit_storage(backend: Optional[str] = None) -> RateLimitStorage:
+    """Build the storage selected by RATE_LIMIT_BACKEND (memory, mongodb or redis)."""
+    backend = (backend or os.getenv("RATE_LIMIT_BACKEND", "memory")).lower()
+    if backend == "mongodb":
+        return MongoRateLimitStorage()
+    if backend == "redis":
+        return RedisRateLimitStorage(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    if backend == "memory":
+        return MemoryRateLimitStorage()
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
 
 class RateLimiter:
     """
-    Thread-safe in-memory rate limiter.
-    Tracks request counts per IP address with sliding window.
+    Sliding-window rate limiter.
+    Tracks request counts per identifier (e.g. IP address) in a RateLimitStorage.
     """
     
-    def __init__(self, max_requests: int = 5, window_seconds: int = 300):
+    def __init__(
+        self,
+        max_requests: int = 5,
+        window_seconds: int = 300,
+        storage: Optional[RateLimitStorage] = None,
+        name: str = "default"
+    ):
         """
         Initialize rate limiter.
         
         Args:
             max_requests: Maximum requests allowed in the time window
             window_seconds: Time window in seconds (default: 5 minutes)
+            storage: Counter storage (default: in-memory)
+            name: Key prefix so limiters can share a storage
         """
         self.max_requests = max_requests
-        self.window = timedelta(seconds=window_seconds)
-        self.requests: Dict[str, list] = defaultdict(list)
-        self.lock = threading.Lock()
+        self.window_seconds = window_seconds
+        self.storage = storage or MemoryRateLimitStorage()
+        self.name = name
     
-    def is_allowed(self, identifier: str) -> Tuple[bool, int]:
+    async def is_allowed(self, identifier: str) -> Tuple[bool, int]:
         """
         Check if request is allowed for given identifier.
         
+        Rejected requests are not counted, so a blocked client regains
+        access once the window slides past its earlier attempts.
+        
         Args:
             identifier: Unique identifier (e.g., IP address)
-            
+        
         Returns:
             Tuple of (is_allowed, remaining_attempts)
         """
-        with self.lock:
-            now = datetime.now(timezone.utc)
-            cutoff = now - self.window
-            
-            # Remove old requests outside the window
-            self.requests[identifier] = [
-                req_time for req_time in self.requests[identifier]
-                if req_time > cutoff
-            ]
-            
-            # Check if limit exceeded
-            if len(self.requests[identifier]) >= self.max_requests:
-                return False, 0
-            
-            # Add current request
-            self.requests[identifier].append(now)
-            remaining = self.max_requests - len(self.requests[identifier])
-            return True, remaining
+        now = time.time()
+        window = int(now // self.window_seconds)
+        key = f"{self.name}:{identifier}"
+        
+        current, previous = await self.storage.increment(key, window, self.window_seconds)
+        
+        # Weight the previous window by how much of it is still inside the sliding window
+        overlap = 1 - (now % self.window_seconds) / self.window_seconds
+        estimated = previous * overlap + current
+        
+        if estimated > self.max_requests:
+            await self.storage.decrement(key, window, self.window_seconds)
+            return False, 0
+        
+        return True, max(0, self.max_requests - math.ceil(estimated))
+    
+    async def reset(self, identifier: str):
+        """Forget all recorded requests for an identifier."""
+        await self.storage.reset(f"{self.name}:{identifier}")
+    
+    def reset_seconds(self) -> int:
+        """Seconds until the current window ends and older requests start to count less."""
+        return math.ceil(self.window_seconds - time.time() % self.window_seconds)
     
     def cleanup_old_entries(self):
-        """Remove old entries to prevent memory bloat."""
+        """Remove old entries to prevent memory bloat (no-op for shared stores)."""
+        self.storage.cleanup(int(time.time() // self.window_seconds))
+
+class TokenBucketLimiter:
+    """
+    In-memory token buckets, one per key.
+    
+    Each bucket holds up to `capacity` tokens and refills continuously at
+    `refill_per_second`; a request takes one token. Buckets are refilled
+    lazily when touched, so a check is O(1) and keeps two numbers per key.
+    """
+    
+    def __init__(self, capacity: int, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        # key -> [tokens, monotonic time of last update]
+        self.buckets: Dict[str, list] = {}
+        self.lock = threading.Lock()
+    
+    def take(self, key: str) -> Tuple[bool, int, float]:
+        """
+        Take one token for `key` if available.
+        
+        Returns:
+            Tuple of (is_allowed, remaining_tokens, seconds_until_next_token_or_full)
+            where the last value is the wait for one token when rejected and
+            the time until the bucket is full again when allowed
+        """
+        now = time.monotonic()
         with self.lock:
-            now = datetime.now(timezone.utc)
-            cutoff = now - self.window
-            
-            # Remove identifiers with no recent requests
-            to_remove = []
-            for identifier, requests in self.requests.items():
-                valid_requests = [req for req in requests if req > cutoff]
-                if not valid_requests:
-                    to_remove.append(identifier)
-                else:
-                    self.requests[identifier] = valid_requests
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = [float(self.capacity), now]
+            else:
+                bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.refill_per_second)
+                bucket[1] = now
             
-            for identifier in to_remove:
-                del self.requests[identifier]
+            if bucket[0] < 1:
+                return False, 0, (1 - bucket[0]) / self.refill_per_second
+            bucket[0] -= 1
+            return True, int(bucket[0]), (self.capacity - bucket[0]) / self.refill_per_second
+    
+    def evict_idle(self) -> int:
+        """Drop buckets that have refilled to capacity (forgetting them loses nothing)."""
+        now = time.monotonic()
+        with self.lock:
+            idle = [
+                key for key, (tokens, updated) in self.buckets.items()
+                if tokens + (now - updated) * self.refill_per_second >= self.capacity
+            ]
+            for key in idle:
+                del self.buckets[key]
+        return len(idle)
+
+class RouteGroupLimit:
+    """Token-bucket limit for requests whose path starts with `prefix` (and method is in `methods`)."""
+    
+    def __init__(self, name: str, prefix: str, per_minute: int, methods: Optional[Set[str]] = None):
+        self.name = name
+        self.prefix = prefix
+        self.methods = methods
+        self.limit = per_minute
+        self.bucket = TokenBucketLimiter(capacity=per_minute, refill_per_second=per_minute / 60)
+    
+    def matches(self, method: str, path: str) -> bool:
+        return path.startswith(self.prefix) and (self.methods is None or method in self.methods)
+
+class ApiRateLimiter:
+    """
+    Per-route-group, per-client token buckets for the whole API.
+    
+    Groups are checked in order and the first match applies, so list
+    specific groups (e.g. bulk endpoints) before general ones. Paths in
+    `exempt` have their own limiter and its X-RateLimit-* headers, so they
+    are not matched at all.
+    """
+    
+    def __init__(self, groups: List[RouteGroupLimit], exempt: Iterable[str] = ()):
+        self.groups = groups
+        self.exempt = frozenset(exempt)
+    
+    def match(self, method: str, path: str) -> Optional[RouteGroupLimit]:
+        if path in self.exempt:
+            return None
+        for group in self.groups:
+            if group.matches(method, path):
+                return group
+        return None
+    
+    def evict_idle(self) -> int:
+        return sum(group.bucket.evict_idle() for group in self.groups)
+    
+    async def run_eviction(self, interval_seconds: float = 60):
+        """Background task: periodically drop idle buckets so memory tracks active clients only."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            self.evict_idle()
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying an ApiRateLimiter to every HTTP request.
+    
+    `identify(scope)` returns the client key (e.g. authenticated user or IP).
+    Limited responses carry X-RateLimit-Limit/Remaining/Reset; rejected
+    requests get HTTP 429 with Retry-After without reaching the app.
+    """
+    
+    def __init__(self, app, limiter: ApiRateLimiter, identify: Callable[[dict], str]):
+        self.app = app
+        self.limiter = limiter
+        self.identify = identify
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        group = self.limiter.match(scope["method"], scope["path"])
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+        
+        allowed, remaining, wait_seconds = group.bucket.take(self.identify(scope))
+        headers = [
+            (b"x-ratelimit-limit", str(group.limit).encode()),
+            (b"x-ratelimit-remaining", str(remaining).encode()),
+            (b"x-ratelimit-reset", str(math.ceil(wait_seconds)).encode()),
+        ]
+        
+        if not allowed:
+            body = b'{"detail":"Too many requests. Please slow down."}'
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": headers + [
+                    (b"retry-after", str(math.ceil(wait_seconds)).encode()),
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + headers
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
+
+def default_route_groups() -> List[RouteGroupLimit]:
+    """API route groups with per-minute limits from RATE_LIMIT_*_PER_MINUTE."""
+    writes = {"POST", "PUT", "PATCH", "DELETE"}
+    bulk_per_minute = int(os.getenv("RATE_LIMIT_BULK_PER_MINUTE", "10"))
+    return [
+        RouteGroupLimit("bulk", "/api/users/bulk", bulk_per_minute, writes),
+        RouteGroupLimit("bulk", "/api/sows/bulk", bulk_per_minute, writes),
+        RouteGroupLimit("bulk", "/api/sows/render-batch", bulk_per_minute, writes),
+        RouteGroupLimit("bulk", "/api/jobs", bulk_per_minute, writes),
+        RouteGroupLimit("bulk", "/api/scm/", bulk_per_minute, writes),
+        RouteGroupLimit("write", "/api/", int(os.getenv("RATE_LIMIT_WRITE_PER_MINUTE", "120")), writes),
+        RouteGroupLimit("read", "/api/", int(os.getenv("RATE_LIMIT_READ_PER_MINUTE", "300"))),
+    ]
 
 # Global rate limiters for different endpoints
-login_limiter = RateLimiter(max_requests=5, window_seconds=300)  # 5 attempts per 5 minutes
+login_limiter = RateLimiter(
+    max_requests=5, window_seconds=300, storage=create_rate_limit_storage(), name="login"
+)  # 5 attempts per 5 minutes
+# /api/auth/login is limited per IP by login_limiter alone
+api_limiter = ApiRateLimiter(default_route_groups(), exempt=["/api/auth/login"])
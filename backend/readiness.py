@@ -0,0 +1,101 @@
+"""
+Startup readiness gate.
+
+The API process starts accepting connections before MongoDB has been
+reached, indexes checked and demo users seeded; that work runs as a
+background task started from the app lifespan. `readiness` records its
+progress, `GET /ready` reports it to load balancers, and
+ReadinessGateMiddleware holds API requests that arrive early until startup
+finishes (or answers 503 with Retry-After once STARTUP_WAIT_SECONDS pass).
+"""
+from typing import Any, Dict, Optional
+import asyncio
+import os
+import time
+
+# Seconds an API request that arrives during startup waits before getting a 503
+STARTUP_WAIT_SECONDS = float(os.getenv("STARTUP_WAIT_SECONDS", "10"))
+
+class Readiness:
+    """Startup progress of this process."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Start a new startup (one per app lifespan)."""
+        self.event = asyncio.Event()
+        self.started = time.monotonic()
+        self.ready_seconds: Optional[float] = None
+        self.attempts = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.event.is_set()
+
+    def failed(self, error: Exception):
+        """Record a failed startup attempt (it is retried)."""
+        self.attempts += 1
+        self.last_error = str(error)
+
+    def set_ready(self):
+        self.attempts += 1
+        self.ready_seconds = round(time.monotonic() - self.started, 3)
+        self.event.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for startup; True once ready."""
+        if self.ready:
+            return True
+        try:
+            await asyncio.wait_for(self.event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "readySeconds": self.ready_seconds,
+            "attempts": self.attempts,
+            "lastError": self.last_error,
+        }
+
+readiness = Readiness()
+
+class ReadinessGateMiddleware:
+    """
+    ASGI middleware that holds requests under `prefix` until startup is done.
+
+    Requests waiting longer than `timeout` seconds get HTTP 503 with
+    Retry-After without reaching the app. Other paths (/, /health, /ready,
+    /metrics, /docs) are never held.
+    """
+
+    def __init__(self, app, state: Readiness = readiness, prefix: str = "/api/", timeout: float = STARTUP_WAIT_SECONDS):
+        self.app = app
+        self.state = state
+        self.prefix = prefix
+        self.timeout = timeout
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.state.ready or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.state.wait(self.timeout):
+            body = b'{"detail":"Service is starting up. Please retry shortly."}'
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"retry-after", b"1"),
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        await self.app(scope, receive, send)
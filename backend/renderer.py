@@ -0,0 +1,372 @@
+"""
+Server-side rendering of SOW documents (HTML, and PDF when WeasyPrint is installed).
+
+Port of the printable document built by the frontend's pdf-export.ts.
+Rendering is CPU-bound pure Python, so it runs on a process pool rather
+than the event loop; rendered documents are cached per SOW version in
+`render_cache` so repeated exports of an unchanged SOW cost one lookup.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from html import escape
+from typing import IO, Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import importlib.util
+import os
+import zipfile
+
+from cache import render_cache
+from models import SOWRenderBatchRequest
+from serialization import sow_stamp
+
+# Media type and file extension per output format
+RENDER_FORMATS = {
+    "html": ("text/html; charset=utf-8", "html"),
+    "pdf": ("application/pdf", "pdf"),
+}
+
+# Most SOWs one batch render may include
+MAX_RENDER_BATCH = int(os.getenv("MAX_RENDER_BATCH", "500"))
+
+# Batch zip size kept in memory before spilling to a temporary file
+RENDER_ZIP_SPOOL_BYTES = int(os.getenv("RENDER_ZIP_SPOOL_BYTES", str(32 * 1024 * 1024)))
+
+# Fields needed to check the render cache and name the output file
+RENDER_STAMP_PROJECTION = {"_id": 0, "id": 1, "clientId": 1, "projectName": 1, "currentVersion": 1, "updatedAt": 1}
+
+# Optional: PDF output needs the `weasyprint` package. Only its presence is
+# checked here; importing it takes longer than the rest of the API, so it is
+# imported by the first PDF render (in a render worker process) instead.
+PDF_AVAILABLE = importlib.util.find_spec("weasyprint") is not None
+
+STYLESHEET = """
+@page { size: A4; margin: 20mm 20mm 30mm 20mm;
+  @bottom-left { content: "Xebia SOWGen Platform"; font-size: 8pt; color: #4c3a8c; }
+  @bottom-right { content: "Page " counter(page) " of " counter(pages); font-size: 8pt; color: #4c3a8c; } }
+* { margin: 0; padding: 0; box-sizing: border-box; }
+body { font-family: 'Inter', -apple-system, 'Segoe UI', sans-serif; line-height: 1.6; color: #1a1a1a; font-size: 11pt; }
+h1, h2, h3 { font-family: 'Space Grotesk', sans-serif; font-weight: 700; }
+h1 { font-size: 28pt; margin-bottom: 8pt; letter-spacing: -0.02em; }
+h2 { font-size: 18pt; margin: 24pt 0 12pt; padding-bottom: 8pt; border-bottom: 2px solid #e5e5e5; }
+h3 { font-size: 14pt; margin-bottom: 8pt; }
+.header { margin-bottom: 32pt; padding-bottom: 16pt; border-bottom: 3px solid #1e3a5f; display: flex; justify-content: space-between; }
+.wordmark { font-family: 'Space Grotesk', sans-serif; font-size: 24pt; font-weight: 700; color: #4c3a8c; letter-spacing: 4pt; }
+.organization { font-size: 12pt; color: #6b7280; margin-bottom: 12pt; }
+.status-badge { display: inline-block; padding: 4pt 12pt; border-radius: 4pt; font-size: 9pt; font-weight: 600; text-transform: uppercase; }
+.status-approved { background: #dcfce7; color: #166534; }
+.status-pending { background: #fef3c7; color: #92400e; }
+.status-rejected { background: #fee2e2; color: #991b1b; }
+.status-draft { background: #f3f4f6; color: #374151; }
+.status-changes-requested { background: #fef3c7; color: #92400e; }
+.section { margin-bottom: 24pt; }
+.section-subtitle, .text-muted { color: #6b7280; font-size: 10pt; }
+.section-subtitle { margin-bottom: 12pt; }
+.field { margin-bottom: 12pt; }
+label { display: block; font-size: 9pt; font-weight: 600; color: #6b7280; text-transform: uppercase; letter-spacing: 0.5pt; margin-bottom: 4pt; }
+.metadata { display: flex; gap: 24pt; margin-bottom: 24pt; padding: 12pt; background: #f9fafb; border-radius: 6pt; }
+.metadata-item { flex: 1; }
+.stage-block, .training-block { border: 1px solid #e5e5e5; border-radius: 6pt; padding: 12pt; margin-bottom: 12pt; page-break-inside: avoid; }
+.stage-header { display: flex; justify-content: space-between; margin-bottom: 12pt; }
+.badge { display: inline-block; padding: 2pt 8pt; background: #f3f4f6; border: 1px solid #e5e5e5; border-radius: 4pt; font-size: 9pt; margin-left: 6pt; }
+.badge-automated { background: #dbeafe; border-color: #93c5fd; color: #1e40af; }
+.inventory-grid { display: grid; grid-template-columns: repeat(3, 1fr); gap: 12pt; margin-top: 8pt; }
+.inventory-grid span { display: block; }
+pre { font-family: 'JetBrains Mono', monospace; font-size: 9pt; background: #f9fafb; padding: 8pt; border: 1px solid #e5e5e5; border-radius: 4pt; white-space: pre-wrap; word-wrap: break-word; }
+.approval-entry { padding: 12pt; background: #f9fafb; border-left: 3px solid #e5e5e5; margin-bottom: 12pt; page-break-inside: avoid; }
+.approval-header { display: flex; justify-content: space-between; margin-bottom: 6pt; }
+.approval-action { font-size: 9pt; font-weight: 600; padding: 2pt 8pt; border-radius: 4pt; background: #f3f4f6; color: #374151; }
+.approval-action.approved { background: #dcfce7; color: #166534; }
+.approval-action.rejected { background: #fee2e2; color: #991b1b; }
+.approval-action.changes-requested { background: #fef3c7; color: #92400e; }
+.summary-box { background: #f3f5f8; border: 2px solid #e2e5ea; border-radius: 6pt; padding: 16pt; margin-bottom: 24pt; }
+.summary-grid { display: grid; grid-template-columns: repeat(2, 1fr); gap: 16pt; }
+.summary-item strong { color: #1e3a5f; font-size: 20pt; }
+.footer { margin-top: 32pt; padding-top: 16pt; border-top: 2px solid #e5e5e5; font-size: 9pt; color: #6b7280; text-align: center; }
+@media print { body { print-color-adjust: exact; -webkit-print-color-adjust: exact; } }
+"""
+
+def _text(value: Any) -> str:
+    return escape("" if value is None else str(value))
+
+def _title(value: str) -> str:
+    return " ".join(word.capitalize() for word in value.replace("-", " ").split())
+
+def _date(timestamp: Optional[int], with_time: bool = False) -> str:
+    if not timestamp:
+        return ""
+    moment = datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
+    return moment.strftime("%Y-%m-%d %H:%M UTC" if with_time else "%Y-%m-%d")
+
+def _field(label: str, body: str) -> str:
+    return f'<div class="field"><label>{label}</label>{body}</div>'
+
+def _inventory_html(inventory: Dict[str, Any]) -> str:
+    cells = [
+        ("Total Repositories", inventory.get("totalRepositories")),
+        ("Public", inventory.get("publicRepos")),
+        ("Private", inventory.get("privateRepos")),
+        ("Total Size", f"{inventory.get('totalSizeGB')} GB"),
+    ]
+    if inventory.get("usersToMigrate"):
+        cells.append(("Users to Migrate", inventory["usersToMigrate"]))
+    if inventory.get("languages"):
+        cells.append(("Languages", ", ".join(inventory["languages"])))
+    grid = "".join(
+        f'<div><span class="text-muted">{label}</span><strong>{_text(value)}</strong></div>' for label, value in cells
+    )
+    return _field("Repository Inventory", f'<div class="inventory-grid">{grid}</div>')
+
+def _stage_html(index: int, stage: Dict[str, Any]) -> str:
+    badges = f'<span class="badge">{_text(stage.get("timelineWeeks"))} weeks</span>'
+    if stage.get("automated"):
+        badges += '<span class="badge badge-automated">Automated</span>'
+    if stage.get("estimatedManHours"):
+        badges += f'<span class="badge">{_text(stage["estimatedManHours"])}h</span>'
+
+    parts = [f'<div class="stage-header"><h3>{index}. {_text(_title(stage.get("stage", "")))}</h3><div>{badges}</div></div>']
+    if stage.get("githubMigrationType"):
+        parts.append(_field("GitHub Migration Type", f'<p>{_text(stage["githubMigrationType"].replace("-", " ").upper())}</p>'))
+    if stage.get("repositoryInventory"):
+        parts.append(_inventory_html(stage["repositoryInventory"]))
+    if stage.get("description"):
+        parts.append(_field("Description", f'<p>{_text(stage["description"])}</p>'))
+    if stage.get("technicalDetails"):
+        parts.append(_field("Technical Details", f'<pre>{_text(stage["technicalDetails"])}</pre>'))
+    if stage.get("includeCICDMigration") and stage.get("cicdPlatform"):
+        cicd = f'<p>From <strong>{_text(stage["cicdPlatform"])}</strong> to <strong>GitHub Actions</strong></p>'
+        if stage.get("cicdDetails"):
+            cicd += f'<p class="text-muted">{_text(stage["cicdDetails"])}</p>'
+        parts.append(_field("CI/CD Migration", cicd))
+    return f'<div class="stage-block">{"".join(parts)}</div>'
+
+def _section(title: str, subtitle: str, body: str) -> str:
+    subtitle_html = f'<p class="section-subtitle">{subtitle}</p>' if subtitle else ""
+    return f'<div class="section"><h2>{title}</h2>{subtitle_html}{body}</div>'
+
+def render_sow_html(sow: Dict[str, Any]) -> str:
+    """Render a SOW document (as stored, without revision history) to a printable HTML page."""
+    stages = sow.get("migrationStages") or []
+    trainings = sow.get("selectedTrainings") or []
+    history = sow.get("approvalHistory") or []
+    status = sow.get("status", "draft")
+    # Rendered documents are cached per (currentVersion, updatedAt), so the page
+    # shows only values from the SOW itself, never the time it was rendered.
+    updated_at = sow.get("updatedAt") or sow.get("createdAt") or 0
+
+    sections = []
+    if sow.get("includeMigration") and stages:
+        body = "".join(_stage_html(index, stage) for index, stage in enumerate(stages, start=1))
+        sections.append(_section("Migration Stages", f"{len(stages)} stages configured", body))
+    if sow.get("includeTraining") and trainings:
+        body = "".join(
+            f'<div class="training-block"><h3>{_text(training.get("moduleId"))}</h3>'
+            f'<p><strong>{_text(training.get("participantCount"))}</strong> participants</p></div>'
+            for training in trainings
+        )
+        sections.append(_section("Training Modules", f"{len(trainings)} modules selected", body))
+    if history:
+        body = "".join(
+            f'<div class="approval-entry"><div class="approval-header">'
+            f'<span class="approval-action {_text(entry.get("action"))}">{_text((entry.get("action") or "").replace("-", " ").upper())}</span>'
+            f'<span class="text-muted">{_date(entry.get("timestamp"), with_time=True)}</span></div>'
+            f'<p><strong>{_text(entry.get("approverName"))}</strong></p><p>{_text(entry.get("comment"))}</p></div>'
+            for entry in history
+        )
+        sections.append(_section("Approval History", "", body))
+
+    summary = []
+    total_weeks = sum(stage.get("timelineWeeks") or 0 for stage in stages)
+    if sow.get("includeMigration") and total_weeks:
+        summary.append(("Total Migration Timeline", f"<strong>{total_weeks}</strong> weeks"))
+    if sow.get("estimatedValue"):
+        summary.append(("Estimated Value", f"<strong>${sow['estimatedValue']:,.0f}</strong>"))
+    if sow.get("estimatedDuration"):
+        summary.append(("Estimated Duration", f"<strong>{_text(sow['estimatedDuration'])}</strong> weeks"))
+    summary_html = "".join(f'<div class="summary-item"><label>{label}</label><p>{value}</p></div>' for label, value in summary)
+
+    dates = [("Created", sow.get("createdAt")), ("Last Updated", sow.get("updatedAt")),
+             ("Submitted", sow.get("submittedAt")), ("Approved", sow.get("approvedAt"))]
+    dates_html = "".join(
+        f'<div class="metadata-item"><label>{label}</label><p>{_date(value)}</p></div>' for label, value in dates if value
+    )
+
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="UTF-8">
+<title>SOW - {_text(sow.get("projectName"))}</title>
+<style>{STYLESHEET}</style>
+</head>
+<body>
+<div class="header">
+  <div>
+    <h1>{_text(sow.get("projectName"))}</h1>
+    <p class="organization">{_text(sow.get("clientOrganization"))}</p>
+    <span class="status-badge status-{_text(status)}">{_text(status.replace("-", " "))}</span>
+    <span class="badge">Version {_text(sow.get("currentVersion") or 1)}</span>
+  </div>
+  <div class="wordmark">XEBIA</div>
+</div>
+<div class="summary-box"><h2 style="margin-top: 0; border: none; padding: 0;">Executive Summary</h2><div class="summary-grid">{summary_html}</div></div>
+<div class="section">
+  <h2>Project Details</h2>
+  <div class="metadata">
+    <div class="metadata-item"><label>Client Name</label><p>{_text(sow.get("clientName"))}</p></div>
+    <div class="metadata-item"><label>Organization</label><p>{_text(sow.get("clientOrganization"))}</p></div>
+  </div>
+  {_field("Project Description", f'<p>{_text(sow.get("projectDescription") or "No description provided")}</p>')}
+  <div class="metadata">{dates_html}</div>
+</div>
+{"".join(sections)}
+<div class="footer">
+  <p>Version {_text(sow.get("currentVersion") or 1)}, last updated {_date(updated_at, with_time=True)} | SOW ID: {_text(sow.get("id"))}</p>
+  <p>&copy; {_date(updated_at)[:4]} Xebia. All rights reserved.</p>
+</div>
+</body>
+</html>
+"""
+
+def render_document(sow: Dict[str, Any], fmt: str) -> bytes:
+    """Render a SOW in the given format (module level so the process pool can pickle it)."""
+    html = render_sow_html(sow)
+    if fmt == "pdf":
+        import weasyprint
+        return weasyprint.HTML(string=html).write_pdf()
+    return html.encode("utf-8")
+
+def render_filename(sow: Dict[str, Any], fmt: str) -> str:
+    """Download/zip entry name: project name slug plus SOW id."""
+    slug = "".join(char if char.isalnum() else "-" for char in (sow.get("projectName") or "sow")).strip("-")[:60]
+    return f"{slug or 'sow'}-{sow['id']}.{RENDER_FORMATS[fmt][1]}"
+
+class RenderWorkerPool:
+    """
+    Process pool for document rendering.
+
+    Unlike the auth pool, callers wait for a worker instead of being
+    rejected: at most `max_workers` renders are submitted at once and the
+    rest queue on a semaphore, so a large batch cannot flood the executor.
+    """
+
+    def __init__(self, max_workers: int):
+        """
+        Initialize pool (executor is created lazily on first use).
+
+        Args:
+            max_workers: Number of worker processes
+        """
+        self.max_workers = max_workers
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.slots: Optional[asyncio.Semaphore] = None
+        self.rendered = 0
+
+    async def render(self, sow: Dict[str, Any], fmt: str) -> bytes:
+        """Render one SOW on a worker process."""
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            self.slots = asyncio.Semaphore(self.max_workers)
+        async with self.slots:
+            loop = asyncio.get_running_loop()
+            document = await loop.run_in_executor(self.executor, render_document, sow, fmt)
+        self.rendered += 1
+        return document
+
+    async def render_many(self, sows: List[Dict[str, Any]], fmt: str) -> List[bytes]:
+        """Render several SOWs in parallel, results in input order."""
+        return await asyncio.gather(*(self.render(sow, fmt) for sow in sows))
+
+    def stats(self) -> dict:
+        """Return pool configuration and counters."""
+        return {"workers": self.max_workers, "rendered": self.rendered, "pdfAvailable": PDF_AVAILABLE}
+
+    def shutdown(self):
+        """Stop the executor, waiting for running renders."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+            self.slots = None
+
+render_pool = RenderWorkerPool(max_workers=int(os.getenv("RENDER_WORKERS", str(max(1, (os.cpu_count() or 2) // 2)))))
+
+class InvalidRenderBatch(ValueError):
+    """Raised when a batch render request selects nothing or too many SOWs."""
+
+async def render_sows(sow_service, stamps: List[Dict[str, Any]], fmt: str) -> List[Optional[bytes]]:
+    """
+    Rendered documents for the given SOW stamps, in order. Cache misses are
+    loaded in one query and rendered in parallel on the render pool; SOWs
+    deleted since the stamp was read come back as None.
+    """
+    documents = [render_cache.get((stamp["id"], fmt), sow_stamp(stamp)[1:]) for stamp in stamps]
+    missing = [stamp["id"] for stamp, document in zip(stamps, documents) if document is None]
+    if missing:
+        sows = list((await sow_service.get_sows_by_ids(missing, validate=False)).values())
+        rendered = {}
+        for sow, document in zip(sows, await render_pool.render_many(sows, fmt)):
+            render_cache.set((sow["id"], fmt), sow_stamp(sow)[1:], document)
+            rendered[sow["id"]] = document
+        documents = [
+            document if document is not None else rendered.get(stamp["id"])
+            for stamp, document in zip(stamps, documents)
+        ]
+    return documents
+
+async def find_render_stamps(sow_service, request: SOWRenderBatchRequest, client_id: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    Stamps (RENDER_STAMP_PROJECTION) of the SOWs a batch request selects,
+    restricted to client_id's SOWs when given.
+    """
+    if request.sowIds is None and request.status is None and request.approvedFrom is None and request.approvedTo is None:
+        raise InvalidRenderBatch("Provide sowIds or at least one filter")
+    stamps = [
+        stamp async for stamp in sow_service.iter_sows(
+            RENDER_STAMP_PROJECTION,
+            client_id=client_id,
+            status=request.status,
+            approved_from=request.approvedFrom,
+            approved_to=request.approvedTo,
+            sow_ids=list(dict.fromkeys(request.sowIds)) if request.sowIds is not None else None
+        ).limit(MAX_RENDER_BATCH + 1)
+    ]
+    if len(stamps) > MAX_RENDER_BATCH:
+        raise InvalidRenderBatch(f"More than {MAX_RENDER_BATCH} SOWs match; narrow the filter")
+    return stamps
+
+def _write_zip_entries(zip_file: zipfile.ZipFile, entries: List[tuple]):
+    for name, data in entries:
+        zip_file.writestr(name, data)
+
+async def write_render_archive(
+    sow_service,
+    stamps: List[Dict[str, Any]],
+    fmt: str,
+    requested_ids: List[str],
+    archive: IO[bytes],
+    progress: Optional[Callable[[int, int], Awaitable[None]]] = None
+):
+    """
+    Write a zip of rendered SOWs to `archive`.
+
+    SOWs are rendered a few worker-rounds at a time so only one chunk of
+    documents is held in memory. Requested ids that were not rendered are
+    listed in MISSING.txt. `progress(done, total)` is awaited after each chunk.
+    """
+    compression = zipfile.ZIP_DEFLATED if fmt == "html" else zipfile.ZIP_STORED
+    chunk_size = render_pool.max_workers * 4
+    rendered_ids = set()
+    with zipfile.ZipFile(archive, "w", compression=compression) as zip_file:
+        for start in range(0, len(stamps), chunk_size):
+            chunk = stamps[start:start + chunk_size]
+            documents = await render_sows(sow_service, chunk, fmt)
+            entries = []
+            for stamp, document in zip(chunk, documents):
+                if document is not None:
+                    entries.append((render_filename(stamp, fmt), document))
+                    rendered_ids.add(stamp["id"])
+            # Compression is CPU work; keep it off the event loop
+            await asyncio.to_thread(_write_zip_entries, zip_file, entries)
+            if progress is not None:
+                await progress(start + len(chunk), len(stamps))
+        missing = [sow_id for sow_id in dict.fromkeys(requested_ids) if sow_id not in rendered_ids]
+        if missing:
+            zip_file.writestr("MISSING.txt", "SOWs not found or not visible:\n" + "\n".join(missing) + "\n")
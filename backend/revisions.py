@@ -0,0 +1,113 @@
+"""
+Delta encoding for SOW revision history.
+
+Each revision stores the leaf-level changes between the SOW state before and
+after an update, as JSON-patch-style operations that carry both the old and
+the new value. Because every operation is invertible, any earlier version
+can be rebuilt by walking back from a newer state. Every
+REVISION_KEYFRAME_INTERVAL versions a revision also keeps a full snapshot of
+the pre-update state (a keyframe), which bounds how many deltas a rebuild
+has to apply.
+"""
+from typing import Any, Dict, List
+import copy
+import os
+
+# Store a full snapshot on every Nth revision
+REVISION_KEYFRAME_INTERVAL = max(1, int(os.getenv("REVISION_KEYFRAME_INTERVAL", "20")))
+
+# SOW fields that are not part of the versioned state. updatedAt is taken
+# from revision timestamps and approval comments have their own log.
+UNVERSIONED_FIELDS = {"revisionHistory", "currentVersion", "approvalHistory", "updatedAt"}
+
+def is_keyframe(version: int) -> bool:
+    """Whether the revision creating `version` stores a full snapshot."""
+    return version % REVISION_KEYFRAME_INTERVAL == 0
+
+def diff_states(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """
+    Compute the changes that turn `old` into `new`.
+
+    Dicts and lists are compared recursively so only changed leaves are
+    recorded. Paths are dot-separated, with list indexes as numbers
+    (e.g. "migrationStages.0.timelineWeeks").
+
+    Returns:
+        List of {"field", "op", "oldValue", "newValue"} dicts, where op is
+        "replace", "add" (key or list element added) or "remove" (key or
+        list element dropped)
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = []
+        for key in [*old, *(key for key in new if key not in old)]:
+            child = f"{path}.{key}" if path else str(key)
+            if key not in new:
+                changes.append({"field": child, "op": "remove", "oldValue": old[key], "newValue": None})
+            elif key not in old:
+                changes.append({"field": child, "op": "add", "oldValue": None, "newValue": new[key]})
+            else:
+                changes.extend(diff_states(old[key], new[key], child))
+        return changes
+
+    if isinstance(old, list) and isinstance(new, list):
+        changes = []
+        common = min(len(old), len(new))
+        for index in range(common):
+            changes.extend(diff_states(old[index], new[index], f"{path}.{index}"))
+        # Appends in ascending order, removals from the end backwards, so that
+        # applying the changes in order (or reverting them in reverse) is valid
+        for index in range(common, len(new)):
+            changes.append({"field": f"{path}.{index}", "op": "add", "oldValue": None, "newValue": new[index]})
+        for index in range(len(old) - 1, common - 1, -1):
+            changes.append({"field": f"{path}.{index}", "op": "remove", "oldValue": old[index], "newValue": None})
+        return changes
+
+    if old != new:
+        return [{"field": path, "op": "replace", "oldValue": old, "newValue": new}]
+    return []
+
+def _resolve_parent(state: Any, field: str):
+    """Return (container, key) addressed by a dotted field path."""
+    parts = field.split(".")
+    container = state
+    for part in parts[:-1]:
+        container = container[int(part)] if isinstance(container, list) else container[part]
+    last = parts[-1]
+    return container, int(last) if isinstance(container, list) else last
+
+def _insert(container: Any, key: Any, value: Any):
+    """Insert into a list at an index, or set a dict key."""
+    if isinstance(container, list):
+        container.insert(key, copy.deepcopy(value))
+    else:
+        container[key] = copy.deepcopy(value)
+
+def revert_changes(state: Dict[str, Any], changes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Undo one revision's changes in place, turning its post-update state back
+    into the pre-update state. Changes without an op (written before delta
+    encoding) are treated as top-level replacements.
+    """
+    for change in reversed(changes):
+        container, key = _resolve_parent(state, change["field"])
+        op = change.get("op") or "replace"
+        if op == "add":
+            container.pop(key)
+        elif op == "remove":
+            _insert(container, key, change["oldValue"])
+        else:
+            container[key] = copy.deepcopy(change["oldValue"])
+    return state
+
+def apply_changes(state: Dict[str, Any], changes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply one revision's changes in place (pre-update state to post-update state)."""
+    for change in changes:
+        container, key = _resolve_parent(state, change["field"])
+        op = change.get("op") or "replace"
+        if op == "add":
+            _insert(container, key, change["newValue"])
+        elif op == "remove":
+            container.pop(key)
+        else:
+            container[key] = copy.deepcopy(change["newValue"])
+    return state
@@ -0,0 +1,630 @@
+"""
+Repository inventory collection from SCM platforms for /api/scm/inventory.
+
+Fills a RepositoryInventory for a whole GitHub organization, GitLab group,
+Bitbucket workspace or Azure DevOps organization. Instead of scanning one
+repository at a time, the collector lists the organization's repositories
+100 per page and reads size, visibility, archive state and primary
+language from the listing itself. Once the first page reveals the page
+count (GitHub `Link: rel="last"`, GitLab `X-Total-Pages`, Bitbucket `size`),
+the remaining pages are fetched concurrently. `deep` scans additionally
+read each repository's languages and its .gitmodules/.gitattributes files.
+
+All platform calls share one pooled httpx.AsyncClient and run at most
+SCM_CONCURRENCY at a time per platform. Rate limit headers are tracked per
+platform and token: requests pause until the reset time when the limit is
+used up (up to SCM_MAX_RATE_LIMIT_WAIT_SECONDS), and 403/429 responses
+with Retry-After are retried.
+
+Responses are cached with their ETag and re-validated with If-None-Match,
+so an unchanged page costs a 304 (which GitHub does not count against the
+rate limit). Finished inventories are cached for SCM_INVENTORY_TTL_SECONDS.
+Both caches live in MongoDB (`scm_responses`, `scm_inventories`); tokens are
+never stored, cache keys use a hash of the token instead.
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, quote, urlparse
+import asyncio
+import base64
+import hashlib
+import math
+import os
+import time
+
+from database import mongodb
+
+if TYPE_CHECKING:
+    # Imported on first use (ScmCollector._client) to keep API startup fast
+    import httpx
+
+# API base URLs (point these at GitHub Enterprise Server or self-managed GitLab)
+SCM_API_URLS = {
+    "github": os.getenv("SCM_GITHUB_API_URL", "https://api.github.com"),
+    "gitlab": os.getenv("SCM_GITLAB_API_URL", "https://gitlab.com/api/v4"),
+    "bitbucket": os.getenv("SCM_BITBUCKET_API_URL", "https://api.bitbucket.org/2.0"),
+    "azure-devops": os.getenv("SCM_AZURE_DEVOPS_URL", "https://dev.azure.com"),
+}
+
+# Server-side tokens used for admins and approvers who do not send one
+SCM_SERVER_TOKENS = {
+    "github": os.getenv("SCM_GITHUB_TOKEN"),
+    "gitlab": os.getenv("SCM_GITLAB_TOKEN"),
+    "bitbucket": os.getenv("SCM_BITBUCKET_TOKEN"),
+    "azure-devops": os.getenv("SCM_AZURE_DEVOPS_TOKEN"),
+}
+
+# Concurrent requests per platform
+SCM_CONCURRENCY = int(os.getenv("SCM_CONCURRENCY", "8"))
+
+# Pooled connections shared by all platforms
+SCM_MAX_CONNECTIONS = int(os.getenv("SCM_MAX_CONNECTIONS", "32"))
+
+SCM_TIMEOUT_SECONDS = float(os.getenv("SCM_TIMEOUT_SECONDS", "30"))
+
+# Longest pause for a rate limit reset before giving up with 429
+SCM_MAX_RATE_LIMIT_WAIT_SECONDS = float(os.getenv("SCM_MAX_RATE_LIMIT_WAIT_SECONDS", "60"))
+
+# Seconds a collected inventory is served from cache
+SCM_INVENTORY_TTL_SECONDS = float(os.getenv("SCM_INVENTORY_TTL_SECONDS", "3600"))
+
+# Days cached responses (ETags) and inventories are kept
+SCM_CACHE_DAYS = float(os.getenv("SCM_CACHE_DAYS", "7"))
+
+# Attempts per request (rate limited or 5xx responses are retried)
+SCM_REQUEST_ATTEMPTS = 3
+
+SCM_PAGE_SIZE = 100
+
+class ScmError(Exception):
+    """An SCM platform request failed; status_code is the HTTP status to report."""
+
+    def __init__(self, status_code: int, message: str):
+        self.status_code = status_code
+        self.message = message
+        super().__init__(message)
+
+class ScmRateLimited(ScmError):
+    """The platform rate limit is used up for longer than SCM_MAX_RATE_LIMIT_WAIT_SECONDS."""
+
+    def __init__(self, platform: str, retry_after: float):
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(429, f"{platform} rate limit exceeded; retry in {self.retry_after}s")
+
+def token_fingerprint(token: Optional[str]) -> str:
+    """Cache key component for a token (the token itself is never stored)."""
+    return hashlib.sha256(token.encode()).hexdigest()[:16] if token else "anonymous"
+
+def _now_ms() -> int:
+    return int(datetime.now(timezone.utc).timestamp() * 1000)
+
+def _expires_at() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(days=SCM_CACHE_DAYS)
+
+class ScmCache(ABC):
+    """Interface for cached platform responses (by ETag) and collected inventories."""
+
+    @abstractmethod
+    async def get_response(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached {etag, data} of a request."""
+
+    @abstractmethod
+    async def set_response(self, key: str, etag: str, data: Any):
+        """Cache a response body with its ETag."""
+
+    @abstractmethod
+    async def get_inventory(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a collected inventory result."""
+
+    @abstractmethod
+    async def set_inventory(self, key: str, result: Dict[str, Any]):
+        """Cache a collected inventory result."""
+
+class MemoryScmCache(ScmCache):
+    """Per-process cache (tests, scripts)."""
+
+    def __init__(self):
+        self.responses: Dict[str, Dict[str, Any]] = {}
+        self.inventories: Dict[str, Dict[str, Any]] = {}
+
+    async def get_response(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.responses.get(key)
+
+    async def set_response(self, key: str, etag: str, data: Any):
+        self.responses[key] = {"etag": etag, "data": data}
+
+    async def get_inventory(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.inventories.get(key)
+
+    async def set_inventory(self, key: str, result: Dict[str, Any]):
+        self.inventories[key] = result
+
+class MongoScmCache(ScmCache):
+    """
+    Cache in the `scm_responses` and `scm_inventories` collections. Documents
+    carry an `expiresAt` date and are removed by the TTL indexes that
+    database.MongoDB creates on startup.
+    """
+
+    @property
+    def db(self):
+        # Resolved lazily: the collector is created at import, before the app connects
+        return mongodb.get_db()
+
+    async def get_response(self, key: str) -> Optional[Dict[str, Any]]:
+        return await self.db.scm_responses.find_one({"_id": key}, {"_id": 0, "etag": 1, "data": 1})
+
+    async def set_response(self, key: str, etag: str, data: Any):
+        await self.db.scm_responses.replace_one(
+            {"_id": key}, {"etag": etag, "data": data, "expiresAt": _expires_at()}, upsert=True
+        )
+
+    async def get_inventory(self, key: str) -> Optional[Dict[str, Any]]:
+        return await self.db.scm_inventories.find_one({"_id": key}, {"_id": 0, "expiresAt": 0})
+
+    async def set_inventory(self, key: str, result: Dict[str, Any]):
+        await self.db.scm_inventories.replace_one(
+            {"_id": key}, {**result, "expiresAt": _expires_at()}, upsert=True
+        )
+
+class PlatformRateLimit:
+    """Remaining requests and reset time last reported by a platform for one token."""
+
+    def __init__(self):
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+
+    def update(self, headers: "httpx.Headers"):
+        # GitHub/Azure DevOps send X-RateLimit-*, GitLab RateLimit-*; reset is epoch seconds
+        remaining = headers.get("x-ratelimit-remaining") or headers.get("ratelimit-remaining")
+        reset = headers.get("x-ratelimit-reset") or headers.get("ratelimit-reset")
+        if remaining is not None and remaining.isdigit():
+            self.remaining = int(remaining)
+        if reset is not None and reset.isdigit():
+            self.reset_at = float(reset)
+
+    def wait_seconds(self) -> float:
+        """Seconds until requests are allowed again (0 if the limit is not used up)."""
+        if self.remaining is None or self.remaining > 0:
+            return 0.0
+        wait = self.reset_at - time.time()
+        if wait <= 0:
+            self.remaining = None
+            return 0.0
+        return wait
+
+    def retry_after(self, response: "httpx.Response") -> Optional[float]:
+        """Seconds to wait before retrying a 403/429 response, None if it is not a rate limit."""
+        retry_after = response.headers.get("retry-after")
+        if retry_after is not None and retry_after.isdigit():
+            return float(retry_after)
+        if response.status_code == 429 or self.remaining == 0:
+            return max(self.reset_at - time.time(), 1.0)
+        return None
+
+def _page_number(url: Optional[str]) -> Optional[int]:
+    if not url:
+        return None
+    page = parse_qs(urlparse(url).query).get("page")
+    return int(page[0]) if page and page[0].isdigit() else None
+
+# Listing parsers: turn one response into {repos, lastPage, next}. Repository
+# records keep only the fields the inventory needs, so cached pages stay small.
+
+def _parse_github_page(response: "httpx.Response") -> Dict[str, Any]:
+    repos = [
+        {
+            "id": str(repo["id"]),
+            "name": repo["full_name"],
+            "private": bool(repo.get("private")),
+            "archived": bool(repo.get("archived")),
+            "sizeBytes": (repo.get("size") or 0) * 1024,  # GitHub reports KB
+            "languages": [repo["language"]] if repo.get("language") else [],
+            "hasLFS": None,
+            "hasSubmodules": None,
+            "defaultBranch": repo.get("default_branch"),
+            "pushedAt": repo.get("pushed_at") or repo.get("updated_at"),
+        }
+        for repo in response.json()
+    ]
+    return {
+        "repos": repos,
+        "lastPage": _page_number(response.links.get("last", {}).get("url")),
+        "next": response.links.get("next", {}).get("url"),
+    }
+
+def _parse_gitlab_page(response: "httpx.Response") -> Dict[str, Any]:
+    repos = []
+    for project in response.json():
+        statistics = project.get("statistics") or {}
+        repos.append({
+            "id": str(project["id"]),
+            "name": project["path_with_namespace"],
+            "private": project.get("visibility") != "public",
+            "archived": bool(project.get("archived")),
+            "sizeBytes": statistics.get("repository_size") or 0,
+            "languages": [],
+            "hasLFS": bool(statistics.get("lfs_objects_size")) if statistics else None,
+            "hasSubmodules": None,
+            "defaultBranch": project.get("default_branch"),
+            "pushedAt": project.get("last_activity_at"),
+        })
+    total_pages = response.headers.get("x-total-pages")
+    return {
+        "repos": repos,
+        # GitLab omits the total for very large result sets; fall back to following next
+        "lastPage": int(total_pages) if total_pages and total_pages.isdigit() else None,
+        "next": response.links.get("next", {}).get("url"),
+    }
+
+def _parse_bitbucket_page(response: "httpx.Response") -> Dict[str, Any]:
+    body = response.json()
+    repos = [
+        {
+            "id": repo["uuid"],
+            "name": repo["full_name"],
+            "private": bool(repo.get("is_private")),
+            "archived": False,
+            "sizeBytes": repo.get("size") or 0,
+            "languages": [repo["language"]] if repo.get("language") else [],
+            "hasLFS": None,
+            "hasSubmodules": None,
+            "defaultBranch": (repo.get("mainbranch") or {}).get("name"),
+            "pushedAt": repo.get("updated_on"),
+        }
+        for repo in body.get("values", [])
+    ]
+    size, page_length = body.get("size"), body.get("pagelen") or SCM_PAGE_SIZE
+    return {
+        "repos": repos,
+        "lastPage": math.ceil(size / page_length) if size is not None else None,
+        "next": body.get("next"),
+    }
+
+def _parse_azure_devops_page(response: "httpx.Response") -> Dict[str, Any]:
+    repos = [
+        {
+            "id": repo["id"],
+            "name": f"{repo['project']['name']}/{repo['name']}",
+            "private": True,
+            "archived": bool(repo.get("isDisabled")),
+            "sizeBytes": repo.get("size") or 0,
+            "languages": [],
+            "hasLFS": None,
+            "hasSubmodules": None,
+            "defaultBranch": (repo.get("defaultBranch") or "").replace("refs/heads/", "") or None,
+            "pushedAt": None,
+        }
+        for repo in response.json().get("value", [])
+    ]
+    return {"repos": repos, "lastPage": 1, "next": None}
+
+def _parse_json(response: "httpx.Response") -> Any:
+    return response.json()
+
+def _parse_gitattributes(response: "httpx.Response") -> Dict[str, Any]:
+    content = response.json().get("content") or ""
+    try:
+        text = base64.b64decode(content).decode("utf-8", "replace")
+    except ValueError:
+        text = ""
+    return {"lfs": "filter=lfs" in text}
+
+def empty_totals() -> Dict[str, Any]:
+    """Running inventory totals with no repositories."""
+    return {"repositories": 0, "privateRepos": 0, "archivedRepos": 0, "sizeBytes": 0, "lfsRepos": 0, "submoduleRepos": 0, "languages": {}}
+
+def add_repo(totals: Dict[str, Any], repo: Dict[str, Any], sign: int = 1):
+    """Add (sign=1) or remove (sign=-1) one repository record's contribution to running totals."""
+    totals["repositories"] += sign
+    totals["privateRepos"] += sign * bool(repo["private"])
+    totals["archivedRepos"] += sign * bool(repo["archived"])
+    totals["sizeBytes"] += sign * repo["sizeBytes"]
+    totals["lfsRepos"] += sign * bool(repo["hasLFS"])
+    totals["submoduleRepos"] += sign * bool(repo["hasSubmodules"])
+    languages = totals["languages"]
+    for language in repo["languages"]:
+        count = languages.get(language, 0) + sign
+        if count > 0:
+            languages[language] = count
+        else:
+            languages.pop(language, None)
+
+def inventory_from_totals(totals: Dict[str, Any]) -> Dict[str, Any]:
+    """RepositoryInventory fields for running totals; languages by repository count."""
+    total, size_bytes = totals["repositories"], totals["sizeBytes"]
+    return {
+        "totalRepositories": total,
+        "publicRepos": total - totals["privateRepos"],
+        "privateRepos": totals["privateRepos"],
+        "archivedRepos": totals["archivedRepos"],
+        "totalSizeGB": round(size_bytes / 1024 ** 3, 2),
+        "languages": sorted(totals["languages"], key=lambda language: (-totals["languages"][language], language)),
+        "hasLFS": totals["lfsRepos"] > 0,
+        "hasSubmodules": totals["submoduleRepos"] > 0,
+        "averageRepoSizeMB": round(size_bytes / total / 1024 ** 2, 2) if total else 0.0,
+    }
+
+def summarize_inventory(repos: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """RepositoryInventory fields for these repository records."""
+    totals = empty_totals()
+    for repo in repos:
+        add_repo(totals, repo)
+    return inventory_from_totals(totals)
+
+class ScmCollector:
+    """Collects repository inventories over one pooled HTTP client."""
+
+    def __init__(
+        self,
+        cache: ScmCache,
+        api_urls: Optional[Dict[str, str]] = None,
+        concurrency: int = SCM_CONCURRENCY
+    ):
+        self.cache = cache
+        self.api_urls = {**SCM_API_URLS, **(api_urls or {})}
+        self.concurrency = concurrency
+        self.client: Optional["httpx.AsyncClient"] = None
+        self.semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.rate_limits: Dict[Tuple[str, str], PlatformRateLimit] = {}
+        # Concurrent requests for the same inventory share one collection
+        self.inflight: Dict[str, asyncio.Task] = {}
+        self.requests = 0
+        self.not_modified = 0
+        self.rate_limit_waits = 0
+        self.inventory_hits = 0
+
+    def _client(self) -> "httpx.AsyncClient":
+        if self.client is None:
+            import httpx
+            self.client = httpx.AsyncClient(
+                timeout=SCM_TIMEOUT_SECONDS,
+                limits=httpx.Limits(max_connections=SCM_MAX_CONNECTIONS, max_keepalive_connections=SCM_MAX_CONNECTIONS),
+                headers={"User-Agent": "SOWgen.ai inventory collector"},
+                follow_redirects=True
+            )
+        return self.client
+
+    async def close(self):
+        """Close pooled connections (server shutdown)."""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def _auth_headers(self, platform: str, token: Optional[str]) -> Dict[str, str]:
+        headers = {"Accept": "application/vnd.github+json" if platform == "github" else "application/json"}
+        if token:
+            if platform == "azure-devops":
+                headers["Authorization"] = "Basic " + base64.b64encode(f":{token}".encode()).decode()
+            else:
+                headers["Authorization"] = f"Bearer {token}"
+        return headers
+
+    async def _get(
+        self,
+        platform: str,
+        url: str,
+        token: Optional[str],
+        parse: Callable[["httpx.Response"], Any],
+        missing_ok: bool = False
+    ) -> Any:
+        """
+        GET a platform URL and return parse(response), revalidating a cached
+        copy with If-None-Match. Returns None for 404 when missing_ok.
+        """
+        import httpx
+
+        fingerprint = token_fingerprint(token)
+        cache_key = hashlib.sha256(f"{fingerprint} {url}".encode()).hexdigest()
+        cached = await self.cache.get_response(cache_key)
+        headers = self._auth_headers(platform, token)
+        if cached:
+            headers["If-None-Match"] = cached["etag"]
+
+        rate_limit = self.rate_limits.setdefault((platform, fingerprint), PlatformRateLimit())
+        semaphore = self.semaphores.setdefault(platform, asyncio.Semaphore(self.concurrency))
+        for attempt in range(SCM_REQUEST_ATTEMPTS):
+            wait = rate_limit.wait_seconds()
+            if wait > SCM_MAX_RATE_LIMIT_WAIT_SECONDS:
+                raise ScmRateLimited(platform, wait)
+            if wait > 0:
+                self.rate_limit_waits += 1
+                await asyncio.sleep(wait)
+
+            async with semaphore:
+                try:
+                    response = await self._client().get(url, headers=headers)
+                except httpx.HTTPError as e:
+                    if attempt + 1 < SCM_REQUEST_ATTEMPTS:
+                        await asyncio.sleep(2 ** attempt)
+                        continue
+                    raise ScmError(502, f"{platform} API unreachable: {e}")
+            self.requests += 1
+            rate_limit.update(response.headers)
+
+            if response.status_code == 304 and cached:
+                self.not_modified += 1
+                return cached["data"]
+            if response.status_code in (403, 429):
+                retry_after = rate_limit.retry_after(response)
+                if retry_after is not None:
+                    if attempt + 1 < SCM_REQUEST_ATTEMPTS and retry_after <= SCM_MAX_RATE_LIMIT_WAIT_SECONDS:
+                        self.rate_limit_waits += 1
+                        await asyncio.sleep(retry_after)
+                        continue
+                    raise ScmRateLimited(platform, retry_after)
+            if response.status_code >= 500 and attempt + 1 < SCM_REQUEST_ATTEMPTS:
+                await asyncio.sleep(2 ** attempt)
+                continue
+            break
+
+        if response.status_code == 404:
+            if missing_ok:
+                return None
+            raise ScmError(404, f"Not found on {platform}: {urlparse(url).path}")
+        if response.status_code in (401, 403):
+            raise ScmError(400, f"{platform} rejected the access token ({response.status_code})")
+        if response.status_code >= 400:
+            raise ScmError(502, f"{platform} API error {response.status_code}")
+
+        data = parse(response)
+        etag = response.headers.get("etag")
+        if etag:
+            await self.cache.set_response(cache_key, etag, data)
+        return data
+
+    async def _list_pages(
+        self,
+        platform: str,
+        page_url: Callable[[int], str],
+        token: Optional[str],
+        parse: Callable[["httpx.Response"], Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """All repository records of a paged listing; pages after the first are fetched concurrently."""
+        first = await self._get(platform, page_url(1), token, parse)
+        pages = [first]
+        if first["lastPage"]:
+            pages += await asyncio.gather(*(
+                self._get(platform, page_url(page), token, parse) for page in range(2, first["lastPage"] + 1)
+            ))
+        else:
+            page = first
+            while page["next"]:
+                page = await self._get(platform, page["next"], token, parse)
+                pages.append(page)
+        return [repo for page in pages for repo in page["repos"]]
+
+    async def list_repositories(self, platform: str, organization: str, token: Optional[str]) -> List[Dict[str, Any]]:
+        """Repository records of an organization, from the listing endpoints only."""
+        base = self.api_urls[platform]
+        if platform == "github":
+            owner = quote(organization)
+            try:
+                return await self._list_pages(
+                    platform,
+                    lambda page: f"{base}/orgs/{owner}/repos?type=all&per_page={SCM_PAGE_SIZE}&page={page}",
+                    token, _parse_github_page
+                )
+            except ScmError as e:
+                if e.status_code != 404:
+                    raise
+            # Not an organization: a user account
+            return await self._list_pages(
+                platform,
+                lambda page: f"{base}/users/{owner}/repos?type=owner&per_page={SCM_PAGE_SIZE}&page={page}",
+                token, _parse_github_page
+            )
+        if platform == "gitlab":
+            group = quote(organization, safe="")
+            return await self._list_pages(
+                platform,
+                lambda page: (
+                    f"{base}/groups/{group}/projects?include_subgroups=true&statistics=true"
+                    f"&per_page={SCM_PAGE_SIZE}&page={page}"
+                ),
+                token, _parse_gitlab_page
+            )
+        if platform == "bitbucket":
+            workspace = quote(organization)
+            return await self._list_pages(
+                platform,
+                lambda page: f"{base}/repositories/{workspace}?pagelen={SCM_PAGE_SIZE}&page={page}",
+                token, _parse_bitbucket_page
+            )
+        if platform == "azure-devops":
+            org = quote(organization)
+            return await self._list_pages(
+                platform,
+                lambda page: f"{base}/{org}/_apis/git/repositories?api-version=7.0",
+                token, _parse_azure_devops_page
+            )
+        raise ScmError(400, f"Unsupported platform: {platform}")
+
+    async def add_details(self, platform: str, repo: Dict[str, Any], token: Optional[str]):
+        """Fill a repository's full language list, LFS and submodule flags where the platform exposes them."""
+        base = self.api_urls[platform]
+        if platform == "github":
+            path = f"{base}/repos/{quote(repo['name'])}"
+            languages, gitmodules, gitattributes = await asyncio.gather(
+                self._get(platform, f"{path}/languages", token, _parse_json, missing_ok=True),
+                self._get(platform, f"{path}/contents/.gitmodules", token, lambda response: True, missing_ok=True),
+                self._get(platform, f"{path}/contents/.gitattributes", token, _parse_gitattributes, missing_ok=True),
+            )
+            if languages:
+                repo["languages"] = list(languages)
+            repo["hasSubmodules"] = bool(gitmodules)
+            repo["hasLFS"] = bool(gitattributes and gitattributes["lfs"])
+        elif platform == "gitlab":
+            path = f"{base}/projects/{repo['id']}"
+            ref = quote(repo["defaultBranch"] or "HEAD", safe="")
+            languages, gitmodules = await asyncio.gather(
+                self._get(platform, f"{path}/languages", token, _parse_json, missing_ok=True),
+                self._get(
+                    platform, f"{path}/repository/files/.gitmodules?ref={ref}", token,
+                    lambda response: True, missing_ok=True
+                ),
+            )
+            if languages:
+                repo["languages"] = list(languages)
+            repo["hasSubmodules"] = bool(gitmodules)
+
+    async def collect(
+        self,
+        platform: str,
+        organization: str,
+        token: Optional[str] = None,
+        deep: bool = False,
+        refresh: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Collect an organization's inventory.
+
+        Args:
+            platform: github | gitlab | bitbucket | azure-devops
+            organization: Organization, group (may be nested), workspace or Azure DevOps organization
+            token: Access token; None makes anonymous requests (public repositories only)
+            deep: Also read each repository's languages, .gitmodules and .gitattributes
+            refresh: Ignore a cached inventory younger than SCM_INVENTORY_TTL_SECONDS
+
+        Returns:
+            {platform, organization, inventory, fetchedAt, cached}
+        """
+        key = f"{platform}:{organization.lower()}:{'deep' if deep else 'listing'}:{token_fingerprint(token)}"
+        if not refresh:
+            cached = await self.cache.get_inventory(key)
+            if cached and _now_ms() - cached["fetchedAt"] < SCM_INVENTORY_TTL_SECONDS * 1000:
+                self.inventory_hits += 1
+                return {**cached, "cached": True}
+
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._collect(key, platform, organization, token, deep))
+            self.inflight[key] = task
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _collect(self, key: str, platform: str, organization: str, token: Optional[str], deep: bool) -> Dict[str, Any]:
+        repos = await self.list_repositories(platform, organization, token)
+        if deep:
+            await asyncio.gather(*(self.add_details(platform, repo, token) for repo in repos))
+        result = {
+            "platform": platform,
+            "organization": organization,
+            "inventory": summarize_inventory(repos),
+            "fetchedAt": _now_ms(),
+        }
+        await self.cache.set_inventory(key, result)
+        return {**result, "cached": False}
+
+    def stats(self) -> Dict[str, Any]:
+        """Return request, revalidation and cache counters."""
+        return {
+            "requests": self.requests,
+            "notModified": self.not_modified,
+            "rateLimitWaits": self.rate_limit_waits,
+            "inventoryHits": self.inventory_hits,
+            "inflight": len(self.inflight),
+        }
+
+scm_collector = ScmCollector(MongoScmCache())
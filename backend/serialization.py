@@ -0,0 +1,51 @@
+"""
+JSON serialization of SOW responses.
+
+By default every SOW read from MongoDB is validated into the Pydantic model
+and serialized with `model_dump_json`. With FAST_JSON enabled, documents
+read from our own database are trusted instead: they are serialized
+straight to JSON with orjson, after filling in the model's defaults for
+fields older documents may lack, so the response shape stays the same
+without building any models.
+"""
+from enum import Enum
+from typing import Any, Dict, Tuple, Type, Union
+import os
+
+import orjson
+from pydantic import BaseModel
+
+from models import SOW, SOWSummary
+
+# Opt-in: skip Pydantic for SOW documents read from the database
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() in ("1", "true", "yes")
+
+def _field_defaults(model: Type[BaseModel]) -> Dict[str, Any]:
+    """JSON-ready defaults of a model's optional fields (enums as their values)."""
+    defaults = {}
+    for name, field in model.model_fields.items():
+        if not field.is_required():
+            default = field.get_default(call_default_factory=True)
+            defaults[name] = default.value if isinstance(default, Enum) else default
+    return defaults
+
+SOW_DEFAULTS = _field_defaults(SOW)
+SOW_SUMMARY_DEFAULTS = _field_defaults(SOWSummary)
+
+def sow_document_json(sow_dict: Dict[str, Any]) -> bytes:
+    """Serialize a trusted SOW document (SOW_DOCUMENT_PROJECTION) as a SOW response."""
+    return orjson.dumps({**SOW_DEFAULTS, **sow_dict, "revisionHistory": []})
+
+def sow_summary_json(sow_dict: Dict[str, Any]) -> bytes:
+    """Serialize a trusted SOW document (SOW_SUMMARY_PROJECTION) as a SOWSummary response."""
+    return orjson.dumps({**SOW_SUMMARY_DEFAULTS, **sow_dict})
+
+def model_json(model: BaseModel) -> bytes:
+    """Serialize a validated model (the default path)."""
+    return model.model_dump_json().encode()
+
+def sow_stamp(sow: Union[BaseModel, Dict[str, Any]]) -> Tuple[str, int, int]:
+    """(id, currentVersion, updatedAt) of a SOW model, summary or raw document."""
+    if isinstance(sow, BaseModel):
+        return sow.id, sow.currentVersion, sow.updatedAt
+    return sow["id"], sow.get("currentVersion", 1), sow["updatedAt"]
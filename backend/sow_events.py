@@ -0,0 +1,220 @@
+"""
+Live SOW change notifications for GET /api/sows/stream.
+
+One producer task per process watches the `sows` collection and fans each
+change out to every connected subscriber allowed to see it. The producer
+uses a MongoDB change stream when the deployment supports it (replica set
+or Atlas) and falls back to polling `updatedAt` on a standalone mongod, so
+the database sees one watcher or one poll query per process no matter how
+many browser tabs are subscribed.
+
+Events are small ({type, id, clientId, status, currentVersion, updatedAt});
+clients refetch the SOW (with If-None-Match) when they need the full
+document. Each event is encoded once and the same bytes are queued for
+every matching subscriber.
+"""
+from typing import Any, Dict, Optional, Set
+import asyncio
+import os
+
+import orjson
+from pymongo.errors import OperationFailure
+
+from cache import TTLCache
+from database import mongodb
+
+# Seconds between polls when change streams are unavailable
+SOW_STREAM_POLL_SECONDS = float(os.getenv("SOW_STREAM_POLL_SECONDS", "2"))
+
+# Seconds of silence after which a keepalive comment is sent
+SOW_STREAM_HEARTBEAT_SECONDS = float(os.getenv("SOW_STREAM_HEARTBEAT_SECONDS", "15"))
+
+# Events buffered per subscriber before it is told to resync instead
+SOW_STREAM_QUEUE_SIZE = int(os.getenv("SOW_STREAM_QUEUE_SIZE", "100"))
+
+# Error code MongoDB returns for $changeStream on a standalone server
+CHANGE_STREAMS_UNSUPPORTED = 40573
+
+# Consecutive non-resumable change stream errors before falling back to polling
+CHANGE_STREAM_MAX_FAILURES = 3
+
+RESYNC_EVENT = b"event: resync\ndata: {}\n\n"
+
+EVENT_FIELDS = ("id", "clientId", "status", "currentVersion", "updatedAt")
+
+class Subscriber:
+    """One connected stream: a bounded queue of encoded SSE frames."""
+
+    def __init__(self, client_id: Optional[str]):
+        # None means the subscriber may see every SOW (admins and approvers)
+        self.client_id = client_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SOW_STREAM_QUEUE_SIZE)
+
+    def push(self, frame: bytes):
+        """Queue a frame; a subscriber that falls behind gets a single resync instead."""
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_EVENT)
+
+class SOWEventBroker:
+    """Fans SOW changes out to subscribers, filtered by the same rules as GET /api/sows."""
+
+    def __init__(self):
+        self.unrestricted: Set[Subscriber] = set()
+        self.by_client: Dict[str, Set[Subscriber]] = {}
+        self.producer: Optional[asyncio.Task] = None
+        self.mode = "idle"
+        # Whether the current change feed attempt is delivering events
+        self.live = False
+        # (id, clientId) of recently seen documents by _id, so deletes can be
+        # routed when the collection has no pre-images enabled
+        self.known_documents = TTLCache(max_entries=100000, ttl_seconds=24 * 3600)
+
+    def subscribe(self, client_id: Optional[str]) -> Subscriber:
+        """Register a subscriber; client_id restricts it to that client's SOWs."""
+        subscriber = Subscriber(client_id)
+        if client_id is None:
+            self.unrestricted.add(subscriber)
+        else:
+            self.by_client.setdefault(client_id, set()).add(subscriber)
+        if self.producer is None or self.producer.done():
+            self.producer = asyncio.create_task(self._produce())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        """Remove a subscriber; the producer stops when nobody is listening."""
+        if subscriber.client_id is None:
+            self.unrestricted.discard(subscriber)
+        else:
+            subscribers = self.by_client.get(subscriber.client_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self.by_client[subscriber.client_id]
+        if not self.unrestricted and not self.by_client:
+            self.stop()
+
+    def publish(self, event_type: str, sow: Dict[str, Any]):
+        """Encode one event and queue it for every subscriber allowed to see the SOW."""
+        event = {"type": event_type, **{field: sow.get(field) for field in EVENT_FIELDS}}
+        frame = b"event: sow\ndata: " + orjson.dumps(event) + b"\n\n"
+
+        for subscriber in self.unrestricted:
+            subscriber.push(frame)
+        for subscriber in self.by_client.get(sow.get("clientId"), ()):
+            subscriber.push(frame)
+
+    def resync_all(self):
+        """Tell every subscriber to refetch (used when a change cannot be attributed)."""
+        for subscriber in [*self.unrestricted, *(s for group in self.by_client.values() for s in group)]:
+            subscriber.push(RESYNC_EVENT)
+
+    def stop(self):
+        """Cancel the producer (on shutdown)."""
+        if self.producer is not None:
+            self.producer.cancel()
+            self.producer = None
+        self.mode = "idle"
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "subscribers": len(self.unrestricted) + sum(len(group) for group in self.by_client.values()),
+        }
+
+    async def _produce(self):
+        """
+        Run the change stream, falling back to one without pre-images and
+        then to polling when the server does not support them.
+        """
+        use_change_stream = True
+        pre_images = True
+        failures = 0
+        while True:
+            self.live = False
+            try:
+                if use_change_stream:
+                    await self._watch(pre_images)
+                else:
+                    await self._poll()
+                # The stream ended (e.g. an invalidate event): reconnect as after an interruption
+                error = "stream closed"
+            except OperationFailure as e:
+                error = e
+                if use_change_stream and not e.has_error_label("ResumableChangeStreamError"):
+                    failures = 1 if self.live else failures + 1
+                    if pre_images and not self.live and e.code != CHANGE_STREAMS_UNSUPPORTED:
+                        # e.g. MongoDB before 6.0 rejects fullDocumentBeforeChange
+                        print(f"⚠️  Warning: SOW change stream pre-images unavailable: {e}")
+                        pre_images = False
+                        failures = 0
+                        continue
+                    if e.code == CHANGE_STREAMS_UNSUPPORTED or failures >= CHANGE_STREAM_MAX_FAILURES:
+                        print(f"⚠️  Warning: SOW change streams unavailable, polling instead: {e}")
+                        use_change_stream = False
+                        self._resync_if_live()
+                        continue
+            except Exception as e:
+                error = e
+            print(f"⚠️  Warning: SOW change feed interrupted, retrying: {error}")
+            self._resync_if_live()
+            await asyncio.sleep(SOW_STREAM_POLL_SECONDS)
+
+    def _resync_if_live(self):
+        # Only a feed that was delivering events can have missed some
+        if self.live:
+            self.resync_all()
+            self.live = False
+
+    async def _watch(self, pre_images: bool):
+        collection = mongodb.get_db().sows
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}}]
+        options = {"full_document_before_change": "whenAvailable"} if pre_images else {}
+        stream = await collection.watch(pipeline, full_document="updateLookup", **options)
+        async with stream:
+            self.mode = "change-stream"
+            self.live = True
+            async for change in stream:
+                event_type = change["operationType"]
+                if event_type == "delete":
+                    before = change.get("fullDocumentBeforeChange") or self.known_documents.get(change["documentKey"]["_id"])
+                    if before is None:
+                        self.resync_all()
+                    else:
+                        self.publish("delete", {"id": before["id"], "clientId": before["clientId"]})
+                    continue
+                document = change.get("fullDocument")
+                if document is not None:
+                    self.known_documents.set(document["_id"], {"id": document["id"], "clientId": document["clientId"]})
+                    self.publish(event_type, document)
+
+    async def _poll(self):
+        """
+        Poll for SOWs whose updatedAt moved. Changes are reported as "update"
+        and deletes are not visible in this mode.
+        """
+        self.mode = "polling"
+        self.live = True
+        collection = mongodb.get_db().sows
+        projection = {"_id": 0, **{field: 1 for field in EVENT_FIELDS}}
+        latest = await collection.find_one({}, {"_id": 0, "updatedAt": 1}, sort=[("updatedAt", -1)])
+        since = latest["updatedAt"] if latest else 0
+        seen_at_since = {sow["id"] async for sow in collection.find({"updatedAt": since}, {"_id": 0, "id": 1})}
+
+        while True:
+            await asyncio.sleep(SOW_STREAM_POLL_SECONDS)
+            async for sow in collection.find({"updatedAt": {"$gte": since}}, projection).sort("updatedAt", 1):
+                # $gte re-reads the boundary millisecond; skip what was already sent
+                if sow["updatedAt"] == since and sow["id"] in seen_at_since:
+                    continue
+                if sow["updatedAt"] > since:
+                    since = sow["updatedAt"]
+                    seen_at_since = set()
+                seen_at_since.add(sow["id"])
+                self.publish("update", sow)
+
+# Per-process broker shared by all stream connections
+sow_events = SOWEventBroker()
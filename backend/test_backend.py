@@ -54,7 +54,7 @@ try:
         email="test@example.com",
         role=UserRole.CLIENT,
         organization="Test Corp",
-        password="test123"
+        password="Test1234"
     )
     print(f"   ✅ User model validation works")
     
@@ -86,6 +86,289 @@ except Exception as e:
     print(f"   ❌ FastAPI initialization failed: {e}")
     print(f"   ℹ️  This is expected if MongoDB is not running")
 
+# Test user resolution cache
+print("\n6. Testing user cache...")
+try:
+    from cache import TTLCache
+    
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.set("a@example.com", User(id="1", name="A", email="a@example.com", role=UserRole.CLIENT))
+    cache.set("b@example.com", User(id="2", name="B", email="b@example.com", role=UserRole.CLIENT))
+    assert cache.get("a@example.com").id == "1", "Cache lookup failed"
+    cache.set("c@example.com", User(id="3", name="C", email="c@example.com", role=UserRole.CLIENT))
+    assert cache.get("b@example.com") is None, "LRU entry was not evicted"
+    cache.invalidate_where(lambda user: user.id == "1")
+    assert cache.get("a@example.com") is None, "Invalidation failed"
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2 and stats["evictions"] == 1, f"Unexpected stats: {stats}"
+    
+    expiring = TTLCache(max_entries=2, ttl_seconds=0)
+    expiring.set("key", "value")
+    assert expiring.get("key") is None, "Expired entry was returned"
+    print(f"   ✅ TTL/LRU user cache works")
+    
+    from cache import PayloadCache
+    payloads = PayloadCache(max_bytes=10)
+    payloads.set("sow-1", (1, 100), b"12345")
+    assert payloads.get("sow-1", (1, 100)) == b"12345", "Payload lookup failed"
+    assert payloads.get("sow-1", (2, 200)) is None, "Stale payload version was returned"
+    payloads.set("sow-2", (1, 100), b"123456")
+    assert payloads.get("sow-1", (1, 100)) is None and payloads.stats()["bytes"] == 6, "Size bound not enforced"
+    print(f"   ✅ Size-bounded SOW payload cache works")
+except Exception as e:
+    print(f"   ❌ User cache failed: {e}")
+    sys.exit(1)
+
+# Test revision delta encoding
+print("\n7. Testing revision deltas...")
+try:
+    import copy
+    from revisions import diff_states, revert_changes, apply_changes
+    
+    old_state = {
+        "projectName": "Old",
+        "migrationStages": [{"timelineWeeks": 4, "automated": True}],
+        "selectedTrainings": [{"moduleId": "gh-101", "participantCount": 10}]
+    }
+    new_state = {
+        "projectName": "New",
+        "migrationStages": [{"timelineWeeks": 6, "automated": True}, {"timelineWeeks": 2, "automated": False}],
+        "selectedTrainings": []
+    }
+    changes = diff_states(old_state, new_state)
+    fields = [change["field"] for change in changes]
+    assert fields == ["projectName", "migrationStages.0.timelineWeeks", "migrationStages.1", "selectedTrainings.0"], f"Unexpected changes: {fields}"
+    assert revert_changes(copy.deepcopy(new_state), changes) == old_state, "Revert did not restore old state"
+    assert apply_changes(copy.deepcopy(old_state), changes) == new_state, "Apply did not produce new state"
+    print(f"   ✅ Revision deltas round-trip")
+except Exception as e:
+    print(f"   ❌ Revision deltas failed: {e}")
+    sys.exit(1)
+
+# Test sliding-window rate limiter
+print("\n8. Testing rate limiter...")
+try:
+    import asyncio
+    from rate_limiter import RateLimiter, MemoryRateLimitStorage
+    
+    async def check_limiter():
+        storage = MemoryRateLimitStorage()
+        limiter = RateLimiter(max_requests=3, window_seconds=300, storage=storage)
+        results = [await limiter.is_allowed("1.2.3.4") for _ in range(4)]
+        assert [allowed for allowed, _ in results] == [True, True, True, False], f"Unexpected results: {results}"
+        assert (await limiter.is_allowed("5.6.7.8"))[0], "Limit leaked across identifiers"
+        assert len(storage.counters) == 2, "Counters are not O(1) per identifier"
+        await limiter.reset("1.2.3.4")
+        assert (await limiter.is_allowed("1.2.3.4"))[0], "Reset did not clear the limit"
+    
+    asyncio.run(check_limiter())
+    
+    from rate_limiter import TokenBucketLimiter
+    bucket = TokenBucketLimiter(capacity=2, refill_per_second=0.001)
+    assert [bucket.take("user:a")[0] for _ in range(3)] == [True, True, False], "Token bucket did not limit"
+    assert bucket.take("user:b")[0], "Token bucket leaked across keys"
+    assert bucket.evict_idle() == 0, "Active buckets were evicted"
+
+    # Login has its own limiter, so the middleware must not add a second set of headers
+    from rate_limiter import RateLimitMiddleware, api_limiter
+
+    async def login_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 401, "headers": [
+            (b"x-ratelimit-limit", b"5"), (b"x-ratelimit-remaining", b"4"), (b"x-ratelimit-reset", b"300"),
+        ]})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def login_headers():
+        messages = []
+        async def send(message):
+            messages.append(message)
+        middleware = RateLimitMiddleware(login_app, limiter=api_limiter, identify=lambda scope: "ip:1.2.3.4")
+        await middleware({"type": "http", "method": "POST", "path": "/api/auth/login", "headers": []}, None, send)
+        return [name for name, _ in messages[0]["headers"]]
+
+    names = asyncio.run(login_headers())
+    assert len(names) == len(set(names)), f"Login response repeats headers: {names}"
+    print(f"   ✅ Sliding-window and token-bucket rate limiters work")
+except Exception as e:
+    print(f"   ❌ Rate limiter failed: {e}")
+    sys.exit(1)
+
+# Test SOW estimation
+print("\n9. Testing SOW estimation...")
+try:
+    from estimation import estimate_sow, summarize_portfolio
+
+    sow = {
+        "id": "sow-1", "status": "draft", "includeMigration": True, "includeTraining": True,
+        "migrationStages": [{
+            "stage": "repository-migration", "timelineWeeks": 4, "automated": False, "githubMigrationType": "ghes",
+            "repositoryInventory": {"totalRepositories": 10, "totalSizeGB": 150, "languages": ["Go", "Java"], "hasLFS": True},
+        }],
+        "selectedTrainings": [{"moduleId": "gh-actions", "participantCount": 45}],
+    }
+    estimate = estimate_sow(sow)
+    # 10 repos * 4h + 5h LFS + 20h large estate + 4h languages; 3 sessions of the training
+    assert estimate["migrationHours"] == 69.0, f"Unexpected migration hours: {estimate}"
+    assert estimate["trainings"][0]["sessions"] == 3, f"Unexpected sessions: {estimate}"
+    assert estimate_sow(dict(sow, includeTraining=False))["trainingHours"] == 0, "Excluded training was estimated"
+
+    portfolio = summarize_portfolio([(sow, estimate), (dict(sow, id="sow-2"), estimate)])
+    assert portfolio["totals"]["sows"] == 2, f"Unexpected totals: {portfolio}"
+    assert portfolio["totals"]["estimatedValue"] == round(2 * estimate["estimatedValue"], 2), "Portfolio total is off"
+    assert portfolio["byStage"]["repository-migration"]["count"] == 2, "Stage breakdown is off"
+    print(f"   ✅ SOW and portfolio estimates work")
+except Exception as e:
+    print(f"   ❌ SOW estimation failed: {e}")
+    sys.exit(1)
+
+# Test SCM inventory collector against a local stub GitHub API
+print("\n10. Testing SCM inventory collector...")
+try:
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import urlparse, parse_qs
+    from scm_inventory import MemoryScmCache, ScmCollector
+
+    stub_repos = [
+        {"id": n, "full_name": f"acme/repo-{n}", "private": n % 2 == 0, "archived": n < 5,
+         "size": 1024, "language": "Go" if n % 3 else "Java", "pushed_at": "2024-01-01T00:00:00Z"}
+        for n in range(250)
+    ]
+
+    class StubGitHub(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != "/orgs/acme/repos":
+                self.send_response(404)
+                self.end_headers()
+                return
+            page = int(parse_qs(url.query)["page"][0])
+            etag = f'"page-{page}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = json.dumps(stub_repos[(page - 1) * 100:page * 100]).encode()
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("X-RateLimit-Remaining", "4999")
+            self.send_header("Link", f'<http://{self.headers["Host"]}/orgs/acme/repos?per_page=100&page=3>; rel="last"')
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubGitHub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    async def check_collector():
+        collector = ScmCollector(MemoryScmCache(), api_urls={"github": f"http://127.0.0.1:{server.server_port}"})
+        try:
+            result = await collector.collect("github", "acme")
+            inventory = result["inventory"]
+            assert inventory["totalRepositories"] == 250 and inventory["privateRepos"] == 125, f"Unexpected inventory: {inventory}"
+            assert inventory["archivedRepos"] == 5 and inventory["languages"] == ["Go", "Java"], f"Unexpected inventory: {inventory}"
+            assert collector.stats()["requests"] == 3, f"Pages were not fetched once each: {collector.stats()}"
+            assert (await collector.collect("github", "acme"))["cached"], "Inventory was not cached"
+            refreshed = await collector.collect("github", "acme", refresh=True)
+            assert refreshed["inventory"] == inventory and collector.stats()["notModified"] == 3, "ETags were not revalidated"
+        finally:
+            await collector.close()
+
+    asyncio.run(check_collector())
+    server.shutdown()
+    print(f"   ✅ Concurrent paged collection with ETag revalidation works")
+except Exception as e:
+    print(f"   ❌ SCM inventory collector failed: {e}")
+    sys.exit(1)
+
+# Test incremental inventory refresh
+print("\n11. Testing incremental inventory refresh...")
+try:
+    from scm_inventory import empty_totals, add_repo, inventory_from_totals, summarize_inventory
+    from inventory_snapshots import diff_snapshots, merge_snapshot
+
+    def repo(n, pushed="2024-01-01", size=1024 ** 2, languages=("Go",), lfs=False):
+        return {"id": str(n), "name": f"acme/r{n}", "private": n % 2 == 0, "archived": False, "sizeBytes": size,
+                "languages": list(languages), "hasLFS": lfs, "hasSubmodules": False, "pushedAt": pushed}
+
+    before = [repo(n) for n in range(4)]
+    totals = empty_totals()
+    for snapshot in before:
+        add_repo(totals, snapshot)
+
+    # r1 pushed (deep scan finds Rust and LFS), r3 deleted, r4 added, r0/r2 untouched
+    listed = [repo(0, languages=()), repo(1, pushed="2024-02-01", languages=()), repo(2, languages=()), repo(4)]
+    listed[0]["hasLFS"] = listed[2]["hasLFS"] = None
+    snapshots = {snapshot["id"]: snapshot for snapshot in before}
+    needs_details = [r["id"] for r in listed if merge_snapshot(r, snapshots.get(r["id"]), deep=True)]
+    assert needs_details == ["1", "4"], f"Unexpected deep scans: {needs_details}"
+    listed[1].update(languages=["Rust"], hasLFS=True)
+
+    diff = diff_snapshots(listed, snapshots, totals)
+    assert (diff["added"], len(diff["changed"]), len(diff["removed"]), diff["unchanged"]) == (1, 2, 1, 2), f"Unexpected diff: {diff}"
+    assert inventory_from_totals(totals) == summarize_inventory(listed), "Incremental totals differ from a full recount"
+    assert inventory_from_totals(totals)["languages"] == ["Go", "Rust"] and inventory_from_totals(totals)["hasLFS"], "Totals are off"
+    duplicate_totals = empty_totals()
+    assert diff_snapshots([repo(9), repo(9)], {}, duplicate_totals)["added"] == 1, "Repository listed twice was counted twice"
+    assert inventory_from_totals(duplicate_totals)["totalRepositories"] == 1, "Duplicate repository added to totals"
+    print(f"   ✅ Only new and pushed repositories are rescanned; totals update incrementally")
+except Exception as e:
+    print(f"   ❌ Incremental inventory refresh failed: {e}")
+    sys.exit(1)
+
+# Test training catalog lookups
+print("\n12. Testing training catalog...")
+try:
+    from training_catalog import training_catalog
+    from models import SelectedTraining, TrainingLevel, TrainingTrack
+    from estimation import estimate_sow
+
+    module = training_catalog.get("github-beginner-1")
+    assert module and module.track == TrainingTrack.GITHUB, "Catalog lookup by id failed"
+    beginner = training_catalog.find(TrainingTrack.GITHUB, TrainingLevel.BEGINNER)
+    assert beginner and all(m.track == TrainingTrack.GITHUB and m.level == TrainingLevel.BEGINNER for m in beginner), "Catalog filter is off"
+    selected = [SelectedTraining(moduleId="github-beginner-1", participantCount=10), SelectedTraining(moduleId="nope", participantCount=1)]
+    assert training_catalog.unknown_module_ids(selected) == ["nope"], "Unknown module ids not reported"
+
+    body, etag = training_catalog.response(TrainingTrack.GITHUB, None)
+    assert training_catalog.response(TrainingTrack.GITHUB, None) == (body, etag), "Catalog responses are not cached"
+    estimate = estimate_sow({"id": "sow-t", "includeTraining": True, "migrationStages": [],
+                             "selectedTrainings": [{"moduleId": "github-beginner-1", "participantCount": 10}]})
+    assert estimate["trainingHours"] == module.durationHours, f"Estimate ignores catalog hours: {estimate}"
+    print(f"   ✅ Training catalog loaded ({len(training_catalog.modules)} modules)")
+except Exception as e:
+    print(f"   ❌ Training catalog failed: {e}")
+    sys.exit(1)
+
+# Test startup readiness gate and index definitions
+print("\n13. Testing startup readiness...")
+try:
+    import asyncio
+    from readiness import Readiness
+    from database import INDEXES
+
+    for collection, indexes in INDEXES.items():
+        names = [index.document["name"] for index in indexes]
+        assert len(names) == len(set(names)), f"Duplicate index names on {collection}: {names}"
+
+    async def check_gate():
+        state = Readiness()
+        assert not await state.wait(0.01), "Readiness gate opened before startup finished"
+        waiter = asyncio.create_task(state.wait(1))
+        state.set_ready()
+        assert await waiter and state.stats()["ready"], "Waiting requests were not released"
+
+    asyncio.run(check_gate())
+    print(f"   ✅ Readiness gate and {sum(len(indexes) for indexes in INDEXES.values())} index definitions OK")
+except Exception as e:
+    print(f"   ❌ Startup readiness failed: {e}")
+    sys.exit(1)
+
 print("\n" + "=" * 50)
 print("✅ Backend API code validation complete!")
 print("\nNext steps:")
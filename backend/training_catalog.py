@@ -0,0 +1,83 @@
+"""
+Training module catalog for /api/training-modules, SOW validation and estimates.
+
+The catalog is read once from training_modules.json (the same modules the
+frontend ships in src/lib/training-catalog.ts) and indexed by module id,
+track and level, so looking up a selected training is a dict access rather
+than a scan. Catalog responses are serialized once per filter and served
+with an ETag derived from the file contents; the catalog only changes with
+a deploy.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
+import json
+import os
+
+import orjson
+
+from models import SelectedTraining, TrainingLevel, TrainingModule, TrainingTrack
+
+TRAINING_CATALOG_PATH = os.getenv(
+    "TRAINING_CATALOG_PATH", os.path.join(os.path.dirname(__file__), "training_modules.json")
+)
+
+class TrainingCatalog:
+    """Training modules indexed by id, track and level."""
+
+    def __init__(self, modules: List[TrainingModule], version: str):
+        self.modules = modules
+        self.version = version
+        self.by_id: Dict[str, TrainingModule] = {}
+        self.by_track: Dict[TrainingTrack, List[TrainingModule]] = {}
+        self.by_level: Dict[TrainingLevel, List[TrainingModule]] = {}
+        for module in modules:
+            if module.id in self.by_id:
+                raise ValueError(f"Duplicate training module id: {module.id}")
+            self.by_id[module.id] = module
+            self.by_track.setdefault(module.track, []).append(module)
+            self.by_level.setdefault(module.level, []).append(module)
+        # (JSON body, ETag) per (track, level) filter, None meaning any
+        self.responses: Dict[Tuple[Optional[TrainingTrack], Optional[TrainingLevel]], Tuple[bytes, str]] = {
+            (track, level): self._serialize(track, level)
+            for track in (None, *TrainingTrack)
+            for level in (None, *TrainingLevel)
+        }
+
+    @classmethod
+    def load(cls, path: str = TRAINING_CATALOG_PATH) -> "TrainingCatalog":
+        with open(path, "rb") as f:
+            raw = f.read()
+        modules = [TrainingModule(**module) for module in json.loads(raw)]
+        return cls(modules, hashlib.blake2b(raw, digest_size=8).hexdigest())
+
+    def get(self, module_id: str) -> Optional[TrainingModule]:
+        return self.by_id.get(module_id)
+
+    def find(self, track: Optional[TrainingTrack] = None, level: Optional[TrainingLevel] = None) -> List[TrainingModule]:
+        """Modules of a track and/or level, in catalog order."""
+        if track is None and level is None:
+            return self.modules
+        if track is None:
+            return self.by_level.get(level, [])
+        modules = self.by_track.get(track, [])
+        return modules if level is None else [module for module in modules if module.level == level]
+
+    def unknown_module_ids(self, trainings: Iterable[SelectedTraining]) -> List[str]:
+        """Ids of selected trainings that are not in the catalog."""
+        return [training.moduleId for training in trainings if training.moduleId not in self.by_id]
+
+    def module_hours(self, module_id: str) -> Optional[float]:
+        """Delivery hours of one session of a module; None for unknown modules."""
+        module = self.by_id.get(module_id)
+        return module.durationHours if module else None
+
+    def response(self, track: Optional[TrainingTrack] = None, level: Optional[TrainingLevel] = None) -> Tuple[bytes, str]:
+        """(JSON body, ETag) of a catalog listing, serialized when the catalog was loaded."""
+        return self.responses[(track, level)]
+
+    def _serialize(self, track: Optional[TrainingTrack], level: Optional[TrainingLevel]) -> Tuple[bytes, str]:
+        body = orjson.dumps([module.model_dump(mode="json") for module in self.find(track, level)])
+        etag = f'"{self.version}-{track.value if track else "all"}-{level.value if level else "all"}"'
+        return body, etag
+
+training_catalog = TrainingCatalog.load()
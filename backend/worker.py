@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Standalone background job worker.
+
+Runs queued jobs from the `jobs` collection (see jobs.py) outside the API
+process, so slow exports and imports never compete with requests:
+
+    python worker.py
+
+Run any number of these next to the web process (Procfile `worker` entry)
+and set JOB_WORKER_IN_PROCESS=false on the web process.
+"""
+import asyncio
+import signal
+
+from analytics import rollup_refresher
+from auth import auth_pool
+from database import mongodb
+from jobs import JOB_TYPES, job_worker
+from renderer import render_pool
+import job_handlers  # registers the job types
+
+async def main():
+    await mongodb.connect()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    job_worker.start()
+    print(f"✅ Job worker {job_worker.worker_id} running {', '.join(JOB_TYPES)} (concurrency {job_worker.concurrency})")
+    try:
+        await stop.wait()
+    finally:
+        # Running jobs are handed back to the queue for another worker
+        await job_worker.stop()
+        # Apply rollup refreshes for SOWs the jobs changed
+        await rollup_refresher.stop()
+        render_pool.shutdown()
+        auth_pool.shutdown()
+        await mongodb.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
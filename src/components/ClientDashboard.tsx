@@ -4,7 +4,7 @@ import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/com
 import { Badge } from '@/components/ui/badge'
 import { Button } from '@/components/ui/button'
 import { exportSOWAsPDF } from '@/lib/pdf-export'
-import { exportSOWsToCSV } from '@/lib/csv-export'
+import { BACKEND_CSV_EXPORT, exportAllSOWsToCSV, exportSOWsToCSV } from '@/lib/csv-export'
 import { Plus, FileText, Clock, CheckCircle, FilePdf, FileCsv, DownloadSimple } from '@phosphor-icons/react'
 import { toast } from 'sonner'
 
@@ -30,13 +30,18 @@ export function ClientDashboard({ sows, user, onCreateSOW, onViewSOW }: ClientDa
     }
   }
 
-  const handleExportAllToCSV = () => {
+  const handleExportAllToCSV = async () => {
     if (mySows.length === 0) {
       toast.error('No SOWs to export')
       return
     }
     try {
-      exportSOWsToCSV(mySows, `sows-${user.name.replace(/\s+/g, '-')}-${Date.now()}.csv`)
+      const filename = `sows-${user.name.replace(/\s+/g, '-')}-${Date.now()}.csv`
+      if (BACKEND_CSV_EXPORT) {
+        await exportAllSOWsToCSV(filename)
+      } else {
+        exportSOWsToCSV(mySows, filename)
+      }
       toast.success('SOWs exported to CSV successfully')
     } catch (error) {
       toast.error(error instanceof Error ? error.message : 'Failed to export CSV')
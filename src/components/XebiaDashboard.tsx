@@ -3,7 +3,7 @@ import { motion } from 'framer-motion'
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card'
 import { Button } from '@/components/ui/button'
 import { SOW, DashboardStats } from '@/lib/types'
-import { exportSOWsToCSV } from '@/lib/csv-export'
+import { BACKEND_CSV_EXPORT, exportAllSOWsToCSV, exportSOWsToCSV } from '@/lib/csv-export'
 import { FileText, CheckCircle, Clock, XCircle, FileCsv } from '@phosphor-icons/react'
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, PieChart, Pie, Cell, LineChart, Line } from 'recharts'
 import { toast } from 'sonner'
@@ -14,14 +14,20 @@ interface XebiaDashboardProps {
 }
 
 export function XebiaDashboard({ sows }: XebiaDashboardProps) {
-  const handleExportAllToCSV = () => {
+  const handleExportAllToCSV = async () => {
     if (sows.length === 0) {
       toast.error('No SOWs to export')
       return
     }
     try {
-      exportSOWsToCSV(sows, `xebia-sows-${Date.now()}.csv`)
-      toast.success(`${sows.length} SOWs exported to CSV successfully`)
+      const filename = `xebia-sows-${Date.now()}.csv`
+      if (BACKEND_CSV_EXPORT) {
+        await exportAllSOWsToCSV(filename)
+        toast.success('SOWs exported to CSV successfully')
+      } else {
+        exportSOWsToCSV(sows, filename)
+        toast.success(`${sows.length} SOWs exported to CSV successfully`)
+      }
     } catch (error) {
       toast.error(error instanceof Error ? error.message : 'Failed to export CSV')
     }
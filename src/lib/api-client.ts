@@ -2,7 +2,7 @@
  * API client for communicating with the backend.
  */
 import axios from 'axios'
-import { User, SOW, SOWCreate, SOWUpdate, UserCreate, UserUpdate, ApprovalComment } from './types'
+import { User, SOW, SOWSearchResult, SOWChangeEvent, SOWEstimate, PortfolioEstimate, AnalyticsSummary, OrganizationAnalytics, MonthlyAnalytics, ScmInventoryRequest, ScmInventoryResponse, TrackedInventory, Job, SOWCreate, SOWUpdate, TrainingModule, SOWRevision, UserCreate, UserUpdate, ApprovalComment } from './types'
 
 // Get API base URL from environment or default to localhost
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000'
@@ -99,6 +99,15 @@ export const sowsAPI = {
     return response.data
   },
 
+  // Full-text search, most relevant first; pass nextCursor back to get the next page
+  search: async (
+    q: string,
+    options: { status?: string; limit?: number; cursor?: string } = {}
+  ): Promise<{ results: SOWSearchResult[]; nextCursor?: string }> => {
+    const response = await apiClient.get('/api/sows/search', { params: { q, ...options } })
+    return { results: response.data, nextCursor: response.headers['x-next-cursor'] }
+  },
+
   getById: async (sowId: string): Promise<SOW> => {
     const response = await apiClient.get(`/api/sows/${sowId}`)
     return response.data
@@ -117,6 +126,143 @@ export const sowsAPI = {
     const response = await apiClient.post(`/api/sows/${sowId}/comments`, comment)
     return response.data
   },
+
+  getRevisions: async (sowId: string): Promise<SOWRevision[]> => {
+    const response = await apiClient.get(`/api/sows/${sowId}/revisions`)
+    return response.data
+  },
+
+  // CSV of every SOW the user can see, generated server-side
+  exportCSV: async (status?: string): Promise<Blob> => {
+    const params = status ? { status } : {}
+    const response = await apiClient.get('/api/sows/export.csv', { params, responseType: 'blob' })
+    return response.data
+  },
+
+  // Printable SOW document rendered (and cached) by the backend
+  render: async (sowId: string, format: 'html' | 'pdf' = 'html'): Promise<Blob> => {
+    const response = await apiClient.get(`/api/sows/${sowId}/render`, { params: { format }, responseType: 'blob' })
+    return response.data
+  },
+
+  // Zip of rendered SOWs, selected by ids or by status and approval date range (epoch ms)
+  renderBatch: async (request: {
+    sowIds?: string[]
+    status?: string
+    approvedFrom?: number
+    approvedTo?: number
+    format?: 'html' | 'pdf'
+  }): Promise<Blob> => {
+    const response = await apiClient.post('/api/sows/render-batch', request, { responseType: 'blob' })
+    return response.data
+  },
+
+  // Live SOW changes over server-sent events; onResync means refetch the list.
+  // Returns a function that closes the stream.
+  subscribe: (onChange: (event: SOWChangeEvent) => void, onResync?: () => void): (() => void) => {
+    const token = localStorage.getItem('auth_token') || ''
+    const source = new EventSource(`${API_BASE_URL}/api/sows/stream?token=${encodeURIComponent(token)}`)
+    source.addEventListener('sow', (event) => onChange(JSON.parse((event as MessageEvent).data)))
+    source.addEventListener('resync', () => onResync?.())
+    return () => source.close()
+  },
+}
+
+// Training catalog
+export const trainingAPI = {
+  getModules: async (track?: string, level?: string): Promise<TrainingModule[]> => {
+    const response = await apiClient.get('/api/training-modules', { params: { track, level } })
+    return response.data
+  },
+}
+
+// Estimates
+export const estimatesAPI = {
+  estimateDraft: async (draft: Omit<SOWCreate, 'clientId' | 'clientName'>): Promise<SOWEstimate> => {
+    const response = await apiClient.post('/api/estimates', draft)
+    return response.data
+  },
+
+  getForSOW: async (sowId: string): Promise<SOWEstimate> => {
+    const response = await apiClient.get(`/api/sows/${sowId}/estimate`)
+    return response.data
+  },
+
+  getPortfolio: async (status?: SOW['status'], details = false): Promise<PortfolioEstimate> => {
+    const params = { ...(status ? { status } : {}), details }
+    const response = await apiClient.get('/api/estimates/portfolio', { params })
+    return response.data
+  },
+}
+
+// Dashboard analytics
+export const analyticsAPI = {
+  getSummary: async (): Promise<AnalyticsSummary> => {
+    const response = await apiClient.get('/api/analytics/summary')
+    return response.data
+  },
+
+  getOrganizations: async (limit = 50): Promise<OrganizationAnalytics[]> => {
+    const response = await apiClient.get('/api/analytics/organizations', { params: { limit } })
+    return response.data
+  },
+
+  getMonthly: async (months = 12): Promise<MonthlyAnalytics[]> => {
+    const response = await apiClient.get('/api/analytics/monthly', { params: { months } })
+    return response.data
+  },
+}
+
+// Organization-wide repository inventory collected by the backend
+export const scmAPI = {
+  collectInventory: async (request: ScmInventoryRequest): Promise<ScmInventoryResponse> => {
+    const response = await apiClient.post('/api/scm/inventory', request)
+    return response.data
+  },
+
+  // Tracked inventories: refreshes only rescan repositories pushed since the last one
+  track: async (request: Omit<ScmInventoryRequest, 'refresh'>): Promise<TrackedInventory> => {
+    const response = await apiClient.post('/api/scm/inventories', request)
+    return response.data
+  },
+
+  getTracked: async (): Promise<TrackedInventory[]> => {
+    const response = await apiClient.get('/api/scm/inventories')
+    return response.data
+  },
+
+  refreshTracked: async (inventoryId: string, token?: string): Promise<TrackedInventory> => {
+    const response = await apiClient.post(`/api/scm/inventories/${inventoryId}/refresh`, { token })
+    return response.data
+  },
+
+  untrack: async (inventoryId: string): Promise<void> => {
+    await apiClient.delete(`/api/scm/inventories/${inventoryId}`)
+  },
+}
+
+// Background jobs
+export const jobsAPI = {
+  submit: async (type: Job['type'], params: Record<string, unknown> = {}): Promise<Job> => {
+    const response = await apiClient.post('/api/jobs', { type, params })
+    return response.data
+  },
+
+  getAll: async (status?: Job['status']): Promise<Job[]> => {
+    const params = status ? { status } : {}
+    const response = await apiClient.get('/api/jobs', { params })
+    return response.data
+  },
+
+  getById: async (jobId: string): Promise<Job> => {
+    const response = await apiClient.get(`/api/jobs/${jobId}`)
+    return response.data
+  },
+
+  downloadResult: async (jobId: string): Promise<Blob> => {
+    const response = await apiClient.get(`/api/jobs/${jobId}/result`, { responseType: 'blob' })
+    return response.data
+  },
 }
 
 // Health check
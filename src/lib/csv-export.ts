@@ -1,4 +1,5 @@
 import { SOW } from './types'
+import { sowsAPI } from './api-client'
 import { getModuleById } from './training-catalog'
 
 export function exportSOWsToCSV(sows: SOW[], filename: string = 'sows-export.csv') {
@@ -116,7 +117,10 @@ export function exportSOWsToCSV(sows: SOW[], filename: string = 'sows-export.csv
     ...rows.map(row => row.map(cell => `"${cell}"`).join(','))
   ].join('\n')
 
-  const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' })
+  downloadCSV(new Blob([csvContent], { type: 'text/csv;charset=utf-8;' }), filename)
+}
+
+export function downloadCSV(blob: Blob, filename: string) {
   const link = document.createElement('a')
   const url = URL.createObjectURL(blob)
   
@@ -128,3 +132,11 @@ export function exportSOWsToCSV(sows: SOW[], filename: string = 'sows-export.csv
   link.click()
   document.body.removeChild(link)
 }
+
+// With the backend enabled, large exports are built and streamed by the
+// server (GET /api/sows/export.csv); otherwise they are built in the browser
+export const BACKEND_CSV_EXPORT = import.meta.env.VITE_USE_BACKEND === 'true'
+
+export async function exportAllSOWsToCSV(filename: string, status?: string) {
+  downloadCSV(await sowsAPI.exportCSV(status), filename)
+}
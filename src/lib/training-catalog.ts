@@ -1,5 +1,6 @@
 import { TrainingModule } from './types'
 
+// Mirrors backend/training_modules.json, which the API validates and prices selected trainings against
 export const TRAINING_MODULES: TrainingModule[] = [
   {
     id: 'github-beginner-1',
@@ -633,14 +634,26 @@ export const TRAINING_MODULES: TrainingModule[] = [
   }
 ]
 
+const groupBy = (key: 'track' | 'level') => {
+  const groups = new Map<string, TrainingModule[]>()
+  for (const m of TRAINING_MODULES) {
+    groups.set(m[key], [...(groups.get(m[key]) || []), m])
+  }
+  return groups
+}
+
+const MODULES_BY_ID = new Map(TRAINING_MODULES.map(m => [m.id, m]))
+const MODULES_BY_TRACK = groupBy('track')
+const MODULES_BY_LEVEL = groupBy('level')
+
 export const getModulesByTrack = (track: string) => {
-  return TRAINING_MODULES.filter(m => m.track === track)
+  return MODULES_BY_TRACK.get(track) || []
 }
 
 export const getModulesByLevel = (level: string) => {
-  return TRAINING_MODULES.filter(m => m.level === level)
+  return MODULES_BY_LEVEL.get(level) || []
 }
 
 export const getModuleById = (id: string) => {
-  return TRAINING_MODULES.find(m => m.id === id)
+  return MODULES_BY_ID.get(id)
 }
@@ -37,6 +37,43 @@ export interface RepositoryInventory {
   usersToMigrate?: number
 }
 
+export interface ScmInventoryRequest {
+  platform: 'github' | 'gitlab' | 'bitbucket' | 'azure-devops'
+  organization: string
+  token?: string
+  deep?: boolean
+  refresh?: boolean
+}
+
+export interface ScmInventoryResponse {
+  platform: ScmInventoryRequest['platform']
+  organization: string
+  inventory: RepositoryInventory
+  fetchedAt: number
+  cached: boolean
+}
+
+export interface TrackedInventory {
+  id: string
+  platform: ScmInventoryRequest['platform']
+  organization: string
+  deep: boolean
+  inventory: RepositoryInventory
+  createdBy: { id: string; name: string }
+  createdAt: number
+  refreshedAt?: number
+  lastRefresh?: {
+    added: number
+    changed: number
+    removed: number
+    unchanged: number
+    detailsFetched: number
+    sowsUpdated: number
+    sowsFailed: number
+    durationMs: number
+  }
+}
+
 export interface MigrationStageDetail {
   stage: MigrationStage
   description: string
@@ -45,6 +82,7 @@ export interface MigrationStageDetail {
   automated: boolean
   githubMigrationType?: GitHubMigrationType
   repositoryInventory?: RepositoryInventory
+  inventoryId?: string
   estimatedManHours?: number
   includeCICDMigration?: boolean
   cicdPlatform?: string
@@ -84,10 +122,20 @@ export interface SOWRevision {
   changeDescription: string
   changes: {
     field: string
+    op?: 'replace' | 'add' | 'remove'
     oldValue: any
     newValue: any
   }[]
-  snapshot: Omit<SOW, 'revisionHistory' | 'currentVersion'>
+  snapshot?: Omit<SOW, 'revisionHistory' | 'currentVersion'>
+}
+
+export interface SOWChangeEvent {
+  type: 'insert' | 'update' | 'replace' | 'delete'
+  id: string
+  clientId: string
+  status?: SOWStatus
+  currentVersion?: number
+  updatedAt?: number
 }
 
 export interface SOW {
@@ -119,6 +167,14 @@ export interface SOW {
   revisionHistory: SOWRevision[]
 }
 
+// Result of GET /api/sows/search: list fields plus text relevance
+export type SOWSearchResult = Pick<
+  SOW,
+  'id' | 'projectName' | 'clientId' | 'clientName' | 'clientOrganization' | 'status' |
+  'includeMigration' | 'includeTraining' | 'createdAt' | 'updatedAt' | 'submittedAt' |
+  'approvedAt' | 'currentApproverId' | 'estimatedValue' | 'estimatedDuration' | 'currentVersion'
+> & { score: number }
+
 export interface DashboardStats {
   totalSOWs: number
   approvedSOWs: number
@@ -155,3 +211,61 @@ export interface PlatformService {
   activityCount: number
   healthStatus: 'healthy' | 'warning' | 'error' | 'unknown'
 }
+
+export type JobStatus = 'queued' | 'running' | 'succeeded' | 'failed'
+
+export interface Job {
+  id: string
+  type: 'sow-render-batch' | 'sow-export-csv' | 'user-import' | 'revision-migration' | 'analytics-rebuild' | 'scm-inventory-refresh'
+  status: JobStatus
+  params: Record<string, unknown>
+  progress: { done: number; total?: number; message?: string }
+  result?: unknown
+  file?: { name: string; mediaType: string; size: number }
+  error?: string
+  attempts: number
+  maxAttempts: number
+  requestedBy: { id: string; name: string; role: UserRole }
+  createdAt: number
+  startedAt?: number
+  finishedAt?: number
+}
+
+export interface SOWEstimate {
+  estimatedValue: number
+  estimatedDuration: number
+  migrationHours: number
+  trainingHours: number
+  stages: { stage: MigrationStage; hours: number; weeks: number; cost: number }[]
+  trainings: { moduleId: string; participants: number; sessions: number; hours: number; cost: number }[]
+}
+
+export interface AnalyticsSummary {
+  totalSOWs: number
+  estimatedValue: number
+  byStatus: Partial<Record<SOWStatus, { sows: number; estimatedValue: number }>>
+  approvalRate: number
+  avgApprovalTimeDays?: number
+}
+
+export interface OrganizationAnalytics {
+  clientOrganization: string
+  sows: number
+  approved: number
+  estimatedValue: number
+}
+
+export interface MonthlyAnalytics {
+  month: string
+  sows: number
+  approved: number
+  estimatedValue: number
+  avgApprovalTimeDays?: number
+}
+
+export interface PortfolioEstimate {
+  totals: { sows: number; estimatedValue: number; estimatedWeeks: number; migrationHours: number; trainingHours: number }
+  byStatus: Partial<Record<SOWStatus, { sows: number; estimatedValue: number }>>
+  byStage: Partial<Record<MigrationStage, { count: number; hours: number; cost: number }>>
+  sows?: { id: string; projectName: string; status: SOWStatus; estimatedValue: number; estimatedDuration: number }[]
+}